@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,6 +8,97 @@ class Settings(BaseSettings):
     AZURE_OPENAI_API_KEY: str
     AZURE_OPENAI_API_VERSION: str | None = None
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT: str | None = None
+    # Sólo modelos que aceptan `dimensions` (text-embedding-3-*); None ⇒ nativo
+    EMBEDDING_DIMENSIONS: int | None = None
+
+    # ─── Pool de PostgreSQL (por worker) ────────────
+    DB_POOL_SIZE: int = 10                          # conexiones persistentes
+    DB_MAX_OVERFLOW: int = 10                       # extra bajo picos
+    DB_POOL_TIMEOUT_S: float = 2                    # espera máx. ⇒ 503 rápido
+    DB_POOL_RECYCLE_S: int = 1800                   # < idle timeout de Azure PG
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15_000           # 0 ⇒ sin límite
+    DB_ECHO: bool = False                           # SQL en el log (sólo depuración)
+
+    # ─── Redis ──────────────────────────────────────
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str | None = None
+    REDIS_SSL: bool = False                         # Azure Redis: puerto 6380 + TLS
+    REDIS_MAX_CONNECTIONS: int = 50                 # tamaño del pool por worker
+    REDIS_POOL_TIMEOUT_S: float = 5                 # espera por conexión libre
+    REDIS_SOCKET_TIMEOUT_S: float = 5
+
+    # ─── Almacén vectorial ──────────────────────────
+    VECTOR_BACKEND: str = "redis"                   # redis | local (mmap NumPy)
+    LOCAL_VECTOR_DIR: str = "./vector_store"
+
+    # ─── Índice vectorial (versionado, detrás del alias embeddings_idx) ──
+    VECTOR_INDEX_VERSION: int = 3                   # súbelo al cambiar el esquema
+    VECTOR_INDEX_ALGORITHM: str = "HNSW"            # HNSW | FLAT
+    VECTOR_DIM: int = 1536                          # si EMBEDDING_DIMENSIONS es None
+    VECTOR_DTYPE: str = "FLOAT32"                   # FLOAT32 | FLOAT16 | BFLOAT16
+    VECTOR_DISTANCE_METRIC: str = "COSINE"
+    VECTOR_INITIAL_CAP: int = 10_000
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_RUNTIME: int = 10
+
+    # ─── Caché de embeddings ────────────────────────
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_LOCAL_SIZE: int = 2048          # entradas LRU en proceso
+    EMBEDDING_CACHE_TTL_S: int = 7 * 24 * 3600      # TTL del nivel Redis
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000      # tope del nivel Redis
+
+    # ─── Troceado de descripciones largas (multi-vector) ──
+    EMBEDDING_CHUNK_TOKENS: int = 512               # tokens de Description por trozo
+    EMBEDDING_CHUNK_OVERLAP: int = 64               # solape entre trozos consecutivos
+    EMBEDDING_MAX_CHUNKS: int = 16                  # tope por ticket (logs enormes)
+    SEARCH_CHUNK_OVERSAMPLE: int = 3                # candidatos K-NN = k × este factor
+    SEARCH_PAYLOAD_DESCRIPTION_CHARS: int = 300     # Description recortada en el payload
+
+    # ─── Caché de resultados de búsqueda ────────────
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_S: int = 30                    # además, cada escritura la invalida
+    SEARCH_BATCH_MAX_QUERIES: int = 256             # consultas por POST /search/_batch
+
+    # ─── Micro-batching de embeddings ───────────────
+    EMBEDDING_BATCH_WINDOW_MS: float = 10           # ventana para agrupar
+    EMBEDDING_BATCH_MAX_SIZE: int = 16              # textos por llamada
+
+    # ─── Cola de embeddings (Redis Stream + workers) ──
+    EMBEDDING_WORKERS_IN_APP: bool = True           # False ⇒ sólo scripts/embedding_worker.py
+    EMBEDDING_WORKER_CONCURRENCY: int = 2           # consumers por proceso
+    EMBEDDING_QUEUE_BATCH_SIZE: int = 64            # tickets por llamada a embeddings
+    EMBEDDING_QUEUE_BLOCK_MS: int = 2000
+    EMBEDDING_QUEUE_MAX_ATTEMPTS: int = 5           # después ⇒ DLQ
+    EMBEDDING_QUEUE_BACKOFF_S: float = 2            # 2, 4, 8… s
+    EMBEDDING_QUEUE_BACKOFF_MAX_S: float = 300
+    EMBEDDING_QUEUE_CLAIM_IDLE_MS: int = 60_000     # reclamar lo de un worker caído
+    EMBEDDING_QUEUE_MAXLEN: int = 100_000
+
+    # ─── Reconciliación Redis ↔ Postgres (vectores huérfanos / faltantes) ──
+    RECONCILE_INTERVAL_S: float = 3600              # 0 = sin tarea periódica en la app
+    RECONCILE_BATCH_SIZE: int = 500                 # keys por SCAN / ids por IN
+    RECONCILE_MAX_KEYS_PER_S: float = 2000          # ritmo máximo para no cargar Redis/PG
+
+    # ─── Clientes HTTP salientes (uno por integración) ──
+    HTTP2: bool = True                              # requiere httpx[http2]
+    HTTP_MAX_CONNECTIONS: int = 20                  # por host / integración
+    HTTP_MAX_KEEPALIVE: int = 10
+    HTTP_KEEPALIVE_EXPIRY_S: float = 60
+    HTTP_CONNECT_TIMEOUT_S: float = 5
+    HTTP_READ_TIMEOUT_S: float = 30
+    HTTP_POOL_TIMEOUT_S: float = 5
+
+    # ─── Caché de audio TTS (disco, TMP_DIR) ────────
+    TTS_CACHE_MAX_MB: int = 512
+    TTS_CACHE_MAX_AGE_S: int = 30 * 24 * 3600       # sin usar ⇒ se borra
+    TTS_CACHE_EVICT_INTERVAL_S: int = 300
+    TTS_STREAMING: bool = False                     # <Play> → proxy en streaming
+    TTS_STREAM_TEXT_TTL_S: int = 600                # texto pendiente en Redis
+    TTS_PREFETCH_MAX_INFLIGHT: int = 4              # pre-síntesis simultáneas por worker
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -13,7 +106,14 @@ class Settings(BaseSettings):
         case_sensitive=False,    # opcional
     )
 
+    @property
+    def vector_dim(self) -> int:
+        """Dimensión efectiva de los vectores guardados en Redis."""
+        return self.EMBEDDING_DIMENSIONS or self.VECTOR_DIM
+
+@lru_cache
 def get_settings() -> Settings:
+    """Settings se lee una sola vez por proceso (.env + entorno)."""
     return Settings()
 
 
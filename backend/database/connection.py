@@ -2,16 +2,114 @@
 Database connection setup for SQLAlchemy and PostgreSQL.
 """
 
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from backend.config.settings import get_settings
 from typing import AsyncGenerator
 
+settings = get_settings()
+
 # Obtén la URL de la base de datos desde tu archivo de configuración
-DATABASE_URL = get_settings().DATABASE_URL
+DATABASE_URL = settings.DATABASE_URL
+
+
+# ───────── Métricas del pool ─────────
+class PoolMetrics:
+    """
+    Espera por checkout (incluye abrir conexión nueva), timeouts del pool,
+    otros fallos del checkout (conexión rechazada, auth…) y conexiones de
+    overflow abiertas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.overflow_events = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    def overflowed(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def observe(self, wait_s: float, timed_out: bool = False, failed: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            elif failed:
+                self.errors += 1
+            else:
+                self.checkouts += 1
+                self.wait_total_s += wait_s
+                self.wait_max_s = max(self.wait_max_s, wait_s)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.wait_total_s / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "overflow_events": self.overflow_events,
+                "wait_avg_ms": round(avg * 1000, 3),
+                "wait_max_ms": round(self.wait_max_s * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool que mide cuánto espera cada checkout y cuenta el overflow."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            pool_metrics.observe(time.perf_counter() - start, failed=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start)
+        return conn
+
+    def _inc_overflow(self) -> bool:
+        # _overflow arranca en -pool_size: > 0 ⇒ la conexión nueva es de overflow
+        created = super()._inc_overflow()
+        if created and self._overflow > 0:
+            pool_metrics.overflowed()
+        return created
+
+
+def _connect_args() -> dict:
+    # statement_timeout por sesión: una consulta atascada no retiene la conexión
+    if settings.DB_STATEMENT_TIMEOUT_MS and "asyncpg" in DATABASE_URL:
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {}
+
 
 # Crea el engine asíncrono de SQLAlchemy
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.DB_ECHO,
+    future=True,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_S,
+    pool_recycle=settings.DB_POOL_RECYCLE_S,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
 
 # Crea la fábrica de sesiones asíncronas
 SessionLocal = sessionmaker(
@@ -20,6 +118,19 @@ SessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+
+def pool_stats() -> dict:
+    """Estado del pool (en uso, overflow…) más las métricas de espera."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool_metrics.snapshot(),
+    }
+
 async def init_db():
     """Initialize database (placeholder)."""
     # Si necesitas lógica de inicialización, agrégala aquí
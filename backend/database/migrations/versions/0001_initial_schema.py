@@ -0,0 +1,75 @@
+"""Esquema inicial (el que creaba Base.metadata.create_all)
+
+Bases de datos ya creadas con utils/create_tables.py: no aplicar, marcar
+con `alembic stamp 0001` y después `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-01 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("TicketNumber", sa.String(), nullable=False),
+        sa.Column("ShortDescription", sa.String(), nullable=False),
+        sa.Column("CreatedBy", sa.String(), nullable=False),
+        sa.Column("Company", sa.String()),
+        sa.Column("ReportedBy", sa.String()),
+        sa.Column("FirstCategory", sa.String()),
+        sa.Column("FirstSubcategory", sa.String()),
+        sa.Column("Severity", sa.String()),
+        sa.Column("Folio", sa.String()),
+        sa.Column("Description", sa.Text()),
+        sa.Column("Channel", sa.String()),
+        sa.Column("Status", sa.String()),
+        sa.Column("Workflow", sa.String()),
+        sa.Column("Impact", sa.String()),
+        sa.Column("Urgency", sa.String()),
+        sa.Column("Priority", sa.String()),
+        sa.Column("AssignmentGroup", sa.String()),
+        sa.Column("AssignedTo", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_tickets_TicketNumber", "tickets", ["TicketNumber"], unique=True)
+
+    op.create_table(
+        "attachments",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("ticket_id", sa.Integer(), sa.ForeignKey("tickets.id")),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("file_url", sa.String(), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime()),
+    )
+    op.create_table(
+        "ticket_embeddings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("ticket_id", sa.Integer(), sa.ForeignKey("tickets.id")),
+        sa.Column("vector", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("users")
+    op.drop_table("ticket_embeddings")
+    op.drop_table("attachments")
+    op.drop_table("tickets")
@@ -0,0 +1,52 @@
+"""Índices de las consultas calientes de tickets
+
+- Listado / export (routes/tickets.py): filtros por Status, Priority,
+  AssignmentGroup y Company, orden keyset (created_at, id).
+- Adjuntos y embeddings por ticket_id (FK sin índice).
+- La hidratación de la búsqueda (id IN …) ya usa la PK.
+
+Se crean con CREATE INDEX CONCURRENTLY fuera de transacción para no
+bloquear escrituras sobre tablas en producción.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-01 00:00:01
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas) — deben coincidir con models.py
+INDEXES = [
+    ("ix_tickets_created_at_id", "tickets", ["created_at", "id"]),
+    ("ix_tickets_status_created_at", "tickets", ["Status", "created_at", "id"]),
+    ("ix_tickets_priority_created_at", "tickets", ["Priority", "created_at", "id"]),
+    ("ix_tickets_company_created_at", "tickets", ["Company", "created_at", "id"]),
+    ("ix_tickets_group_status_created_at", "tickets",
+     ["AssignmentGroup", "Status", "created_at", "id"]),
+    ("ix_attachments_ticket_id", "attachments", ["ticket_id"]),
+    ("ix_ticket_embeddings_ticket_id", "ticket_embeddings", ["ticket_id"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
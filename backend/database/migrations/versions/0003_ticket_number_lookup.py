@@ -0,0 +1,37 @@
+"""Búsqueda de TicketNumber por dígitos y secuencia de numeración
+
+- ix_tickets_ticket_digits: índice de expresión sobre los dígitos de
+  TicketNumber, el mismo que usa search_ticket_by_number (models.TICKET_DIGITS).
+- ticket_number_seq: secuencia para asignar TicketNumber sin colisiones.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-06-01 00:00:02
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("ticket_number_seq"), if_not_exists=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tickets_ticket_digits", "tickets",
+            [sa.text("""regexp_replace("TicketNumber", '\\D', '', 'g')""")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tickets_ticket_digits", table_name="tickets",
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.execute(sa.schema.DropSequence(sa.Sequence("ticket_number_seq"), if_exists=True))
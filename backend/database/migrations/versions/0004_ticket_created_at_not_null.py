@@ -0,0 +1,44 @@
+"""tickets.created_at NOT NULL
+
+El listado pagina por keyset sobre (created_at, id): una fila con
+created_at NULL daría un cursor con valor null que la siguiente página
+rechaza (400) y, además, se ordena aparte de las demás. Se rellenan los
+NULL con la fecha más antigua de la tabla (quedan al final del listado,
+como filas antiguas) y la columna pasa a NOT NULL con valor por defecto
+en el servidor (UTC, igual que el default del modelo).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-06-01 00:00:03
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+UTC_NOW = sa.text("(now() at time zone 'utc')")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE tickets
+           SET created_at = COALESCE((SELECT min(created_at) FROM tickets), now() at time zone 'utc')
+         WHERE created_at IS NULL
+        """
+    )
+    op.alter_column(
+        "tickets", "created_at",
+        existing_type=sa.DateTime(), nullable=False, server_default=UTC_NOW,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "tickets", "created_at",
+        existing_type=sa.DateTime(), nullable=True, server_default=None,
+    )
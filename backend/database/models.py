@@ -2,7 +2,9 @@
 SQLAlchemy models for ticketing system.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Column, Integer, String, DateTime, ForeignKey, Index, Sequence, Text, func, literal_column,
+)
 from sqlalchemy.orm import declarative_base, relationship
 import datetime
 
@@ -10,6 +12,14 @@ Base = declarative_base()
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    # Índices del listado / export (migración 0002): filtro + orden keyset
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at", "Status", "created_at", "id"),
+        Index("ix_tickets_priority_created_at", "Priority", "created_at", "id"),
+        Index("ix_tickets_company_created_at", "Company", "created_at", "id"),
+        Index("ix_tickets_group_status_created_at", "AssignmentGroup", "Status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     TicketNumber = Column(String, unique=True, index=True, nullable=False)
@@ -30,17 +40,30 @@ class Ticket(Base):
     Priority = Column(String)
     AssignmentGroup = Column(String)
     AssignedTo = Column(String)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # NOT NULL (migración 0004, que pone además el default en el servidor):
+    # el cursor del listado no admite valores null
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
 
     # Relaciones
     attachments = relationship("Attachment", back_populates="ticket", cascade="all, delete-orphan")
     embeddings = relationship("Embedding", back_populates="ticket", cascade="all, delete-orphan")
 
+# Sólo los dígitos de TicketNumber (búsqueda por DTMF, migración 0003).
+# Las constantes van literales, no como parámetros, para que Postgres
+# reconozca la expresión del índice en la consulta.
+TICKET_DIGITS = func.regexp_replace(
+    Ticket.TicketNumber, literal_column(r"'\D'"), literal_column("''"), literal_column("'g'")
+)
+Index("ix_tickets_ticket_digits", TICKET_DIGITS)
+
+# Numeración de tickets sin colisiones (ver database/ticket_numbers.py)
+TICKET_NUMBER_SEQ = Sequence("ticket_number_seq", metadata=Base.metadata)
+
 class Attachment(Base):
     __tablename__ = "attachments"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"))
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), index=True)
     filename = Column(String, nullable=False)
     file_url = Column(String, nullable=False)   # URL de Azure Storage
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -52,7 +75,7 @@ class Embedding(Base):
     __tablename__ = "ticket_embeddings"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"))
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), index=True)
     vector = Column(String, nullable=False)   # Puedes guardar como string JSON o bytes si serializas el vector
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
@@ -0,0 +1,39 @@
+"""
+Asignación de TicketNumber a partir de la secuencia ticket_number_seq.
+
+nextval() es atómico y no participa en transacciones: dos creaciones
+concurrentes nunca reciben el mismo valor (puede haber huecos si una
+transacción hace rollback, lo cual es aceptable para un folio).
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.database.models import TICKET_NUMBER_SEQ
+
+TICKET_NUMBER_PREFIX = "INC-"
+TICKET_NUMBER_DIGITS = 7
+
+
+def format_ticket_number(value: int) -> str:
+    """42 → 'INC-0000042' (los dígitos son lo que se marca por teléfono)."""
+    return f"{TICKET_NUMBER_PREFIX}{value:0{TICKET_NUMBER_DIGITS}d}"
+
+
+def digits_only(ticket_number: str) -> str:
+    return "".join(filter(str.isdigit, ticket_number))
+
+
+def dialed_variants(digits: str) -> list:
+    """
+    Formas en que pueden estar guardados los dígitos marcados: tal cual,
+    rellenados a TICKET_NUMBER_DIGITS ('42' → '0000042') y sin ceros a la
+    izquierda (folios antiguos sin relleno). Comparar como texto con esta
+    lista mantiene el uso del índice ix_tickets_ticket_digits.
+    """
+    unpadded = digits.lstrip("0") or "0"
+    return sorted({digits, unpadded, unpadded.zfill(TICKET_NUMBER_DIGITS)})
+
+
+async def next_ticket_number(session: AsyncSession) -> str:
+    value = await session.scalar(select(TICKET_NUMBER_SEQ.next_value()))
+    return format_ticket_number(value)
@@ -0,0 +1,187 @@
+# backend/embeddings/cache.py
+"""
+Caché de embeddings direccionada por contenido.
+
+La clave es sha256(deployment + texto normalizado), así que el mismo texto
+embebido con el mismo modelo nunca vuelve a llamar a Azure OpenAI.
+
+Dos niveles:
+  1. LRU en proceso (OrderedDict) – sin red.
+  2. Redis compartido entre workers – TTL por entrada y un ZSET con la
+     fecha de último uso para desalojar las más antiguas al pasar el tope.
+"""
+import hashlib
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from redis.exceptions import RedisError
+
+KEY_PREFIX = "embcache:"
+LRU_KEY = "embcache:lru"          # ZSET  sha → último uso (epoch)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza Unicode (NFC) y colapsa espacios en blanco."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(model: str, text: str) -> str:
+    payload = f"{model or ''}\n{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        redis=None,
+        local_size: int = 2048,
+        ttl_s: int = 7 * 24 * 3600,
+        max_entries: int = 100_000,
+    ):
+        self.redis = redis              # None ⇒ sólo nivel local
+        self.local_size = local_size
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    # ───────── Nivel local ─────────
+    def _local_get(self, sha: str) -> Optional[List[float]]:
+        vector = self._local.get(sha)
+        if vector is not None:
+            self._local.move_to_end(sha)
+        return vector
+
+    def _local_set(self, sha: str, vector: List[float]) -> None:
+        self._local[sha] = vector
+        self._local.move_to_end(sha)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+    # ───────── API pública ─────────
+    async def get(self, model: str, text: str) -> Optional[List[float]]:
+        sha = cache_key(model, text)
+
+        vector = self._local_get(sha)
+        if vector is not None:
+            self.local_hits += 1
+            return vector
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(KEY_PREFIX + sha)
+                if raw is not None:
+                    await self.redis.zadd(LRU_KEY, {sha: time.time()})
+            except RedisError as e:
+                # Redis caído ⇒ la caché no debe tumbar el embedding
+                logger.warning("Embedding cache (Redis) no disponible: %s", e)
+                raw = None
+            if raw is not None:
+                vector = np.frombuffer(raw, dtype=np.float32).tolist()
+                self._local_set(sha, vector)
+                self.redis_hits += 1
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Como get() para varios textos, con un solo MGET para los que faltan en local."""
+        shas = [cache_key(model, t) for t in texts]
+        vectors = [self._local_get(sha) for sha in shas]
+        self.local_hits += sum(v is not None for v in vectors)
+
+        remote = [i for i, v in enumerate(vectors) if v is None]
+        if remote and self.redis is not None:
+            try:
+                raws = await self.redis.mget([KEY_PREFIX + shas[i] for i in remote])
+                found = {shas[i]: time.time() for i, raw in zip(remote, raws) if raw is not None}
+                if found:
+                    await self.redis.zadd(LRU_KEY, found)
+            except RedisError as e:
+                logger.warning("Embedding cache (Redis) no disponible: %s", e)
+                raws = [None] * len(remote)
+            for i, raw in zip(remote, raws):
+                if raw is not None:
+                    vectors[i] = np.frombuffer(raw, dtype=np.float32).tolist()
+                    self._local_set(shas[i], vectors[i])
+                    self.redis_hits += 1
+
+        self.misses += sum(v is None for v in vectors)
+        return vectors
+
+    async def set(self, model: str, text: str, vector: List[float]) -> None:
+        await self.set_many(model, [text], [vector])
+
+    async def set_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        shas = [cache_key(model, t) for t in texts]
+        for sha, vector in zip(shas, vectors):
+            self._local_set(sha, vector)
+        if self.redis is None:
+            return
+
+        now = time.time()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for sha, vector in zip(shas, vectors):
+                pipe.set(KEY_PREFIX + sha, np.array(vector, dtype=np.float32).tobytes(), ex=self.ttl_s)
+            pipe.zadd(LRU_KEY, {sha: now for sha in shas})
+            pipe.zremrangebyscore(LRU_KEY, "-inf", now - self.ttl_s)   # ya expiradas
+            pipe.zcard(LRU_KEY)
+            size = (await pipe.execute())[-1]
+
+            if size > self.max_entries:
+                evicted = await self.redis.zpopmin(LRU_KEY, size - self.max_entries)
+                if evicted:
+                    await self.redis.unlink(*(KEY_PREFIX + _to_str(m) for m, _ in evicted))
+        except RedisError as e:
+            logger.warning("Embedding cache (Redis) no disponible: %s", e)
+
+    async def stats(self) -> Dict[str, float]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        stats = {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "local_size": len(self._local),
+            "local_capacity": self.local_size,
+        }
+        if self.redis is not None:
+            stats["redis_size"] = await self.redis.zcard(LRU_KEY)
+            stats["redis_capacity"] = self.max_entries
+        return stats
+
+
+def _to_str(member) -> str:
+    return member.decode() if isinstance(member, bytes) else member
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Instancia compartida por el proceso (None si está deshabilitada)."""
+    global _cache
+    if _cache is None:
+        from backend.config.settings import get_settings
+        from backend.utils.redis_client import get_redis
+
+        settings = get_settings()
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return None
+        _cache = EmbeddingCache(
+            redis=get_redis(),
+            local_size=settings.EMBEDDING_CACHE_LOCAL_SIZE,
+            ttl_s=settings.EMBEDDING_CACHE_TTL_S,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+    return _cache
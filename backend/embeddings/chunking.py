@@ -0,0 +1,110 @@
+"""
+Troceado de descripciones largas para embeddings multi-vector.
+
+Un ticket cuya Description cabe en EMBEDDING_CHUNK_TOKENS se embebe como
+siempre (un vector, key ticket:<id>). Si no, la descripción se parte en
+trozos solapados y cada trozo se embebe con el resto de campos del ticket
+(ticket_to_text), de modo que todos conservan el contexto:
+
+    emb:ticket:<id>      trozo 0 (lleva text_hash, chunks y los campos TEXT)
+    emb:ticket:<id>:1    trozo 1  ┐ TAG ticket_id compartido; la búsqueda
+    emb:ticket:<id>:2    trozo 2  ┘ se queda con el mejor trozo (max-sim)
+
+Los tokens se cuentan con tiktoken (cl100k_base) si está instalado; si no,
+se estiman por palabras a ~3 caracteres por token (por lo alto).
+"""
+from typing import List, Optional
+
+from backend.config.settings import get_settings
+from backend.utils.ticket_to_text import ticket_to_text
+
+CHARS_PER_TOKEN = 3
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            _encoding = False
+        else:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens de *text* (estimación por lo alto sin tiktoken)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def chunk_key(ticket_id, n: int) -> str:
+    """Trozo 0 → ticket:<id> (la key de siempre); trozo n → ticket:<id>:<n>."""
+    return f"ticket:{ticket_id}" if n == 0 else f"ticket:{ticket_id}:{n}"
+
+
+def _split_tokens(text: str, max_tokens: int, overlap: int, encoding) -> List[str]:
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    step = max_tokens - overlap
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens) - overlap, step)]
+
+
+def _split_words(text: str, max_tokens: int, overlap: int) -> List[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    words = []
+    for word in text.split():                   # palabras gigantes (hex, base64) en trozos
+        words.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+    costs = [-(-len(w) // CHARS_PER_TOKEN) for w in words]
+    if sum(costs) <= max_tokens:
+        return [text]
+
+    pieces, start = [], 0
+    while True:
+        end, used = start, 0
+        while end < len(words) and used + costs[end] <= max_tokens:
+            used += costs[end]
+            end += 1
+        pieces.append(" ".join(words[start:end]))
+        if end >= len(words):
+            return pieces
+        # retrocede hasta *overlap* tokens, avanzando siempre al menos una palabra
+        start_next, back = end, 0
+        while start_next > start + 1 and back + costs[start_next - 1] <= overlap:
+            start_next -= 1
+            back += costs[start_next]
+        start = start_next
+
+
+def split_text(text: str, max_tokens: int, overlap: int) -> List[str]:
+    """Trozos de como mucho *max_tokens* que se solapan *overlap* tokens."""
+    if not text:
+        return [text]
+    overlap = min(overlap, max_tokens // 2)
+    encoding = _get_encoding()
+    if encoding is not None:
+        return _split_tokens(text, max_tokens, overlap, encoding)
+    return _split_words(text, max_tokens, overlap)
+
+
+def ticket_chunks(ticket: dict, settings=None) -> List[str]:
+    """Textos a embeber para *ticket*, en orden (el primero es el trozo 0)."""
+    settings = settings or get_settings()
+    pieces = split_text(
+        ticket.get("Description") or "", settings.EMBEDDING_CHUNK_TOKENS, settings.EMBEDDING_CHUNK_OVERLAP,
+    )
+    if len(pieces) <= 1:
+        return [ticket_to_text(ticket)]
+    return [ticket_to_text({**ticket, "Description": p}) for p in pieces[:settings.EMBEDDING_MAX_CHUNKS]]
+
+
+def chunk_ticket_id(key: str) -> Optional[str]:
+    """'ticket:42:3' / 'ticket:42' → 'ticket:42' (None si no es de un ticket)."""
+    parts = key.split(":")
+    return ":".join(parts[:2]) if parts[0] == "ticket" and len(parts) >= 2 else None
@@ -1,13 +1,184 @@
 import os
+import asyncio
+import logging
+from typing import Dict, List, Optional
 from openai import AsyncAzureOpenAI
 from dotenv import load_dotenv
 
+from backend.embeddings.chunking import count_tokens
+from backend.utils.http_clients import OPENAI, get_http_client
+
 load_dotenv(override=True)
 
-client = AsyncAzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_KEY"),
-    api_version="2023-05-15",
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-)
+logger = logging.getLogger(__name__)
 
 DEPLOY = os.getenv("AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS")  # Ej: "text-embedding-ada-002"
+
+MAX_INPUTS = 2048              # tope de textos por petición de la API de embeddings
+MAX_REQUEST_TOKENS = 300_000   # tope de tokens (suma de todos los textos) por petición
+
+_client: Optional[AsyncAzureOpenAI] = None
+
+
+def get_client() -> AsyncAzureOpenAI:
+    """
+    Cliente Azure OpenAI compartido (se crea en el primer uso) sobre el
+    pool HTTP de la app; se recrea si ese pool se cerró (shutdown).
+    """
+    global _client
+    http_client = get_http_client(OPENAI)
+    if _client is None or _client._client is not http_client:
+        _client = AsyncAzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_KEY"),
+            api_version="2023-05-15",
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            http_client=http_client,
+        )
+    return _client
+
+
+def embedding_kwargs(dimensions: Optional[int]) -> dict:
+    """`dimensions` sólo se envía si se configuró (modelos text-embedding-3-*)."""
+    return {"dimensions": dimensions} if dimensions else {}
+
+
+def split_requests(
+    texts: List[str], max_inputs: int = MAX_INPUTS, max_tokens: int = MAX_REQUEST_TOKENS,
+) -> List[List[str]]:
+    """Parte *texts* (en orden) en peticiones dentro de los topes de la API."""
+    requests, current, used = [], [], 0
+    for text in texts:
+        cost = count_tokens(text)
+        if current and (len(current) >= max_inputs or used + cost > max_tokens):
+            requests.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        requests.append(current)
+    return requests
+
+
+def model_key(dimensions: Optional[int] = None) -> str:
+    """Identifica modelo + dimensión (p. ej. para la clave de la caché)."""
+    return f"{DEPLOY}@{dimensions}" if dimensions else DEPLOY
+
+
+def check_response(resp, n_inputs: int) -> None:
+    """ValueError si la API no devolvió exactamente un vector por texto."""
+    indexes = sorted(item.index for item in resp.data)
+    if indexes != list(range(n_inputs)):
+        raise ValueError(f"La API devolvió {len(indexes)} embeddings para {n_inputs} textos")
+
+
+class EmbeddingBatcher:
+    """
+    Agrupa las peticiones de embedding que llegan dentro de una ventana
+    corta (o hasta *max_batch* textos) en una sola llamada con input=[...].
+    Cada llamador recibe su propio vector; un error se propaga a todo el lote.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        window_ms: float = 10,
+        max_batch: int = 16,
+        dimensions: Optional[int] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        self.window_s = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: Dict[str, List[asyncio.Future]] = {}   # texto → futures
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()                            # evita GC de tasks
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.setdefault(text, []).append(fut)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await fut
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return list(await asyncio.gather(*(self.embed(t) for t in texts)))
+
+    async def embed_all(self, texts: List[str]) -> List[List[float]]:
+        """
+        Lote ya formado (búsquedas en bloque): sin ventana ni tope de
+        max_batch, una llamada por cada MAX_INPUTS textos distintos (o
+        MAX_REQUEST_TOKENS tokens).
+        """
+        chunks = split_requests(list(dict.fromkeys(texts)))
+        responses = await asyncio.gather(*(
+            self.client.embeddings.create(
+                model=self.model, input=chunk, **embedding_kwargs(self.dimensions)
+            )
+            for chunk in chunks
+        ))
+        vectors = {}
+        for chunk, resp in zip(chunks, responses):
+            check_response(resp, len(chunk))
+            for item in resp.data:
+                vectors[chunk[item.index]] = item.embedding
+        return [vectors[t] for t in texts]
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        texts = list(batch)
+        try:
+            resp = await self.client.embeddings.create(
+                model=self.model, input=texts, **embedding_kwargs(self.dimensions)
+            )
+            check_response(resp, len(texts))     # si faltan vectores, nadie se queda esperando
+        except Exception as e:
+            logger.error("Embedding batch (%s textos) falló: %s", len(texts), e)
+            for futures in batch.values():
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+            return
+
+        for item in resp.data:
+            for fut in batch[texts[item.index]]:
+                if not fut.done():
+                    fut.set_result(item.embedding)
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """Batcher compartido por el proceso, configurado desde settings."""
+    global _batcher
+    if _batcher is None:
+        from backend.config.settings import get_settings
+
+        settings = get_settings()
+        _batcher = EmbeddingBatcher(
+            get_client(),
+            DEPLOY,
+            window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+            max_batch=settings.EMBEDDING_BATCH_MAX_SIZE,
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+        )
+    else:
+        _batcher.client = get_client()     # por si el pool HTTP se recreó
+    return _batcher
@@ -0,0 +1,262 @@
+"""
+Cola durable de embeddings sobre un Redis Stream.
+
+Las escrituras de tickets sólo encolan el id (XADD, ~1 ms) y responden; un
+pool de workers consume la cola fuera de la request:
+
+    embq:tickets            stream con {ticket_id, attempts}
+      └─ grupo "embedders"  cada worker es un consumer del grupo
+    embq:tickets:retry      ZSET de reintentos (score = instante de reintento)
+    embq:tickets:dlq        stream de mensajes agotados (dead letters)
+
+Semántica at-least-once:
+  - un mensaje sólo se confirma (XACK) después de escribir el vector, o
+    después de moverlo a reintentos / DLQ en la misma transacción,
+  - si un worker muere con mensajes leídos, otro los reclama con
+    XAUTOCLAIM cuando llevan EMBEDDING_QUEUE_CLAIM_IDLE_MS sin confirmar.
+Procesar dos veces el mismo id es inocuo: el worker lee el ticket vigente
+de Postgres y sobrescribe el mismo hash.
+
+Las claves no usan el prefijo emb: para no caer bajo el índice vectorial.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from openai import APIConnectionError, APITimeoutError, RateLimitError
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+from sqlalchemy.future import select
+
+from backend.config.settings import get_settings
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STREAM = "embq:tickets"
+GROUP = "embedders"
+RETRY = "embq:tickets:retry"
+DLQ = "embq:tickets:dlq"
+
+Message = Tuple[bytes, dict]
+
+# Fallan igual para cualquier subconjunto del lote: partirlo sólo multiplica llamadas
+TRANSIENT_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, RedisConnectionError)
+
+
+# ───────── Productor ─────────
+async def ensure_group(redis=None) -> None:
+    redis = redis or get_redis()
+    try:
+        await redis.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def enqueue_tickets(ticket_ids: Iterable[int], redis=None) -> None:
+    """Encola un job de embedding por ticket (un solo round trip)."""
+    redis = redis or get_redis()
+    maxlen = get_settings().EMBEDDING_QUEUE_MAXLEN
+    pipe = redis.pipeline(transaction=False)
+    for ticket_id in ticket_ids:
+        pipe.xadd(STREAM, {"ticket_id": ticket_id, "attempts": 0}, maxlen=maxlen, approximate=True)
+    await pipe.execute()
+
+
+async def queue_stats(redis=None) -> dict:
+    redis = redis or get_redis()
+    await ensure_group(redis)
+    pending = await redis.xpending(STREAM, GROUP)
+    return {
+        "queued": await redis.xlen(STREAM),
+        "pending": pending["pending"],
+        "retrying": await redis.zcard(RETRY),
+        "dead": await redis.xlen(DLQ),
+    }
+
+
+async def dead_letter(errors: Dict[int, Exception], attempts: int = 0, redis=None) -> None:
+    """Manda a la DLQ los tickets de *errors* (p. ej. los que aísla el backfill)."""
+    redis = redis or get_redis()
+    now = int(time.time())
+    pipe = redis.pipeline(transaction=False)
+    for ticket_id, error in errors.items():
+        pipe.xadd(DLQ, {"ticket_id": ticket_id, "attempts": attempts, "error": str(error)[:500], "failed_at": now})
+    await pipe.execute()
+
+
+async def requeue_dead_letters(redis=None, count: int = 1000) -> int:
+    """Devuelve a la cola los mensajes de la DLQ (tras corregir la causa)."""
+    redis = redis or get_redis()
+    moved = 0
+    for msg_id, fields in await redis.xrange(DLQ, count=count):
+        pipe = redis.pipeline(transaction=True)
+        pipe.xadd(STREAM, {"ticket_id": fields[b"ticket_id"], "attempts": 0})
+        pipe.xdel(DLQ, msg_id)
+        await pipe.execute()
+        moved += 1
+    return moved
+
+
+# ───────── Consumidor ─────────
+async def embed_ticket_ids(ticket_ids: List[int]) -> int:
+    """Carga los tickets vigentes y los embebe en una llamada (ids borrados se ignoran)."""
+    from backend.database.connection import SessionLocal
+    from backend.database.models import Ticket
+    from backend.embeddings.service import embed_tickets
+    from backend.utils.ticket_to_text import ticket_to_dict
+
+    async with SessionLocal() as session:
+        result = await session.execute(select(Ticket).where(Ticket.id.in_(ticket_ids)))
+        tickets = [ticket_to_dict(t) for t in result.scalars()]
+    return await embed_tickets(tickets)
+
+
+def backoff_s(attempt: int, base: float, cap: float) -> float:
+    return min(cap, base * 2 ** (attempt - 1))
+
+
+class EmbeddingWorker:
+    """Un consumer del grupo: lee lotes, embebe y confirma."""
+
+    def __init__(
+        self,
+        consumer: str,
+        *,
+        process: Callable[[List[int]], Awaitable[int]] = embed_ticket_ids,
+        redis=None,
+        settings=None,
+    ):
+        settings = settings or get_settings()
+        self.consumer = consumer
+        self.process = process
+        self.redis = redis or get_redis()
+        self.batch_size = settings.EMBEDDING_QUEUE_BATCH_SIZE
+        self.block_ms = settings.EMBEDDING_QUEUE_BLOCK_MS
+        self.max_attempts = settings.EMBEDDING_QUEUE_MAX_ATTEMPTS
+        self.backoff_base_s = settings.EMBEDDING_QUEUE_BACKOFF_S
+        self.backoff_max_s = settings.EMBEDDING_QUEUE_BACKOFF_MAX_S
+        self.claim_idle_ms = settings.EMBEDDING_QUEUE_CLAIM_IDLE_MS
+
+    async def run_once(self) -> int:
+        """Una iteración: reintentos vencidos → lote → proceso. Devuelve nº de mensajes."""
+        await self._promote_due_retries()
+        messages = await self._read()
+        if messages:
+            await self._handle(messages)
+        return len(messages)
+
+    async def run(self) -> None:
+        ready = False
+        while True:
+            try:
+                if not ready:
+                    await ensure_group(self.redis)
+                    ready = True
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:                 # Redis caído, etc.: no matar el worker
+                logger.error("Worker %s: %s", self.consumer, e)
+                await asyncio.sleep(1)
+
+    async def _read(self) -> List[Message]:
+        # Primero lo que otro consumer dejó sin confirmar (caída a mitad de lote)
+        _, claimed, *_ = await self.redis.xautoclaim(
+            STREAM, GROUP, self.consumer,
+            min_idle_time=self.claim_idle_ms, count=self.batch_size,
+        )
+        claimed = [(msg_id, fields) for msg_id, fields in claimed if fields]
+        if claimed:
+            return claimed
+        resp = await self.redis.xreadgroup(
+            GROUP, self.consumer, {STREAM: ">"},
+            count=self.batch_size, block=self.block_ms,
+        )
+        return resp[0][1] if resp else []
+
+    async def _handle(self, messages: List[Message]) -> None:
+        ids = sorted({int(fields[b"ticket_id"]) for _, fields in messages})
+        errors = await self._process(ids)
+        if errors:
+            logger.warning(
+                "%s de %s embeddings fallidos: %s", len(errors), len(ids), next(iter(errors.values())),
+            )
+        ok = [msg_id for msg_id, fields in messages if int(fields[b"ticket_id"]) not in errors]
+        if ok:
+            await self.redis.xack(STREAM, GROUP, *ok)
+        failed = [(msg_id, fields) for msg_id, fields in messages if int(fields[b"ticket_id"]) in errors]
+        if failed:
+            await self._retry_or_dead(failed, errors)
+
+    async def _process(self, ids: List[int]) -> Dict[int, Exception]:
+        """
+        Procesa *ids*; si el lote falla, lo parte en mitades hasta aislar los
+        ids culpables, para que un ticket envenenado (p. ej. un 400 por texto
+        enorme) no gaste los reintentos de sus vecinos. Los errores
+        transitorios (429, red) afectan a todo el lote: no se parte.
+        Devuelve {id: error} de los que fallaron.
+        """
+        try:
+            await self.process(ids)
+            return {}
+        except Exception as e:
+            if len(ids) == 1 or isinstance(e, TRANSIENT_ERRORS):
+                return {ticket_id: e for ticket_id in ids}
+            half = len(ids) // 2
+            return {**await self._process(ids[:half]), **await self._process(ids[half:])}
+
+    async def _retry_or_dead(self, messages: List[Message], errors: Dict[int, Exception]) -> None:
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=True)       # mover + XACK, todo o nada
+        for msg_id, fields in messages:
+            attempts = int(fields.get(b"attempts", 0)) + 1
+            ticket_id = int(fields[b"ticket_id"])
+            error = errors[ticket_id]
+            if attempts >= self.max_attempts:
+                pipe.xadd(DLQ, {
+                    "ticket_id": ticket_id, "attempts": attempts,
+                    "error": str(error)[:500], "failed_at": int(now),
+                })
+            else:
+                delay = backoff_s(attempts, self.backoff_base_s, self.backoff_max_s)
+                member = json.dumps({"ticket_id": ticket_id, "attempts": attempts})
+                pipe.zadd(RETRY, {member: now + delay})
+            pipe.xack(STREAM, GROUP, msg_id)
+        await pipe.execute()
+
+    async def _promote_due_retries(self) -> None:
+        due = await self.redis.zrangebyscore(RETRY, "-inf", time.time(), start=0, num=self.batch_size)
+        for member in due:
+            job = json.loads(member)
+            # XADD antes de ZREM: una caída entre ambos duplica, nunca pierde
+            await self.redis.xadd(STREAM, job)
+            if not await self.redis.zrem(RETRY, member):
+                logger.debug("Reintento %s ya promovido por otro worker", job)
+
+
+# ───────── Pool de workers (en la app o en scripts/embedding_worker.py) ─────────
+_tasks: List[asyncio.Task] = []
+
+
+def consumer_name(index: int) -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+
+async def start_embedding_workers(concurrency: Optional[int] = None) -> None:
+    concurrency = concurrency or get_settings().EMBEDDING_WORKER_CONCURRENCY
+    for i in range(concurrency):
+        _tasks.append(asyncio.create_task(EmbeddingWorker(consumer_name(i)).run()))
+    logger.info("%s workers de embeddings en marcha", concurrency)
+
+
+async def stop_embedding_workers() -> None:
+    """Cancela los workers; lo leído y no confirmado se reclamará después."""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,178 @@
+"""
+Reconciliación entre los vectores de Redis (emb:ticket:<id>) y la tabla tickets.
+
+Dos pasadas, ambas por lotes de RECONCILE_BATCH_SIZE:
+
+  1. Huérfanos: SCAN sobre emb:ticket:* → ids → SELECT id … WHERE id IN (…)
+     → UNLINK en pipeline de los que ya no existen en Postgres (ocupaban
+     huecos del K-NN y se perdían al hidratar).
+  2. Faltantes: ids de Postgres en orden (keyset) → EXISTS en pipeline →
+     los que no tienen vector se encolan (queue.enqueue_tickets).
+
+El ritmo se limita a RECONCILE_MAX_KEYS_PER_S. Se ejecuta desde
+scripts/reconcile_embeddings.py o como tarea periódica de la app; con varios
+workers/réplicas, un SET NX EX garantiza una sola pasada por intervalo.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.future import select
+
+from backend.config.settings import get_settings
+from backend.embeddings.queue import enqueue_tickets
+from backend.search.cache import bump_search_generation
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PATTERN = "emb:ticket:*"
+LOCK = "embq:reconcile:lock"           # fuera de emb: para no caer en el índice
+
+
+def ticket_id_from_key(key) -> Optional[int]:
+    """b'emb:ticket:42' o b'emb:ticket:42:1' → 42 (None si la key no es de un ticket)."""
+    key = key.decode() if isinstance(key, bytes) else key
+    try:
+        return int(key.split(":")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class _Throttle:
+    """Limita el ritmo a *rate* unidades por segundo (0 = sin límite)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.started = time.monotonic()
+        self.done = 0
+
+    async def __call__(self, n: int) -> None:
+        self.done += n
+        if self.rate > 0:
+            ahead = self.done / self.rate - (time.monotonic() - self.started)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+
+class Reconciler:
+    def __init__(self, *, redis=None, session_factory=None, settings=None, dry_run: bool = False):
+        settings = settings or get_settings()
+        if session_factory is None:
+            from backend.database.connection import SessionLocal
+            session_factory = SessionLocal
+        self.redis = redis or get_redis()
+        self.session_factory = session_factory
+        self.batch_size = settings.RECONCILE_BATCH_SIZE
+        self.throttle = _Throttle(settings.RECONCILE_MAX_KEYS_PER_S)
+        self.dry_run = dry_run
+
+    async def _existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        from backend.database.models import Ticket
+
+        async with self.session_factory() as session:
+            result = await session.execute(select(Ticket.id).where(Ticket.id.in_(list(ids))))
+            return set(result.scalars())
+
+    async def _unlink_orphans(self, keys: List) -> int:
+        # Varias keys por ticket: emb:ticket:<id> y sus trozos emb:ticket:<id>:<n>
+        by_id: Dict[int, List] = {}
+        for key in keys:
+            ticket_id = ticket_id_from_key(key)
+            if ticket_id is not None:
+                by_id.setdefault(ticket_id, []).append(key)
+        existing = await self._existing_ids(by_id) if by_id else set()
+        orphans = [k for ticket_id, ks in by_id.items() if ticket_id not in existing for k in ks]
+        if orphans and not self.dry_run:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in orphans:
+                pipe.unlink(key)
+            await pipe.execute()
+            await bump_search_generation()
+        await self.throttle(len(keys))
+        return len(orphans)
+
+    async def remove_orphans(self) -> Dict[str, int]:
+        scanned = orphans = 0
+        batch: List = []
+        async for key in self.redis.scan_iter(match=KEY_PATTERN, count=self.batch_size):
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                orphans += await self._unlink_orphans(batch)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            orphans += await self._unlink_orphans(batch)
+            scanned += len(batch)
+        return {"scanned": scanned, "orphans": orphans}
+
+    async def enqueue_missing(self) -> Dict[str, int]:
+        from backend.database.models import Ticket
+
+        checked = missing = 0
+        last_id = 0
+        while True:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(Ticket.id).where(Ticket.id > last_id).order_by(Ticket.id).limit(self.batch_size)
+                )
+                ids = list(result.scalars())
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            pipe = self.redis.pipeline(transaction=False)
+            for ticket_id in ids:
+                pipe.exists(f"emb:ticket:{ticket_id}")
+            absent = [i for i, found in zip(ids, await pipe.execute()) if not found]
+            if absent and not self.dry_run:
+                await enqueue_tickets(absent, redis=self.redis)
+            checked += len(ids)
+            missing += len(absent)
+            await self.throttle(len(ids))
+        return {"checked": checked, "missing": missing}
+
+    async def run(self) -> Dict[str, int]:
+        started = time.monotonic()
+        stats = {**await self.remove_orphans(), **await self.enqueue_missing()}
+        logger.info(
+            "Reconciliación%s: %s vectores revisados, %s huérfanos borrados, "
+            "%s tickets sin vector encolados (%.1fs)",
+            " (dry-run)" if self.dry_run else "", stats["scanned"], stats["orphans"],
+            stats["missing"], time.monotonic() - started,
+        )
+        return stats
+
+
+# ───────── Tarea periódica en la app ─────────
+_task: Optional[asyncio.Task] = None
+
+
+async def _periodic(interval_s: float) -> None:
+    redis = get_redis()
+    while True:
+        try:
+            # Un solo worker/réplica por intervalo; el lock caduca solo
+            if await redis.set(LOCK, "1", nx=True, ex=max(int(interval_s), 1)):
+                await Reconciler(redis=redis).run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Reconciliación fallida: %s", e)
+        await asyncio.sleep(interval_s)
+
+
+async def start_reconciler() -> None:
+    global _task
+    interval_s = get_settings().RECONCILE_INTERVAL_S
+    if interval_s > 0 and _task is None:
+        _task = asyncio.create_task(_periodic(interval_s))
+
+
+async def stop_reconciler() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
@@ -1,20 +1,184 @@
 # backend/embeddings/service.py
 
+import hashlib
+import json
+import logging
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
-from backend.embeddings.openai_client import client, DEPLOY
+from backend.embeddings.openai_client import get_batcher, model_key
+from backend.embeddings.cache import get_embedding_cache
+from backend.config.settings import get_settings
+from backend.embeddings.chunking import chunk_key, ticket_chunks
+from backend.search.cache import bump_search_generation
 from backend.utils.ticket_to_text import ticket_to_text
-from backend.utils.redis_client import add_embedding
+from backend.utils.vector_store import (
+    add_embedding, add_embeddings, delete_embeddings, get_meta_field, update_meta,
+)
 
 load_dotenv(override=True)
 
-async def embed_and_store(key: str, ticket: dict, **meta):
-    text = ticket_to_text(ticket)
-    resp = await client.embeddings.create(
-        model=DEPLOY,
-        input=text
+logger = logging.getLogger(__name__)
+
+async def embed_texts(texts: List[str], direct: bool = False) -> List[List[float]]:
+    """
+    Embeddings de varios textos en orden. Los aciertos salen de la caché
+    (LRU local → Redis); los fallos se envían juntos por el batcher, que
+    los agrupa con las peticiones concurrentes en una sola llamada.
+    direct=True envía todos los fallos en una sola llamada propia, sin
+    partirlos en lotes de EMBEDDING_BATCH_MAX_SIZE (búsquedas en bloque).
+    """
+    cache = get_embedding_cache()
+    model = model_key(get_batcher().dimensions)
+    vectors: List[Optional[List[float]]] = (
+        await cache.get_many(model, texts) if cache is not None else [None] * len(texts)
     )
-    vector = resp.data[0].embedding
-    add_embedding(key, vector, **meta)
+
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        batcher = get_batcher()
+        embed = batcher.embed_all if direct else batcher.embed_many
+        fresh = await embed([texts[i] for i in missing])      # normalizada sólo la clave de caché
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+        if cache is not None:
+            await cache.set_many(model, [texts[i] for i in missing], fresh)
+    return vectors
+
+async def embed_text(text: str) -> List[float]:
+    """Embedding de un solo texto (ver embed_texts)."""
+    return (await embed_texts([text]))[0]
+
+async def embed_and_store(key: str, ticket: dict | str | None = None, *, text: Optional[str] = None, **meta):
+    # Acepta un ticket (dict), un texto posicional o text=... explícito
+    if text is None:
+        text = ticket if isinstance(ticket, str) else ticket_to_text(ticket or {})
+    vector = await embed_text(text)
+    await add_embedding(key, vector, **meta)
     return vector
 
+def ticket_key(ticket_id) -> str:
+    return chunk_key(ticket_id, 0)
+
+def ticket_payload(ticket: dict) -> dict:
+    """
+    Lo necesario para pintar un resultado de búsqueda sin ir a Postgres.
+    Se guarda (JSON, sin indexar) en cada trozo y se devuelve con RETURN.
+    """
+    limit = get_settings().SEARCH_PAYLOAD_DESCRIPTION_CHARS
+    description = ticket.get("Description") or ""
+    return {
+        "id": ticket["id"],
+        "TicketNumber": ticket.get("TicketNumber"),
+        "ShortDescription": ticket.get("ShortDescription"),
+        "Status": ticket.get("Status"),
+        "Priority": ticket.get("Priority"),
+        "Description": description[:limit].rstrip() + ("…" if len(description) > limit else ""),
+    }
+
+def ticket_meta(ticket: dict) -> dict:
+    """Campos de filtro (TAG) que acompañan al vector de un ticket."""
+    return {
+        "ticket_id": ticket["id"],
+        "status": ticket.get("Status") or "",
+        # TEXT (BM25) para la búsqueda híbrida
+        "TicketNumber": ticket.get("TicketNumber") or "",
+        "ShortDescription": ticket.get("ShortDescription") or "",
+        "Description": ticket.get("Description") or "",
+        "hit_json": json.dumps(ticket_payload(ticket), ensure_ascii=False),
+    }
+
+# Campos del flujo de trabajo: cambian a menudo y no alteran el significado
+# del ticket. Se excluyen de la huella; el filtro por status usa el TAG.
+VOLATILE_FIELDS = ("Status", "AssignedTo", "AssignmentGroup")
+
+def chunk_meta(ticket: dict, n: int) -> dict:
+    """Trozos 1…n: TAG y payload (los campos TEXT van una vez, en el trozo 0)."""
+    return {
+        "ticket_id": ticket["id"],
+        "status": ticket.get("Status") or "",
+        "chunk": n,
+        "hit_json": json.dumps(ticket_payload(ticket), ensure_ascii=False),
+    }
+
+def text_hash(ticket: dict, n_chunks: int = 1) -> str:
+    """
+    Huella de ticket_to_text sin los campos volátiles, con modelo y
+    dimensión (si cambian, ya no coincide y se re-embebe). Si el ticket va
+    troceado, también los parámetros del troceado.
+    """
+    stable = ticket_to_text({**ticket, **{f: "" for f in VOLATILE_FIELDS}})
+    raw = f"{model_key(get_batcher().dimensions)}\n{stable}"
+    if n_chunks > 1:
+        settings = get_settings()
+        raw = f"{settings.EMBEDDING_CHUNK_TOKENS}/{settings.EMBEDDING_CHUNK_OVERLAP}/{settings.EMBEDDING_MAX_CHUNKS}\n{raw}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _ticket_entries(ticket: dict, chunks: List[str], vectors, digest: str) -> list:
+    head = {**ticket_meta(ticket), "text_hash": digest, "chunks": len(chunks)}
+    return [
+        (chunk_key(ticket["id"], n), vector, head if n == 0 else chunk_meta(ticket, n))
+        for n, vector in enumerate(vectors)
+    ]
+
+async def embed_tickets(tickets: List[dict], embed=embed_texts, force: bool = False) -> int:
+    """
+    Embebe varios tickets (dicts de ticket_to_dict) en una sola llamada y
+    los guarda en Redis con un pipeline. *embed* permite a procesos masivos
+    (backfill) usar su propia estrategia de lotes y reintentos.
+
+    Las descripciones largas se trocean (chunking.py): todos los trozos de
+    todos los tickets van en esa misma llamada.
+
+    Sólo se re-embeben los tickets cuyo texto cambió (text_hash guardado
+    junto al vector); si sólo cambiaron campos volátiles (status…) se
+    actualizan los metadatos en su sitio, sin llamar a la API.
+    force=True re-embebe todos.
+    Devuelve cuántos se re-embebieron.
+    """
+    if not tickets:
+        return 0
+    keys = [ticket_key(t["id"]) for t in tickets]
+    chunks = [ticket_chunks(t) for t in tickets]
+    hashes = [text_hash(t, len(c)) for t, c in zip(tickets, chunks)]
+    stored = [None] * len(keys) if force else await get_meta_field(keys, "text_hash")
+
+    changed = [i for i in range(len(tickets)) if stored[i] != hashes[i]]
+    unchanged = [i for i in range(len(tickets)) if stored[i] == hashes[i]]
+    if changed:
+        vectors = await embed([text for i in changed for text in chunks[i]])
+        entries, offset = [], 0
+        for i in changed:
+            n = len(chunks[i])
+            entries += _ticket_entries(tickets[i], chunks[i], vectors[offset:offset + n], hashes[i])
+            offset += n
+        old_counts = await get_meta_field([keys[i] for i in changed], "chunks")
+        await add_embeddings(entries)
+        # Trozos sobrantes si la descripción se acortó
+        stale = [
+            chunk_key(tickets[i]["id"], n)
+            for i, old in zip(changed, old_counts)
+            for n in range(len(chunks[i]), int(old or 1))
+        ]
+        if stale:
+            await delete_embeddings(stale)
+    if unchanged:
+        await update_meta([
+            (chunk_key(tickets[i]["id"], n), ticket_meta(tickets[i]) if n == 0 else chunk_meta(tickets[i], n))
+            for i in unchanged
+            for n in range(len(chunks[i]))
+        ])
+    await bump_search_generation()              # los vectores/metadatos cambiaron
+    logger.debug("%s tickets re-embebidos, %s sólo metadatos", len(changed), len(unchanged))
+    return len(changed)
+
+async def delete_ticket_embeddings(ticket_ids: List[int]) -> None:
+    """Borra todos los vectores (trozos incluidos) de los tickets."""
+    keys = [ticket_key(i) for i in ticket_ids]
+    counts = await get_meta_field(keys, "chunks")
+    await delete_embeddings([
+        chunk_key(ticket_id, n)
+        for ticket_id, count in zip(ticket_ids, counts)
+        for n in range(int(count or 1))
+    ])
+    await bump_search_generation()
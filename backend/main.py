@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from fastapi import Depends
 from backend.routes.twilio_voice import router as twilio_router
 from backend.routes.audio import router as audio_router
@@ -13,7 +14,12 @@ from backend.routes.audio import router as audio_router
 import uvicorn
 
 from backend.config.settings import get_settings
-from backend.database.connection import init_db
+from backend.database.connection import init_db, pool_stats
+from backend.embeddings.queue import start_embedding_workers, stop_embedding_workers
+from backend.embeddings.reconcile import start_reconciler, stop_reconciler
+from backend.utils.http_clients import close_http_clients, start_http_clients
+from backend.utils.redis_client import close_redis
+from backend.utils.vector_index import ensure_index, start_index_upgrade, stop_index_upgrade
 from backend.routes import tickets
 from backend.logging_config import setup_logging
 from backend.auth.basic_auth import verify_basic_auth
@@ -48,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -64,11 +71,22 @@ app.include_router(jwt_auth.router)
 async def startup_event():
     """Initialize database connection on startup"""
     await init_db()
+    await start_http_clients()
+    if settings.VECTOR_BACKEND.lower() == "redis":
+        await ensure_index()
+        await start_index_upgrade()            # versión antigua ⇒ se migra sin bloquear el arranque
+        await start_reconciler()
+    if settings.EMBEDDING_WORKERS_IN_APP:
+        await start_embedding_workers()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    pass
+    await stop_embedding_workers()
+    await stop_index_upgrade()
+    await stop_reconciler()
+    await close_http_clients()
+    await close_redis()
 
 @app.get("/")
 async def root():
@@ -84,6 +102,20 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def db_pool_health():
+    """Estado y métricas del pool de PostgreSQL de este worker."""
+    return pool_stats()
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request, exc):
+    """Pool agotado: 503 inmediato en vez de encolar la request."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Base de datos saturada, intente de nuevo"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.get("/protected")
 def protected_route(username: str = Depends(verify_basic_auth)):
     return {"message": f"¡Hola {username}! Tienes acceso protegido."}
@@ -3,8 +3,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
-from backend.embeddings.service import embed_and_store      # 👈
-from backend.utils.redis_client import get_vector, knn_search
+from backend.embeddings.queue import queue_stats
+from backend.embeddings.service import embed_and_store, embed_text      # 👈
+from backend.embeddings.cache import get_embedding_cache
+from backend.utils.vector_store import get_vector, knn_search
 
 router = APIRouter(prefix="/api/embeddings")
 
@@ -40,15 +42,36 @@ async def search_embeddings(body: SearchIn):
     Búsqueda semántica sobre los embeddings almacenados.
     """
     filters = {"status": body.status} if body.status else {}
-    hits = await knn_search(body.q, body.k, **filters)
+    qvec = await embed_text(body.q)
+    hits = await knn_search(qvec, body.k, **filters)
     if not hits:
         raise HTTPException(404, "Sin resultados encontrados")
     return {"matches": hits}
 
-# ---------- 4. Obtener embedding -------------------------------------------------
+# ---------- 4. Estadísticas de la caché -----------------------------------------
+@router.get("/_cache/stats")
+async def embedding_cache_stats():
+    """
+    Aciertos/fallos de la caché de embeddings (para dimensionarla).
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **(await cache.stats())}
+
+# ---------- 5. Estado de la cola de embeddings ---------------------------------
+@router.get("/_queue/stats")
+async def embedding_queue_stats():
+    """
+    Mensajes en cola, leídos sin confirmar, en reintento y en la DLQ.
+    """
+    return await queue_stats()
+
+# ---------- 6. Obtener embedding -------------------------------------------------
+# Va al final: /{emb_id} capturaría las rutas fijas (/_queue/stats) declaradas después
 @router.get("/{emb_id}")
-def read_embedding(emb_id: str):
-    vec = get_vector(emb_id)
+async def read_embedding(emb_id: str):
+    vec = await get_vector(emb_id)
     if vec is None:
         raise HTTPException(404, "Embedding no encontrado")
     return {"id": emb_id, "vector": vec[:10]}  # sólo una muestra
@@ -1,25 +1,76 @@
-from typing import Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config.settings import get_settings
 from backend.database.connection import get_session   # 💾 inyecta sesión
-from backend.search.service import knn_search
+from backend.search.cache import get_search_cache
+from backend.search.service import batch_knn_search, knn_search
 
 router = APIRouter()
 
+MAX_K = 50              # tope de resultados por consulta (GET /search y _batch)
+
 @router.get("/search", summary="Búsqueda semántica K-NN")
 async def semantic_search(
     q: str = Query(..., min_length=3, description="Texto a buscar"),
-    k: int = 5,
+    k: int = Query(5, ge=1, le=MAX_K),
     status: Optional[str] = None,
+    mode: Literal["vector", "hybrid"] = "vector",
+    hydrate: bool = Query(False, description="Ticket completo desde PostgreSQL"),
     session: AsyncSession = Depends(get_session),      # 👈 pasa sesión
 ):
     """
     Embebe *q*, consulta RediSearch y devuelve los *k* vecinos más
     cercanos.  Si se indica `status`, filtra por esa etiqueta.
+    Con `mode=hybrid` combina BM25 (número de ticket, título, descripción)
+    y K-NN mediante Reciprocal Rank Fusion.
+    Cada resultado trae el resumen del ticket guardado junto al vector;
+    con `hydrate=true` se devuelve el ticket completo de la base de datos.
     """
     filters = {"status": status} if status else {}
-    hits = await knn_search(q, k, session=session, **filters)
+    hits = await knn_search(q, k, session=session, mode=mode, hydrate=hydrate, **filters)
     return hits
 
+
+class BatchQueryIn(BaseModel):
+    q: str = Field(..., min_length=3, example="no funciona la VPN")
+    k: int = Field(5, ge=1, le=MAX_K)
+    status: Optional[str] = None
+    mode: Literal["vector", "hybrid"] = "vector"
+
+
+class BatchSearchIn(BaseModel):
+    queries: List[BatchQueryIn]
+    hydrate: bool = False
+
+
+@router.post("/search/_batch", summary="Búsqueda semántica de varias consultas")
+async def semantic_search_batch(
+    body: BatchSearchIn,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Igual que GET /search para cada consulta, pero todas juntas: una sola
+    llamada de embeddings, un pipeline de RediSearch y una consulta a
+    PostgreSQL para todo el lote. Devuelve `results` en el orden de entrada.
+    """
+    limit = get_settings().SEARCH_BATCH_MAX_QUERIES
+    if len(body.queries) > limit:
+        raise HTTPException(413, f"Máximo {limit} consultas por lote")
+    queries = [
+        {"text": q.q, "k": q.k, "mode": q.mode, "filters": {"status": q.status} if q.status else {}}
+        for q in body.queries
+    ]
+    results = await batch_knn_search(queries, session=session, hydrate=body.hydrate)
+    return {"results": results}
+
+
+@router.get("/search/_cache/stats", summary="Estadísticas de la caché de búsqueda")
+async def search_cache_stats():
+    cache = get_search_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
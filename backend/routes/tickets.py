@@ -1,15 +1,26 @@
 # backend/routes/tickets.py
-from typing import List
+import base64
+import csv
+import datetime
+import io
+import json
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from backend.auth.basic_auth import verify_basic_auth
-from backend.database.connection import get_session
+from backend.database.connection import SessionLocal, get_session
 from backend.database.models import Ticket
-from backend.embeddings.service import embed_and_store
+from backend.database.ticket_numbers import next_ticket_number
+from backend.embeddings.queue import enqueue_tickets
+from backend.embeddings.service import delete_ticket_embeddings
 from backend.schemas.ticket import TicketCreate, TicketUpdate, TicketOut
+from backend.search.cache import bump_search_generation
 
 import logging
 logger = logging.getLogger(__name__)
@@ -22,6 +33,102 @@ router = APIRouter(
 # ---------------------------------------------------------------------------
 
 
+# ---------------------------------------------------------------------------
+# Filtros, orden y cursor (compartidos por listado y exportación)
+# ---------------------------------------------------------------------------
+SORT_COLUMNS = {
+    "created_at":    Ticket.created_at,
+    "id":            Ticket.id,
+    "ticket_number": Ticket.TicketNumber,
+}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def ticket_filters(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignment_group: Optional[str] = None,
+    company: Optional[str] = None,
+    created_from: Optional[datetime.datetime] = None,
+    created_to: Optional[datetime.datetime] = None,
+) -> dict:
+    return {
+        "status": status,
+        "priority": priority,
+        "assignment_group": assignment_group,
+        "company": company,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+
+
+def apply_ticket_filters(stmt, filters: dict):
+    if filters["status"]:
+        stmt = stmt.where(Ticket.Status == filters["status"])
+    if filters["priority"]:
+        stmt = stmt.where(Ticket.Priority == filters["priority"])
+    if filters["assignment_group"]:
+        stmt = stmt.where(Ticket.AssignmentGroup == filters["assignment_group"])
+    if filters["company"]:
+        stmt = stmt.where(Ticket.Company == filters["company"])
+    if filters["created_from"]:
+        stmt = stmt.where(Ticket.created_at >= filters["created_from"])
+    if filters["created_to"]:
+        stmt = stmt.where(Ticket.created_at < filters["created_to"])
+    return stmt
+
+
+# Tipo JSON del valor del cursor para cada orden (created_at va en ISO 8601)
+CURSOR_TYPES = {"created_at": str, "id": int, "ticket_number": str}
+
+
+def encode_cursor(value, ticket_id: int, sort: str) -> str:
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, ticket_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_json_type(value, expected: type) -> bool:
+    return isinstance(value, expected) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: str, sort: str):
+    """
+    (valor, id) del cursor. 400 si está mal formado, si es de otro `sort`
+    o si el valor no es del tipo de la columna (nunca llega a la consulta).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, ticket_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="El cursor es de otro orden (sort)")
+        if not _is_json_type(value, CURSOR_TYPES[sort]) or not _is_json_type(ticket_id, int):
+            raise ValueError(value)
+        if sort == "created_at":
+            value = datetime.datetime.fromisoformat(value)
+        return value, ticket_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+async def _enqueue_embedding(ticket_id: int) -> None:
+    """El ticket ya está guardado: un fallo de Redis no debe tumbar la request."""
+    try:
+        await enqueue_tickets([ticket_id])
+    except Exception as e:
+        logger.error("No se pudo encolar el embedding del ticket %s: %s", ticket_id, e)
+
+
+async def _delete_embedding(ticket_id: int) -> None:
+    """Si falla, el vector queda huérfano hasta la siguiente reconciliación."""
+    try:
+        await delete_ticket_embeddings([ticket_id])
+    except Exception as e:
+        logger.error("No se pudo borrar el vector del ticket %s: %s", ticket_id, e)
+
+
 # ╔═════════════════════════════════════════════════════════════════════════╗
 # ║ 1. LISTAR TICKETS                                                      ║
 # ╚═════════════════════════════════════════════════════════════════════════╝
@@ -31,15 +138,122 @@ router = APIRouter(
     response_model_by_alias=True,
     summary="Listar tickets"
 )
-async def list_tickets(session: AsyncSession = Depends(get_session)):
+async def list_tickets(
+    response: Response,
+    filters: dict = Depends(ticket_filters),
+    sort: Literal["created_at", "id", "ticket_number"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Página de tickets filtrada y ordenada con paginación por cursor (keyset):
+    el cursor de la siguiente página viaja en la cabecera `X-Next-Cursor`.
+    """
     logger.info("Solicitud recibida: listar tickets")
-    result = await session.execute(select(Ticket))
+    column = SORT_COLUMNS[sort]
+    stmt = apply_ticket_filters(select(Ticket), filters)
+
+    # Keyset: (columna, id) como desempate ⇒ coste constante por página
+    if cursor:
+        key = tuple_(column, Ticket.id)
+        after = decode_cursor(cursor, sort)
+        stmt = stmt.where(key < after if order == "desc" else key > after)
+    if order == "desc":
+        stmt = stmt.order_by(column.desc(), Ticket.id.desc())
+    else:
+        stmt = stmt.order_by(column.asc(), Ticket.id.asc())
+
+    result = await session.execute(stmt.limit(limit + 1))
     tickets = result.scalars().all()
-    logger.info("Se encontraron %s tickets", len(tickets))
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(getattr(last, column.key), last.id, sort)
+    logger.info("Se devolvieron %s tickets", len(tickets))
     # ─▶ devolvemos objetos SQLAlchemy; FastAPI + Pydantic hacen la magia
     return tickets
 
 
+# ╔═════════════════════════════════════════════════════════════════════════╗
+# ║ 1b. EXPORTAR TICKETS (NDJSON / CSV en streaming)                       ║
+# ╚═════════════════════════════════════════════════════════════════════════╝
+# Columnas con los mismos nombres que TicketOut (alias PascalCase)
+EXPORT_COLUMNS = [
+    Ticket.id.label("id"),
+    Ticket.TicketNumber.label("TicketNumber"),
+    Ticket.Folio.label("Folio"),
+    Ticket.ShortDescription.label("ShortDescription"),
+    Ticket.Description.label("Description"),
+    Ticket.CreatedBy.label("CreatedBy"),
+    Ticket.Company.label("Company"),
+    Ticket.ReportedBy.label("ReportedBy"),
+    Ticket.FirstCategory.label("Category"),
+    Ticket.FirstSubcategory.label("Subcategory"),
+    Ticket.Severity.label("Severity"),
+    Ticket.Impact.label("Impact"),
+    Ticket.Urgency.label("Urgency"),
+    Ticket.Priority.label("Priority"),
+    Ticket.Status.label("Status"),
+    Ticket.Workflow.label("Workflow"),
+    Ticket.Channel.label("Channel"),
+    Ticket.AssignmentGroup.label("AssignmentGroup"),
+    Ticket.AssignedTo.label("AssignedTo"),
+    Ticket.created_at.label("CreatedAt"),
+]
+EXPORT_CHUNK = 1000
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(row._mapping), default=str, ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow([c.name for c in EXPORT_COLUMNS])
+    writer.writerows(tuple(row) for row in rows)
+    return buf.getvalue()
+
+
+async def stream_tickets(filters: dict, fmt: str):
+    """
+    Genera el export por bloques de EXPORT_CHUNK filas leídas con un cursor
+    de servidor: la memoria no depende del número de tickets exportados.
+    La sesión es propia porque el generador vive más que la request.
+    """
+    stmt = (
+        apply_ticket_filters(select(*EXPORT_COLUMNS), filters)
+        .order_by(Ticket.id)
+        .execution_options(yield_per=EXPORT_CHUNK)
+    )
+    if fmt == "csv":
+        yield _csv_chunk([], header=True)
+    async with SessionLocal() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions(EXPORT_CHUNK):
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
+
+
+@router.get("/export", summary="Exportar tickets (NDJSON o CSV)")
+async def export_tickets(
+    filters: dict = Depends(ticket_filters),
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    logger.info("Exportando tickets en %s con filtros %s", format, filters)
+    filename = f"tickets.{format}"
+    return StreamingResponse(
+        stream_tickets(filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ╔═════════════════════════════════════════════════════════════════════════╗
 # ║ 2. OBTENER TICKET POR ID                                               ║
 # ╚═════════════════════════════════════════════════════════════════════════╝
@@ -71,12 +285,8 @@ async def create_ticket(
     session: AsyncSession = Depends(get_session),
     #auth: None = Depends(verify_basic_auth)
 ):
-    # 1️⃣  Genera TicketNumber si el cliente no envía uno
-    import datetime, secrets
-    ticket_number = (
-        ticket.ticket_number
-        or f"INC-{datetime.datetime.utcnow().strftime('%y%m%d%H%M%S')}-{secrets.randbelow(100)}"
-    )
+    # 1️⃣  Genera TicketNumber si el cliente no envía uno (secuencia, sin colisiones)
+    ticket_number = ticket.ticket_number or await next_ticket_number(session)
 
     # 2️⃣  Crea la instancia SQLAlchemy (usa snake_case del modelo)
     new_ticket = Ticket(
@@ -102,19 +312,19 @@ async def create_ticket(
 
     # 3️⃣  Guarda en BD
     session.add(new_ticket)
-    await session.commit()
-    await session.refresh(new_ticket)
-
-    # 4️⃣  Opcional: genera embedding
     try:
-        await embed_and_store(
-            key       = f"ticket:{new_ticket.id}",
-            text      = new_ticket.ShortDescription,
-            ticket_id = new_ticket.id,
-            status    = new_ticket.Status
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un ticket con TicketNumber {ticket_number}",
         )
-    except Exception as e:
-        logger.error("Embedding error: %s", e)
+    await session.refresh(new_ticket)
+
+    # 4️⃣  Encola el embedding (vector + tags + campos BM25); lo hacen los workers
+    await bump_search_generation()
+    await _enqueue_embedding(new_ticket.id)
 
     return new_ticket
 
@@ -144,6 +354,8 @@ async def update_ticket(
 
     await session.commit()
     await session.refresh(db_ticket)
+    await bump_search_generation()
+    await _enqueue_embedding(db_ticket.id)
     return db_ticket
 
 
@@ -162,4 +374,6 @@ async def delete_ticket(ticket_id: int, session: AsyncSession = Depends(get_sess
 
     await session.delete(db_ticket)
     await session.commit()
+    await _delete_embedding(ticket_id)
+    await bump_search_generation()
     return  # 204 → sin cuerpo
@@ -1,25 +1,55 @@
 #Backend/routes/twilio_voice.py
+import asyncio
 import re
-from fastapi import APIRouter, Request, status
-from fastapi.responses import Response
+import httpx
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from twilio.twiml.voice_response import VoiceResponse, Gather
 
 from backend.services.ticket_service import (
     handle_ticket_query,
     search_ticket_by_number,
-    synthesize_speech,
+    speech_url,
+    prefetch_speech,
+    open_speech_stream,
     PUBLIC_BASE_URL,
 )
+from backend.services.tts_cache import get_tts_cache
 
 import logging
 
 router = APIRouter(prefix="/webhooks/twilio")
 logger = logging.getLogger("twilio_voice")
 
-WELCOME_AUDIO_URL = None
-MENU_AFTER_TICKET_AUDIO_URL = None
-INVALID_OPTION_AUDIO_URL = None
-GOODBYE_AUDIO_URL = None
+# Los prompts fijos salen de la caché TTS (ticket_service.speech_url):
+# tras la primera síntesis cada uno cuesta un stat(), sin llamar a ElevenLabs.
+WELCOME_TEXT = (
+    "Hola. Bienvenido al sistema de soporte. "
+    "Presione uno para ingresar el número de ticket con el teclado, "
+    "o presione dos para describir su problema con su voz."
+)
+MENU_AFTER_TICKET_TEXT = (
+    "Presione uno para ingresar otro número de ticket, "
+    "presione dos para describir otro problema, "
+    "o presione tres para finalizar la llamada."
+)
+INVALID_OPTION_TEXT = (
+    "Opción no válida. Presione uno para ingresar número de ticket, "
+    "dos para describir su problema, o tres para finalizar la llamada."
+)
+GOODBYE_TEXT = "Gracias por utilizar nuestro sistema de soporte. Hasta pronto."
+NO_INPUT_TEXT = "No se detectó ninguna entrada. Gracias por llamar."
+ENTER_TICKET_TEXT = "Por favor, ingrese su número de ticket usando el teclado."
+DESCRIBE_PROBLEM_TEXT = "Describa a continuación brevemente su problema."
+NOT_FOUND_TEXT = "No encontramos un ticket con ese número. Por favor verifique e intente nuevamente."
+NO_SPEECH_TEXT = "No se detectó ningún mensaje. Intente nuevamente."
+
+# Lo que el llamante probablemente oirá en el siguiente webhook; se
+# pre-sintetiza en segundo plano (ticket_service.prefetch_speech, con
+# presupuesto acotado) para que esa respuesta salga de la caché.
+NEXT_AFTER_MENU = (ENTER_TICKET_TEXT, DESCRIBE_PROBLEM_TEXT, INVALID_OPTION_TEXT, GOODBYE_TEXT)
+NEXT_AFTER_ENTER_TICKET = (MENU_AFTER_TICKET_TEXT, NOT_FOUND_TEXT)
+NEXT_AFTER_DESCRIBE = (MENU_AFTER_TICKET_TEXT, NO_SPEECH_TEXT)
 
 
 # ---------------------------
@@ -31,18 +61,14 @@ async def handle_call(request: Request):
     Responde a la llamada con mensaje de bienvenida.
     Solo ofrece opciones 1 y 2 al inicio.
     """
-    global WELCOME_AUDIO_URL
-
-    if not WELCOME_AUDIO_URL:
-        welcome_text = (
-            "Hola. Bienvenido al sistema de soporte. "
-            "Presione uno para ingresar el número de ticket con el teclado, "
-            "o presione dos para describir su problema con su voz."
-        )
-        WELCOME_AUDIO_URL = await synthesize_speech(welcome_text)
+    # Prompts independientes: se sintetizan a la vez
+    welcome_url, no_input_url = await asyncio.gather(
+        speech_url(WELCOME_TEXT), speech_url(NO_INPUT_TEXT)
+    )
+    prefetch_speech(*NEXT_AFTER_MENU)
 
     vr = VoiceResponse()
-    vr.play(WELCOME_AUDIO_URL)
+    vr.play(welcome_url)
 
     gather = Gather(
         num_digits=1,
@@ -52,10 +78,7 @@ async def handle_call(request: Request):
     )
     vr.append(gather)
 
-    fallback_audio_url = await synthesize_speech(
-        "No se detectó ninguna entrada. Gracias por llamar."
-    )
-    vr.play(fallback_audio_url)
+    vr.play(no_input_url)
     vr.hangup()
     return Response(content=str(vr), media_type="application/xml")
 
@@ -71,8 +94,6 @@ async def handle_menu_choice(request: Request):
     2 = describir problema
     3 = finalizar llamada
     """
-    global INVALID_OPTION_AUDIO_URL, GOODBYE_AUDIO_URL
-
     data = await request.form()
     choice = data.get("Digits", "").strip()
 
@@ -88,15 +109,15 @@ async def handle_menu_choice(request: Request):
             num_digits=20,
             language="es-MX",
         )
-        vr_text = "Por favor, ingrese su número de ticket usando el teclado."
-        audio_url = await synthesize_speech(vr_text)
+        audio_url = await speech_url(ENTER_TICKET_TEXT)
+        prefetch_speech(*NEXT_AFTER_ENTER_TICKET)
         twiml.play(audio_url)
         twiml.append(gather)
 
     elif choice == "2":
         # Fluir hacia el dictado de problema (embeddings)
-        vr_text = "Describa a continuación brevemente su problema."
-        audio_url = await synthesize_speech(vr_text)
+        audio_url = await speech_url(DESCRIBE_PROBLEM_TEXT)
+        prefetch_speech(*NEXT_AFTER_DESCRIBE)
         twiml.play(audio_url)
         gather = Gather(
             input="speech",
@@ -108,20 +129,12 @@ async def handle_menu_choice(request: Request):
         twiml.append(gather)
 
     elif choice == "3":
-        if not GOODBYE_AUDIO_URL:
-            goodbye_text = "Gracias por utilizar nuestro sistema de soporte. Hasta pronto."
-            GOODBYE_AUDIO_URL = await synthesize_speech(goodbye_text)
-        twiml.play(GOODBYE_AUDIO_URL)
+        twiml.play(await speech_url(GOODBYE_TEXT))
         twiml.hangup()
 
     else:
-        if not INVALID_OPTION_AUDIO_URL:
-            invalid_text = (
-                "Opción no válida. Presione uno para ingresar número de ticket, "
-                "dos para describir su problema, o tres para finalizar la llamada."
-            )
-            INVALID_OPTION_AUDIO_URL = await synthesize_speech(invalid_text)
-        twiml.play(INVALID_OPTION_AUDIO_URL)
+        twiml.play(await speech_url(INVALID_OPTION_TEXT))
+        prefetch_speech(*NEXT_AFTER_MENU)
         twiml.redirect("/webhooks/twilio/voice/menu")
 
     return Response(content=str(twiml), media_type="application/xml")
@@ -144,6 +157,7 @@ async def process_input(request: Request):
         ticket_number = f"INC-{clean_digits}"
 
         ticket_info = await search_ticket_by_number(ticket_number)
+        respuesta = NOT_FOUND_TEXT
         if ticket_info:
             respuesta = (
                 f"El ticket {ticket_info['TicketNumber']} tiene el estado {ticket_info['Status']}, "
@@ -152,16 +166,14 @@ async def process_input(request: Request):
                 f"Descripción completa: {ticket_info['Description'] or 'No hay una descripción registrada para este ticket'}."
 
             )
-            audio_url = await synthesize_speech(respuesta)
-            twiml.play(audio_url)
-        else:
-            not_found_audio = await synthesize_speech(
-                "No encontramos un ticket con ese número. Por favor verifique e intente nuevamente."
-            )
-            twiml.play(not_found_audio)
+        # Respuesta y menú se sintetizan a la vez
+        audio_url, menu_url = await asyncio.gather(
+            speech_url(respuesta), speech_url(MENU_AFTER_TICKET_TEXT)
+        )
+        twiml.play(audio_url)
 
         # Después de dar info, mostrar menú extendido (1, 2, 3)
-        await add_post_ticket_menu(twiml)
+        add_post_ticket_menu(twiml, menu_url)
 
     return Response(content=str(twiml), media_type="application/xml")
 
@@ -181,39 +193,30 @@ async def process_speech(request: Request):
     twiml = VoiceResponse()
 
     if not speech_text:
-        fallback_audio_url = await synthesize_speech(
-            "No se detectó ningún mensaje. Intente nuevamente."
-        )
-        twiml.play(fallback_audio_url)
+        twiml.play(await speech_url(NO_SPEECH_TEXT))
         twiml.redirect("/webhooks/twilio/voice/menu")
         return Response(content=str(twiml), media_type="application/xml")
 
-    audio_url = await handle_ticket_query(speech_text, from_number)
+    # La búsqueda + su audio y el audio del menú van en paralelo
+    audio_url, menu_url = await asyncio.gather(
+        handle_ticket_query(speech_text, from_number), speech_url(MENU_AFTER_TICKET_TEXT)
+    )
     twiml.play(audio_url)
 
     # Después de dar info, mostrar menú extendido (1, 2, 3)
-    await add_post_ticket_menu(twiml)
+    add_post_ticket_menu(twiml, menu_url)
     return Response(content=str(twiml), media_type="application/xml")
 
 
 # ---------------------------
 # Menú extendido después de un ticket
 # ---------------------------
-async def add_post_ticket_menu(twiml: VoiceResponse):
+def add_post_ticket_menu(twiml: VoiceResponse, menu_url: str):
     """
     Añade un menú extendido (1, 2, 3) para continuar o salir.
     """
-    global MENU_AFTER_TICKET_AUDIO_URL, GOODBYE_AUDIO_URL
-
-    if not MENU_AFTER_TICKET_AUDIO_URL:
-        menu_text = (
-            "Presione uno para ingresar otro número de ticket, "
-            "presione dos para describir otro problema, "
-            "o presione tres para finalizar la llamada."
-        )
-        MENU_AFTER_TICKET_AUDIO_URL = await synthesize_speech(menu_text)
-
-    twiml.play(MENU_AFTER_TICKET_AUDIO_URL)
+    twiml.play(menu_url)
+    prefetch_speech(*NEXT_AFTER_MENU)
 
     gather = Gather(
         num_digits=1,
@@ -224,9 +227,28 @@ async def add_post_ticket_menu(twiml: VoiceResponse):
     twiml.append(gather)
 
 
-
-
-
-
-
-
+# ---------------------------
+# Proxy de TTS en streaming (TTS_STREAMING)
+# ---------------------------
+@router.get("/voice/tts/{key}.mp3")
+async def stream_tts(key: str):
+    """
+    Audio de un prompt para <Play>: desde disco si ya existe; si no, se
+    reenvía el stream de ElevenLabs por trozos (Twilio empieza a reproducir
+    con los primeros bytes) y se guarda en la caché para las repeticiones.
+    """
+    if not re.fullmatch(r"[0-9a-f]{64}", key):
+        raise HTTPException(404, "Audio no encontrado")
+
+    cache = get_tts_cache()
+    if cache.lookup(key):
+        return FileResponse(cache.path(key), media_type="audio/mpeg")
+
+    try:
+        chunks = await open_speech_stream(key)
+    except httpx.HTTPError as e:
+        logger.error("Error en streaming TTS: %s", e)
+        raise HTTPException(502, "Error al generar el audio")
+    if chunks is None:
+        raise HTTPException(404, "Audio no encontrado")
+    return StreamingResponse(chunks, media_type="audio/mpeg")
@@ -0,0 +1,148 @@
+# backend/search/cache.py
+"""
+Caché de resultados de búsqueda semántica (delante de service.knn_search).
+
+    clave = sha256(consulta con espacios normalizados, k, modo, filtros)
+    searchcache:<clave>  →  {"gen": n, "hits": [...]}   (TTL corto, compartida)
+    searchcache:gen      →  n (contador de generación)
+
+Cada escritura de tickets (alta, edición, borrado y la escritura del vector
+por el worker) incrementa la generación: una entrada guardada con otra
+generación ya no vale, así que ningún resultado sobrevive a una escritura.
+Generación y entrada se leen en un solo round trip.
+
+Los fallos concurrentes de la misma clave en el proceso comparten un único
+cálculo (single-flight), igual que tts_cache; si se cancela la petición que
+calcula, las que esperaban lo repiten en vez de heredar la cancelación.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from backend.embeddings.cache import normalize_text
+
+KEY_PREFIX = "searchcache:"
+GEN_KEY = "searchcache:gen"
+
+logger = logging.getLogger(__name__)
+
+
+def search_cache_key(text: str, k: int, mode: str, filters: Dict[str, Any], **variant) -> str:
+    raw = json.dumps(
+        # Sin casefold: el embedding se calcula con el texto tal cual (salvo
+        # espacios), así que otra capitalización puede dar otros vecinos
+        [normalize_text(text), k, mode, sorted(filters.items()), sorted(variant.items())],
+        ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    def __init__(self, redis, ttl_s: int = 30):
+        self.redis = redis
+        self.ttl_s = ttl_s
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _lookup(self, key: str):
+        """(generación vigente, hits en caché o None)."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(GEN_KEY)
+        pipe.get(KEY_PREFIX + key)
+        gen, raw = await pipe.execute()
+        gen = int(gen or 0)
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["gen"] == gen:
+                return gen, entry["hits"]
+        return gen, None
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise                              # cancelaron a este llamador
+                # cancelaron al que calculaba: se recalcula en vez de fallar
+                return await self.get_or_compute(key, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            hits = await self._get_or_compute(key, compute)
+            future.set_result(hits)
+        except asyncio.CancelledError:
+            future.cancel()                        # los que esperan recalculan
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()                     # evita "exception never retrieved"
+            raise
+        finally:
+            del self._inflight[key]
+        return hits
+
+    async def _get_or_compute(self, key: str, compute) -> List[dict]:
+        try:
+            gen, hits = await self._lookup(key)
+        except RedisError as e:
+            # Redis caído ⇒ la caché no debe tumbar la búsqueda
+            logger.warning("Search cache (Redis) no disponible: %s", e)
+            return await compute()
+        if hits is not None:
+            self.hits += 1
+            return hits
+
+        self.misses += 1
+        hits = await compute()
+        try:
+            # Con la generación leída ANTES de calcular: si hubo una escritura
+            # entretanto, la entrada nace ya invalidada
+            entry = json.dumps({"gen": gen, "hits": hits}, ensure_ascii=False, default=str)
+            await self.redis.set(KEY_PREFIX + key, entry, ex=self.ttl_s)
+        except RedisError as e:
+            logger.warning("Search cache (Redis) no disponible: %s", e)
+        return hits
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Instancia compartida por el proceso (None si está deshabilitada)."""
+    global _cache
+    if _cache is None:
+        from backend.config.settings import get_settings
+        from backend.utils.redis_client import get_redis
+
+        settings = get_settings()
+        if not settings.SEARCH_CACHE_ENABLED:
+            return None
+        _cache = SearchCache(redis=get_redis(), ttl_s=settings.SEARCH_CACHE_TTL_S)
+    return _cache
+
+
+async def bump_search_generation() -> None:
+    """Invalida toda la caché de búsqueda (llamar tras cada escritura de tickets)."""
+    cache = get_search_cache()
+    if cache is None:
+        return
+    try:
+        await cache.redis.incr(GEN_KEY)
+    except RedisError as e:
+        logger.warning("No se pudo invalidar la caché de búsqueda: %s", e)
@@ -1,83 +1,219 @@
 # backend/search/service.py
-import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Literal, Optional
 
-import numpy as np
-from redis.commands.search.query import Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from backend.embeddings.service import client
-from backend.utils.redis_client import redis_client
+from backend.config.settings import get_settings
+from backend.embeddings.chunking import chunk_ticket_id
+from backend.embeddings.service import embed_text, embed_texts, ticket_payload
+from backend.search.cache import get_search_cache, search_cache_key
+from backend.utils.ticket_to_text import ticket_to_dict
+from backend.utils.vector_store import batch_search, hybrid_search, knn_search as vector_knn
 from backend.database.models import Ticket            # modelo SQLAlchemy
 
-INDEX  = "embeddings_idx"
-DEPLOY = os.environ["AZURE_OPENAI_EMBEDDING_DEPLOYMENT"]
+RRF_K = 60              # constante estándar de Reciprocal Rank Fusion
+HYBRID_CANDIDATES = 4   # candidatos por lista = k × este factor (mín. 20)
 
-def to_binary(vec: List[float]) -> bytes:
-    return np.array(vec, dtype=np.float32).tobytes()
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], rrf_k: int = RRF_K) -> List[tuple]:
+    """
+    Fusiona varias listas ordenadas de keys: score(d) = Σ 1 / (rrf_k + rango).
+    Devuelve [(key, score), …] de mayor a menor.
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def collapse_chunks(hits: List[tuple]) -> List[tuple]:
+    """
+    [(key, distancia, …), …] ordenados → un resultado por ticket con su mejor
+    trozo (max-sim = menor distancia). Conserva el orden de entrada.
+    """
+    best: Dict[str, tuple] = {}
+    for key, *rest in hits:
+        base = chunk_ticket_id(key) or key
+        best.setdefault(base, (base, *rest))
+    return list(best.values())
+
+
+def _vector_candidates(k: int) -> int:
+    # Se piden más candidatos porque varios pueden ser trozos del mismo ticket
+    return k * max(get_settings().SEARCH_CHUNK_OVERSAMPLE, 1)
+
+
+def _hybrid_candidates(k: int) -> int:
+    return max(k * HYBRID_CANDIDATES, 20)
+
+
+def _vector_result(vector: List[tuple], k: int) -> List[Dict[str, Any]]:
+    hits = collapse_chunks(vector)[:k]
+    return [{"key": key, "score": score, "ticket": payload} for key, score, payload in hits]
+
+
+def _hybrid_result(lexical: Dict[str, Any], vector: List[tuple], k: int) -> List[Dict[str, Any]]:
+    vector = collapse_chunks(vector)
+    distance = {key: score for key, score, _ in vector}
+    payloads = {**{key: payload for key, _, payload in vector}, **lexical}
+    fused = reciprocal_rank_fusion([list(lexical), [key for key, *_ in vector]])[:k]
+    return [
+        {
+            "key": key,
+            "score": distance.get(key),        # distancia coseno (None si sólo BM25)
+            "rrf_score": rrf,
+            "lexical": key in lexical,
+            "ticket": payloads.get(key),
+        }
+        for key, rrf in fused
+    ]
+
+
+async def _vector_hits(qvec: List[float], k: int, filters: dict) -> List[Dict[str, Any]]:
+    return _vector_result(await vector_knn(qvec, _vector_candidates(k), with_payload=True, **filters), k)
+
+
+async def _hybrid_hits(text: str, qvec: List[float], k: int, filters: dict) -> List[Dict[str, Any]]:
+    lexical, vector = await hybrid_search(qvec, text, _hybrid_candidates(k), with_payload=True, **filters)
+    return _hybrid_result(lexical, vector, k)
+
+
+def _ticket_id(key: str) -> Optional[int]:
+    """'ticket:<id>' → id (None si la key no sigue ese formato)."""
+    try:
+        return int(key.split(":")[1]) if key.startswith("ticket:") else None
+    except ValueError:
+        return None
+
+
+async def _hydrate(hits: List[Dict[str, Any]], session: AsyncSession, only_missing: bool) -> List[Dict[str, Any]]:
+    """Una sola consulta IN para los tickets que hay que leer de Postgres."""
+    wanted = {
+        _ticket_id(hit["key"]) for hit in hits if not only_missing or hit.get("ticket") is None
+    } - {None}
+    tickets = {}
+    if wanted:
+        result = await session.execute(select(Ticket).where(Ticket.id.in_(wanted)))
+        tickets = {t.id: t for t in result.scalars().all()}
+
+    out = []
+    for hit in hits:
+        tid = _ticket_id(hit["key"])
+        if tid in tickets:
+            ticket = tickets[tid]
+            hit = {**hit, "ticket": ticket_payload(ticket_to_dict(ticket)) if only_missing else ticket}
+        elif tid in wanted or tid is None:
+            continue                            # vector huérfano: ya no existe en PG
+        out.append(hit)
+    return out
 
 
 async def knn_search(
     text: str,
     k: int = 5,
-    session: Optional[AsyncSession] = None,  # None ⇒ sólo key/score
+    session: Optional[AsyncSession] = None,
+    mode: Literal["vector", "hybrid"] = "vector",
+    hydrate: bool = False,
     **filters,
 ) -> List[Dict[str, Any]]:
-    # 1️⃣ Generar embedding del texto
-    resp = await client.embeddings.create(model=DEPLOY, input=text)
-    qvec = resp.data[0].embedding
-
-    # 2️⃣ Build filtro RediSearch
-    filter_str = (
-        " ".join(f"@{k}:{{{v}}}" for k, v in filters.items()) or "*"
-    )
-    query_str = f"{filter_str}=>[KNN {k} @vector $V AS score]"
-
-    params = {"V": to_binary(qvec)}
-    q = (
-        Query(query_str)
-        .return_fields("__key", "score")
-        .sort_by("score")
-        .dialect(2)
-    )
-    res = redis_client.ft(INDEX).search(q, query_params=params)
-
-    # 3️⃣ Si NO se pasó sesión ⇒ devolver sólo key/score (tests, uso simple)
+    """
+    Cada hit trae "ticket" con el payload desnormalizado del hash (número,
+    título, estado, prioridad y descripción recortada), sin ir a Postgres.
+    Con session y hydrate=True, "ticket" es el modelo completo de la BD;
+    con session y sin hydrate, sólo se leen de la BD los hits sin payload
+    (vectores anteriores al payload).
+
+    Sin hydrate, el resultado pasa por la caché de búsqueda (cache.py).
+    """
+    cache = get_search_cache()
+    if cache is None or hydrate:                # modelos ORM: no se cachean
+        return await _knn_search(text, k, session, mode, hydrate, filters)
+    key = search_cache_key(text, k, mode, filters, with_keys=session is None)
+    return await cache.get_or_compute(key, lambda: _knn_search(text, k, session, mode, hydrate, filters))
+
+
+async def _knn_search(
+    text: str,
+    k: int,
+    session: Optional[AsyncSession],
+    mode: str,
+    hydrate: bool,
+    filters: dict,
+) -> List[Dict[str, Any]]:
+    # 1️⃣ Generar embedding del texto (con caché)
+    qvec = await embed_text(text)
+
+    # 2️⃣ K-NN en el backend vectorial configurado (Redis o local), con los
+    #    trozos agrupados por ticket; en modo híbrido, BM25 + K-NN en un
+    #    pipeline y fusión RRF
+    if mode == "hybrid":
+        hits = await _hybrid_hits(text, qvec, k, filters)
+    else:
+        hits = await _vector_hits(qvec, k, filters)
+
+    # 3️⃣ Sin sesión ⇒ sólo lo que hay en Redis (con key)
     if session is None:
-        return [
-            {
-                "key":  doc["__key"].removeprefix("emb:"),
-                "score": float(doc["score"]),
-            }
-            for doc in res.docs
-        ]
-
-    # 4️⃣ Con sesión ⇒ mapear IDs y consultar la BD
-    id2score = {}
-    for doc in res.docs:
-        key = doc["__key"].removeprefix("emb:")
-        if key.startswith("ticket:"):
-            try:
-                tid = int(key.split(":")[1])
-                id2score[tid] = float(doc["score"])
-            except ValueError:
-                # Claves que no siguen formato ticket:<id> se ignoran
-                continue
-
-    if not id2score:
+        return hits
+
+    # 4️⃣ Con sesión ⇒ hidratación completa (opt-in) o sólo de los hits sin payload
+    return (await _finish([hits], session, hydrate))[0]
+
+
+async def _finish(
+    results: List[List[Dict[str, Any]]],
+    session: AsyncSession,
+    hydrate: bool,
+) -> List[List[Dict[str, Any]]]:
+    """Hidrata los hits de varias consultas con una sola consulta IN y quita "key"."""
+    flat = [{**hit, "_query": i} for i, hits in enumerate(results) for hit in hits]
+    if hydrate or any(hit.get("ticket") is None for hit in flat):
+        flat = await _hydrate(flat, session, only_missing=not hydrate)
+
+    out: List[List[Dict[str, Any]]] = [[] for _ in results]
+    for hit in flat:
+        out[hit["_query"]].append({f: v for f, v in hit.items() if f not in ("key", "_query")})
+    return out
+
+
+async def batch_knn_search(
+    queries: List[Dict[str, Any]],
+    session: Optional[AsyncSession] = None,
+    hydrate: bool = False,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Varias búsquedas de una vez: queries = [{"text", "k", "mode", "filters"}, …].
+    Devuelve la lista de hits de cada consulta en el mismo orden, con el
+    mismo formato que knn_search.
+
+    Un solo round trip por etapa, sea cual sea el tamaño del lote: una
+    llamada de embeddings para todos los textos (los de la caché no salen),
+    un pipeline de Redis con todas las FT.SEARCH y, con session, una sola
+    consulta IN a Postgres para hidratar los hits de todas las consultas.
+    No pasa por la caché de resultados.
+    """
+    if not queries:
         return []
 
-    stmt = select(Ticket).where(Ticket.id.in_(id2score.keys()))
-    result = await session.execute(stmt)
-    tickets = result.scalars().all()
+    # 1️⃣ Todos los embeddings en una llamada
+    qvecs = await embed_texts([q["text"] for q in queries], direct=True)
 
-    # 5️⃣ Ordenar según score original
-    return sorted(
-        (
-            {"ticket": t, "score": id2score[t.id]}
-            for t in tickets
-        ),
-        key=lambda x: x["score"]
-    )
+    # 2️⃣ Todas las búsquedas en un pipeline
+    plan = []
+    for q, qvec in zip(queries, qvecs):
+        if q.get("mode") == "hybrid":
+            plan.append((qvec, q["text"], _hybrid_candidates(q["k"]), q.get("filters") or {}))
+        else:
+            plan.append((qvec, None, _vector_candidates(q["k"]), q.get("filters") or {}))
+    raw = await batch_search(plan)
 
+    results = [
+        _hybrid_result(lexical, vector, q["k"]) if q.get("mode") == "hybrid" else _vector_result(vector, q["k"])
+        for q, (lexical, vector) in zip(queries, raw)
+    ]
+
+    # 3️⃣ Una sola hidratación para todo el lote
+    if session is None:
+        return results
+    return await _finish(results, session, hydrate)
@@ -1,5 +1,6 @@
 import os, uuid
-import httpx
+
+from backend.utils.http_clients import ELEVENLABS, get_http_client
 
 ELEVEN_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVEN_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID")
@@ -14,10 +15,9 @@ async def synthesize_speech(text: str) -> str:
         "Content-Type": "application/json",
     }
     payload = {"text": text, "voice_settings": {"stability":0.75, "similarity_boost":0.75}}
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=payload, headers=headers, timeout=30)
-        resp.raise_for_status()
-        audio = resp.content
+    resp = await get_http_client(ELEVENLABS).post(url, json=payload, headers=headers)
+    resp.raise_for_status()
+    audio = resp.content
 
     filename = f"{uuid.uuid4()}.mp3"
     path = os.path.join(TMP_DIR, filename)
@@ -2,42 +2,38 @@
 from backend.database.connection import get_session
 from backend.schemas.ticket import TicketCreate
 from backend.routes.tickets import create_ticket
-from backend.embeddings.service import embed_and_store
 from backend.search.service import knn_search
-from backend.database.models import Ticket
+from backend.database.models import TICKET_DIGITS, Ticket
+from backend.database.ticket_numbers import dialed_variants, digits_only
+from backend.config.settings import get_settings
+from backend.services.tts_cache import get_tts_cache
+from backend.utils.http_clients import ELEVENLABS, get_http_client, get_twilio_client
+from backend.utils.redis_client import get_redis
 from backend.utils.ticket_to_text import ticket_to_text
-from twilio.rest import Client
 from sqlalchemy.future import select
-from sqlalchemy import func
 
+import asyncio
+import logging
 import os
-import uuid
-import httpx
+import re
 
 # --- (1) FUNCIÓN PARA CREAR TICKETS POR VOZ (opcional, la puedes comentar si no la usas) ---
 async def process_voice_ticket(text: str, phone: str):
     async for session in get_session():
+        # Sin TicketNumber: lo asigna la secuencia (sin colisiones)
         payload = TicketCreate(
-            TicketNumber=f"CALL-{phone[-4:]}",
             ShortDescription=text[:80],
+            Description=text,
             CreatedBy="IVR",
             Status="Nuevo"
         )
+        # Paso 2: el embedding lo encola create_ticket (no bloquea la llamada)
         ticket = await create_ticket(payload, session)
-        # Paso 2: Embedding
-        await embed_and_store(
-            key=f"ticket:{ticket.id}",
-            text=text,
-            ticket_id=ticket.id,
-            status=ticket.Status
-        )
-        # Paso 3: SMS (opcional)
-        TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN  = os.getenv("TWILIO_AUTH_TOKEN")
+        # Paso 3: SMS (opcional) — SDK síncrono, fuera del event loop
         TWILIO_FROM_NUMBER = os.getenv("TWILIO_FROM_NUMBER")
         try:
-            twilio = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-            twilio.messages.create(
+            await asyncio.to_thread(
+                get_twilio_client().messages.create,
                 to=phone,
                 from_=TWILIO_FROM_NUMBER,
                 body=f"Ticket {ticket.TicketNumber} creado. ¡Gracias por usar nuestro sistema de soporte!"
@@ -48,6 +44,37 @@ async def process_voice_ticket(text: str, phone: str):
 # --- (2) FUNCIÓN PARA CONSULTAR TICKET Y GENERAR RESPUESTA DE VOZ ---
 from backend.utils.ticket_to_text import ticket_to_text  # 👈 Agrega esta línea
 
+MAX_VECTOR_DISTANCE = 0.55
+
+# "ticket 42", "inc-0000042", "ticket número 4 2": dígitos tras la palabra clave
+TICKET_MENTION = re.compile(r"\b(?:ticket|inc)[\s#:-]*(?:n[uú]mero\s*|no\.?\s*)?((?:\d[\s-]?)+)", re.IGNORECASE)
+
+
+def _mentions_ticket_number(text: str, ticket: dict) -> bool:
+    """
+    ¿Dice *text* el número del ticket? Vale un número tras "ticket"/"inc"
+    ('ticket 42', 'inc 4 2') o el número completo ('0000042'); un número
+    suelto no ('tengo 4 impresoras' no es INC-0000004).
+    """
+    digits = digits_only(ticket.get("TicketNumber") or "")
+    if not digits:
+        return False
+    after_keyword = {int(digits_only(m)) for m in TICKET_MENTION.findall(text)}
+    if int(digits) in after_keyword:
+        return True
+    return digits in re.findall(r"\d+", text) or digits_only(text) == digits   # completo, quizá dictado
+
+
+def _is_confident_match(hit: dict, text: str) -> bool:
+    """
+    Un hit híbrido es fiable si está cerca semánticamente o si la consulta
+    trae su número de ticket. Coincidir en algún término (BM25) no basta:
+    la fusión lo sube en el ranking, pero no lo hace fiable.
+    """
+    if hit.get("score") is not None and hit["score"] < MAX_VECTOR_DISTANCE:
+        return True
+    return _mentions_ticket_number(text, hit.get("ticket") or {})
+
 async def handle_ticket_query(text: str, phone: str) -> str:
     """
     Busca el ticket más similar por embeddings y genera una respuesta en voz con ElevenLabs.
@@ -56,23 +83,23 @@ async def handle_ticket_query(text: str, phone: str) -> str:
     async for session in get_session():
         print("🗣 Texto recibido desde Twilio:", text)  # 👈 PRIMER PRINT
 
-        results = await knn_search(text, k=1, session=session)
+        results = await knn_search(text, k=1, session=session, mode="hybrid")
 
         print("🎯 Resultado de knn_search:", results)    # 👈 SEGUNDO PRINT
 
-        if results and results[0]["score"] < 0.55:  # <-- Puedes probar subirlo aquí
-            ticket = results[0]["ticket"]
+        if results and _is_confident_match(results[0], text):
+            ticket = results[0]["ticket"]      # payload del hash: sin ir a Postgres
             respuesta = (
-                f"Tu ticket {ticket.TicketNumber} está en estatus {ticket.Status}. "
-                f"Resumen: {ticket.ShortDescription}. "
-                f"Descripción completa: {ticket.Description}."
+                f"Tu ticket {ticket['TicketNumber']} está en estatus {ticket['Status']}. "
+                f"Resumen: {ticket['ShortDescription']}. "
+                f"Descripción: {ticket['Description']}."
             )
         else:
             respuesta = (
                 "No encontramos tickets relacionados con tu solicitud. "
                 "Por favor verifica el número de ticket o proporciona más detalles."
             )
-        audio_url = await synthesize_speech(respuesta)
+        audio_url = await speech_url(respuesta)
         return audio_url
 
 
@@ -81,15 +108,22 @@ async def handle_ticket_query(text: str, phone: str) -> str:
 # -------------------------------------------
 async def search_ticket_by_number(ticket_number: str) -> dict | None:
     """
-    Busca un ticket por su número (comparando solo dígitos).
+    Busca un ticket por su número (comparando solo dígitos): marcar "42"
+    encuentra INC-0000042 (ver dialed_variants). Usa el índice de expresión
+    ix_tickets_ticket_digits (ver models.TICKET_DIGITS).
     """
-    async for session in get_session():
-        # 🔥 Limpiar el número recibido para dejar solo dígitos
-        digits_only = ''.join(filter(str.isdigit, ticket_number))
+    # 🔥 Limpiar el número recibido para dejar solo dígitos
+    digits = digits_only(ticket_number)
+    if not digits:
+        return None
 
-        # Buscar en DB quitando todo lo que no sea dígito en TicketNumber
-        query = select(Ticket).where(
-            func.regexp_replace(Ticket.TicketNumber, r'\D', '', 'g') == digits_only
+    async for session in get_session():
+        # Si dos folios comparten dígitos (p. ej. TKT-998 / INC-998) gana el más reciente
+        query = (
+            select(Ticket)
+            .where(TICKET_DIGITS.in_(dialed_variants(digits)))
+            .order_by(Ticket.id.desc())
+            .limit(1)
         )
         result = await session.execute(query)
         ticket = result.scalar_one_or_none()
@@ -111,25 +145,116 @@ ELEVEN_API_URL = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io")
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL")
 TMP_DIR = os.getenv("TMP_DIR", "./audio_tmp")
 
-async def synthesize_speech(text: str) -> str:
+ELEVEN_VOICE_SETTINGS = {"stability": 0.75, "similarity_boost": 0.75}
+
+async def _eleven_tts(text: str) -> bytes:
     url = f"{ELEVEN_API_URL}/v1/text-to-speech/{ELEVEN_VOICE_ID}"
     headers = {
         "xi-api-key": ELEVEN_API_KEY,
         "Content-Type": "application/json",
     }
-    payload = {"text": text, "voice_settings": {"stability": 0.75, "similarity_boost": 0.75}}
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=payload, headers=headers, timeout=30)
+    payload = {"text": text, "voice_settings": ELEVEN_VOICE_SETTINGS}
+    resp = await get_http_client(ELEVENLABS).post(url, json=payload, headers=headers)
+    resp.raise_for_status()
+    return resp.content
+
+async def synthesize_speech(text: str) -> str:
+    """
+    URL pública del mp3 de *text*. Sólo llama a ElevenLabs si el audio
+    (misma voz, mismos ajustes, mismo texto) no está ya en la caché TTS.
+    """
+    cache = get_tts_cache()
+    key = cache.key(ELEVEN_VOICE_ID, ELEVEN_VOICE_SETTINGS, text)
+    filename = await cache.get_or_create(key, lambda: _eleven_tts(text))
+    return f"{PUBLIC_BASE_URL}/audio/{filename}"
+
+# --- (4) TTS EN STREAMING: <Play> apunta a un proxy del stream de ElevenLabs ---
+TTS_TEXT_PREFIX = "tts:text:"
+
+async def speech_url(text: str) -> str:
+    """
+    URL para el <Play> de Twilio. Con TTS_STREAMING, si el audio no está en
+    caché se devuelve la URL del proxy (/webhooks/twilio/voice/tts/<clave>.mp3)
+    sin esperar a ElevenLabs; el texto queda en Redis para ese endpoint.
+    """
+    settings = get_settings()
+    if not settings.TTS_STREAMING:
+        return await synthesize_speech(text)
+
+    cache = get_tts_cache()
+    key = cache.key(ELEVEN_VOICE_ID, ELEVEN_VOICE_SETTINGS, text)
+    filename = cache.lookup(key)
+    if filename:
+        return f"{PUBLIC_BASE_URL}/audio/{filename}"
+    await get_redis().set(f"{TTS_TEXT_PREFIX}{key}", text.encode(), ex=settings.TTS_STREAM_TEXT_TTL_S)
+    return f"{PUBLIC_BASE_URL}/webhooks/twilio/voice/tts/{key}.mp3"
+
+async def open_speech_stream(key: str):
+    """
+    Abre el stream de ElevenLabs para el texto registrado bajo *key* y
+    devuelve un iterador de bytes que, mientras se envía a Twilio, escribe
+    el mismo audio en la caché (se publica sólo si llega completo).
+    None si la clave no está registrada.
+    """
+    raw = await get_redis().get(f"{TTS_TEXT_PREFIX}{key}")
+    if raw is None:
+        return None
+    text = raw.decode()
+
+    client = get_http_client(ELEVENLABS)
+    request = client.build_request(
+        "POST",
+        f"{ELEVEN_API_URL}/v1/text-to-speech/{ELEVEN_VOICE_ID}/stream",
+        json={"text": text, "voice_settings": ELEVEN_VOICE_SETTINGS},
+        headers={"xi-api-key": ELEVEN_API_KEY, "Content-Type": "application/json"},
+    )
+    resp = await client.send(request, stream=True)
+    if resp.is_error:
+        await resp.aclose()
         resp.raise_for_status()
-        audio = resp.content
 
-    os.makedirs(TMP_DIR, exist_ok=True)
+    async def chunks():
+        pending = get_tts_cache().begin(key)
+        try:
+            async for chunk in resp.aiter_bytes():
+                pending.write(chunk)
+                yield chunk
+            pending.commit()
+        finally:
+            pending.discard()
+            await resp.aclose()
 
-    filename = f"{uuid.uuid4()}.mp3"
-    path = os.path.join(TMP_DIR, filename)
-    with open(path, "wb") as f:
-        f.write(audio)
-    print(f"Audio generado en: {path}")
-    print("URL del audio para Twilio:", f"{PUBLIC_BASE_URL}/audio/{filename}")
-    return f"{PUBLIC_BASE_URL}/audio/{filename}"
+    return chunks()
+
+# --- (5) PRE-SÍNTESIS ESPECULATIVA DE PROMPTS ---
+logger = logging.getLogger(__name__)
+_prefetching: dict = {}            # clave TTS → tarea en curso (referencia fuerte)
+
+def prefetch_speech(*texts: str) -> int:
+    """
+    Lanza en segundo plano la síntesis de los prompts que probablemente
+    siguen, para que el próximo webhook los encuentre en la caché. Es de
+    mejor esfuerzo y acotada: como máximo TTS_PREFETCH_MAX_INFLIGHT a la vez
+    por worker; lo que exceda ese presupuesto se descarta. Devuelve cuántas lanzó.
+    """
+    budget = get_settings().TTS_PREFETCH_MAX_INFLIGHT
+    cache = get_tts_cache()
+    started = 0
+    for text in texts:
+        key = cache.key(ELEVEN_VOICE_ID, ELEVEN_VOICE_SETTINGS, text)
+        if key in _prefetching or os.path.exists(cache.path(key)):
+            continue
+        if len(_prefetching) >= budget:
+            logger.debug("Pre-síntesis descartada (presupuesto agotado)")
+            break
+        _prefetching[key] = asyncio.create_task(_prefetch(key, text))
+        started += 1
+    return started
 
+async def _prefetch(key: str, text: str) -> None:
+    try:
+        await synthesize_speech(text)
+    except Exception as e:
+        logger.warning("Pre-síntesis fallida: %s", e)
+    finally:
+        _prefetching.pop(key, None)
@@ -0,0 +1,193 @@
+"""
+Caché de audio sintetizado (ElevenLabs) direccionada por contenido.
+
+    clave = sha256(voice_id, voice_settings, texto)  →  TMP_DIR/tts-<clave>.mp3
+
+El mismo archivo lo sirve /audio a Twilio, así que un acierto es sólo un
+stat(): no hay llamada a ElevenLabs ni mp3 nuevo. La caché vive en disco y
+la comparten todos los workers del host; las escrituras van a un temporal
+que se publica con os.replace (atómico), igual que local_vector_store.
+
+Desalojo (un solo worker a la vez, bajo flock no bloqueante):
+  - por edad: archivos sin usar en más de TTS_CACHE_MAX_AGE_S
+    (cada acierto actualiza el mtime),
+  - por tamaño: si se supera TTS_CACHE_MAX_MB se borran los menos usados.
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "tts-"
+SUFFIX = ".mp3"
+
+
+class TTSCache:
+    def __init__(self, root: str, max_bytes: int, max_age_s: float, evict_interval_s: float = 300):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.evict_interval_s = evict_interval_s
+        self._last_evict = 0.0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(voice_id: str, voice_settings: dict, text: str) -> str:
+        raw = json.dumps([voice_id, voice_settings, text], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def filename(key: str) -> str:
+        return f"{PREFIX}{key}{SUFFIX}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, self.filename(key))
+
+    # ───────── Lectura / escritura ─────────
+    def lookup(self, key: str) -> Optional[str]:
+        """Nombre del archivo si existe (y lo marca como usado)."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return self.filename(key)
+
+    def store(self, key: str, audio: bytes) -> str:
+        pending = self.begin(key)
+        pending.write(audio)
+        return pending.commit()
+
+    def begin(self, key: str) -> "PendingAudio":
+        """Escritura incremental (streaming): se publica sólo al hacer commit()."""
+        return PendingAudio(self, key)
+
+    async def get_or_create(self, key: str, synthesize: Callable[[], Awaitable[bytes]]) -> str:
+        """
+        Devuelve el archivo de *key*, sintetizándolo sólo si falta. Las
+        peticiones concurrentes de la misma clave comparten una llamada.
+        """
+        filename = self.lookup(key)
+        if filename:
+            return filename
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise                              # cancelaron a este llamador
+                # cancelaron al que sintetizaba (colgó): se repite en vez de fallar
+                return await self.get_or_create(key, synthesize)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            filename = self.store(key, await synthesize())
+            future.set_result(filename)
+        except asyncio.CancelledError:
+            future.cancel()                        # los que esperan repiten la síntesis
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()                     # evita "exception never retrieved"
+            raise
+        finally:
+            del self._inflight[key]
+
+        if time.monotonic() - self._last_evict >= self.evict_interval_s:
+            self._last_evict = time.monotonic()
+            await asyncio.to_thread(self.evict)
+        return filename
+
+    # ───────── Desalojo ─────────
+    def evict(self) -> int:
+        """Borra por edad y luego por tamaño (LRU por mtime). Devuelve cuántos."""
+        with open(os.path.join(self.root, ".tts-evict.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0                           # otro worker ya está desalojando
+            try:
+                return self._evict()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _evict(self) -> int:
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(PREFIX) and entry.name.endswith(SUFFIX):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        entries.sort()                             # menos usados primero
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age_s and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if removed:
+            logger.info("Caché TTS: %s audios desalojados (%.1f MB en uso)", removed, total / 2**20)
+        return removed
+
+
+class PendingAudio:
+    """Audio a medio escribir en un temporal propio del proceso."""
+
+    def __init__(self, cache: TTSCache, key: str):
+        self.cache = cache
+        self.key = key
+        self._tmp = f"{cache.path(key)}.{os.getpid()}.{id(self)}.tmp"
+        self._file = open(self._tmp, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self) -> str:
+        self._file.close()
+        os.replace(self._tmp, self.cache.path(self.key))
+        return self.cache.filename(self.key)
+
+    def discard(self) -> None:
+        """Descarta lo escrito (no hace nada si ya se publicó)."""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self._tmp)
+        except FileNotFoundError:
+            pass
+
+
+_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    global _cache
+    if _cache is None:
+        from backend.config.settings import get_settings
+        settings = get_settings()
+        _cache = TTSCache(
+            root=os.getenv("TMP_DIR", "./audio_tmp"),
+            max_bytes=settings.TTS_CACHE_MAX_MB * 2**20,
+            max_age_s=settings.TTS_CACHE_MAX_AGE_S,
+            evict_interval_s=settings.TTS_CACHE_EVICT_INTERVAL_S,
+        )
+    return _cache
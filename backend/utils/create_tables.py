@@ -1,9 +1,19 @@
-import asyncio
-from backend.database.connection import engine
-from backend.database.models import Base
+"""
+Crea / actualiza el esquema aplicando las migraciones de Alembic
+(equivale a `alembic upgrade head` desde la raíz del repositorio).
+"""
+import os
 
-async def init_models():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+from alembic import command
+from alembic.config import Config
 
-asyncio.run(init_models())
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+def upgrade_head():
+    config = Config(os.path.abspath(ALEMBIC_INI))
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    upgrade_head()
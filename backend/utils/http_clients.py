@@ -0,0 +1,98 @@
+"""
+Clientes HTTP compartidos durante la vida de la aplicación.
+
+Un httpx.AsyncClient por integración (ElevenLabs, Azure OpenAI…): cada uno
+mantiene su propio pool keep-alive hacia su host, con límites y timeouts de
+settings, y HTTP/2 cuando está disponible (paquete h2). main.py los crea al
+arrancar y los cierra al apagar; fuera de la app (scripts, tests) se crean
+en el primer uso.
+"""
+import importlib.util
+import logging
+import os
+from typing import Dict
+
+import httpx
+
+from backend.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS = "elevenlabs"
+OPENAI = "openai"
+CLIENT_NAMES = (ELEVENLABS, OPENAI)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_twilio = None
+
+
+def _http2_enabled() -> bool:
+    if not get_settings().HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2=true pero falta el paquete h2 (httpx[http2]); se usa HTTP/1.1")
+        return False
+    return True
+
+
+def _build(name: str) -> httpx.AsyncClient:
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=_http2_enabled(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT_S,
+            connect=settings.HTTP_CONNECT_TIMEOUT_S,
+            pool=settings.HTTP_POOL_TIMEOUT_S,
+        ),
+        headers={"User-Agent": f"ProyectoSoc/1.0 ({name})"},
+    )
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Cliente con pool propio para la integración *name*."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = _build(name)
+    return client
+
+
+def get_twilio_client():
+    """
+    Cliente REST de Twilio con una sesión HTTP reutilizable. El SDK es
+    síncrono: llamarlo con asyncio.to_thread desde código async.
+    """
+    global _twilio
+    if _twilio is None:
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        _twilio = Client(
+            os.getenv("TWILIO_ACCOUNT_SID"),
+            os.getenv("TWILIO_AUTH_TOKEN"),
+            http_client=TwilioHttpClient(
+                pool_connections=True, timeout=get_settings().HTTP_READ_TIMEOUT_S,
+            ),
+        )
+    return _twilio
+
+
+async def start_http_clients() -> None:
+    for name in CLIENT_NAMES:
+        get_http_client(name)
+
+
+async def close_http_clients() -> None:
+    global _twilio
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+    if _twilio is not None:
+        session = getattr(_twilio.http_client, "session", None)
+        if session is not None:
+            session.close()
+        _twilio = None
@@ -0,0 +1,269 @@
+"""
+Backend vectorial local: índice exacto sobre una matriz NumPy mapeada en memoria.
+
+Mismo contrato que redis_client (add_embedding / add_embeddings / update_meta /
+get_meta_field / delete_embeddings / knn_search / batch_search / get_vector)
+para despliegues pequeños, tests o caídas de Redis.
+
+Formato en disco (LOCAL_VECTOR_DIR):
+    CURRENT              → nombre de la generación vigente
+    gen-000042/
+        vectors.npy      float32 (N, dim), filas ya normalizadas (norma 1)
+        ids.npy          keys (sin el prefijo emb:)
+        meta.json        metadatos (tags) por fila
+
+Los lectores abren la generación con mmap de sólo lectura, así que varios
+workers de uvicorn comparten las mismas páginas. Cada escritura construye una
+generación nueva bajo un flock y cambia CURRENT con os.replace (atómico): un
+lector nunca ve archivos a medias y los mmaps antiguos siguen siendo válidos.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+KEEP_GENERATIONS = 3
+
+
+class _Snapshot:
+    """Generación cargada: matriz mmap, ids, filas por id y máscaras de tags."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        if path is None:
+            self.vectors = np.zeros((0, 0), dtype=np.float32)
+            self.ids = np.array([], dtype=str)
+            self.meta: List[dict] = []
+        else:
+            self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+            self.ids = np.load(os.path.join(path, "ids.npy"))
+            with open(os.path.join(path, "meta.json")) as f:
+                self.meta = json.load(f)
+        self.rows = {key: i for i, key in enumerate(self.ids.tolist())}
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def mask(self, field: str, value) -> np.ndarray:
+        """Máscara booleana de un tag; se calcula una vez por generación."""
+        key = (field, str(value))
+        if key not in self._masks:
+            self._masks[key] = np.fromiter(
+                (m.get(field) == key[1] for m in self.meta), dtype=bool, count=len(self.meta)
+            )
+        return self._masks[key]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class LocalVectorStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._snapshot: Optional[_Snapshot] = None
+        self._current_stat = None
+
+    # ───────── Lectura ─────────
+    def _current_file(self) -> str:
+        return os.path.join(self.root, "CURRENT")
+
+    def snapshot(self) -> _Snapshot:
+        """Recarga sólo si otra escritura (de cualquier proceso) cambió CURRENT."""
+        try:
+            st = os.stat(self._current_file())
+            stat = (st.st_mtime_ns, st.st_ino)
+        except FileNotFoundError:
+            stat = None
+        if self._snapshot is None or stat != self._current_stat:
+            gen = None
+            if stat is not None:
+                with open(self._current_file()) as f:
+                    gen = os.path.join(self.root, f.read().strip())
+            self._snapshot = _Snapshot(gen)
+            self._current_stat = stat
+        return self._snapshot
+
+    def knn(self, query: List[float], k: int, **filters) -> List[Tuple[str, float]]:
+        snap = self.snapshot()
+        if not len(snap.ids):
+            return []
+
+        q = _normalize(np.asarray(query, dtype=np.float32))
+        scores = snap.vectors @ q                      # similitud coseno
+        if filters:
+            mask = np.ones(len(snap.ids), dtype=bool)
+            for field, value in filters.items():
+                mask &= snap.mask(field, value)
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        # mismo significado que el score de Redis (distancia coseno)
+        return [(str(snap.ids[i]), float(1 - scores[i])) for i in top]
+
+    def get(self, key: str) -> Optional[List[float]]:
+        snap = self.snapshot()
+        row = snap.rows.get(key)
+        return None if row is None else snap.vectors[row].tolist()
+
+    def get_meta(self, key: str) -> Optional[dict]:
+        snap = self.snapshot()
+        row = snap.rows.get(key)
+        return None if row is None else snap.meta[row]
+
+    # ───────── Escritura ─────────
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.root, "LOCK"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def upsert(self, entries) -> None:
+        """entries = [(key, vector, meta), …] en una sola generación nueva."""
+        with self._lock():
+            self._current_stat = None                   # fuerza recarga bajo el lock
+            snap = self.snapshot()
+            ids = snap.ids.tolist()
+            meta = list(snap.meta)
+            vectors = np.array(snap.vectors, dtype=np.float32)
+            rows = dict(snap.rows)
+
+            new_vecs = []
+            for key, vector, m in entries:
+                vec = _normalize(np.asarray(vector, dtype=np.float32))
+                if vectors.size and vec.shape[0] != vectors.shape[1]:
+                    raise ValueError(f"Dimensión {vec.shape[0]} ≠ {vectors.shape[1]}")
+                m = {f: str(v) for f, v in m.items()}
+                if key in rows:
+                    vectors[rows[key]] = vec
+                    meta[rows[key]] = m
+                else:
+                    rows[key] = len(ids)
+                    ids.append(key)
+                    meta.append(m)
+                    new_vecs.append(vec)
+            if new_vecs:
+                stacked = np.vstack(new_vecs)
+                vectors = stacked if not vectors.size else np.vstack([vectors, stacked])
+            self._publish(vectors, ids, meta)
+
+    def update_meta(self, entries) -> None:
+        """entries = [(key, meta), …]: mezcla los metadatos sin tocar los vectores."""
+        with self._lock():
+            self._current_stat = None
+            snap = self.snapshot()
+            meta = list(snap.meta)
+            for key, m in entries:
+                row = snap.rows.get(key)
+                if row is not None:
+                    meta[row] = {**meta[row], **{f: str(v) for f, v in m.items()}}
+            self._publish(np.asarray(snap.vectors), snap.ids.tolist(), meta)
+
+    def delete(self, keys) -> int:
+        """Quita las filas de *keys* (las que existan). Devuelve cuántas."""
+        with self._lock():
+            self._current_stat = None
+            snap = self.snapshot()
+            drop = {snap.rows[key] for key in keys if key in snap.rows}
+            if not drop:
+                return 0
+            keep = [i for i in range(len(snap.ids)) if i not in drop]
+            vectors = np.asarray(snap.vectors)[keep]
+            self._publish(vectors, [str(snap.ids[i]) for i in keep], [snap.meta[i] for i in keep])
+            return len(drop)
+
+    def _publish(self, vectors: np.ndarray, ids: List[str], meta: List[dict]) -> None:
+        gens = sorted(d for d in os.listdir(self.root) if d.startswith("gen-"))
+        seq = int(gens[-1].split("-")[1]) + 1 if gens else 1
+        name = f"gen-{seq:06d}"
+        path = os.path.join(self.root, name)
+        os.makedirs(path)
+        np.save(os.path.join(path, "vectors.npy"), vectors)
+        np.save(os.path.join(path, "ids.npy"), np.array(ids, dtype=str))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        tmp = self._current_file() + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(name)
+        os.replace(tmp, self._current_file())
+
+        # Los mmaps abiertos sobre generaciones borradas siguen siendo válidos
+        for old in gens[:-(KEEP_GENERATIONS - 1)] if len(gens) >= KEEP_GENERATIONS else []:
+            shutil.rmtree(os.path.join(self.root, old), ignore_errors=True)
+
+
+_store: Optional[LocalVectorStore] = None
+
+
+def get_store() -> LocalVectorStore:
+    global _store
+    if _store is None:
+        from backend.config.settings import get_settings
+        _store = LocalVectorStore(get_settings().LOCAL_VECTOR_DIR)
+    return _store
+
+
+# ───────── Contrato compartido con redis_client ─────────
+async def add_embedding(key: str, vector: list[float], **meta):
+    await asyncio.to_thread(get_store().upsert, [(key, vector, meta)])
+
+
+async def add_embeddings(entries):
+    await asyncio.to_thread(get_store().upsert, list(entries))
+
+
+async def get_meta_field(keys: List[str], field: str) -> List[Optional[str]]:
+    store = get_store()
+    return [(store.get_meta(key) or {}).get(field) for key in keys]
+
+
+async def update_meta(entries):
+    await asyncio.to_thread(get_store().update_meta, list(entries))
+
+
+async def delete_embeddings(keys: List[str]):
+    await asyncio.to_thread(get_store().delete, list(keys))
+
+
+def _with_payload(hits):
+    snap = get_store().snapshot()
+    out = []
+    for key, score in hits:
+        raw = snap.meta[snap.rows[key]].get("hit_json") if key in snap.rows else None
+        out.append((key, score, json.loads(raw) if raw else None))
+    return out
+
+
+async def knn_search(query: List[float], k: int = 5, with_payload: bool = False, **filters):
+    """Devuelve [(key, score), …] ordenados por distancia coseno (+ payload si se pide)."""
+    hits = get_store().knn(query, k, **filters)
+    return _with_payload(hits) if with_payload else hits
+
+
+async def hybrid_search(query: List[float], text: str, k: int = 5, with_payload: bool = False, **filters):
+    """Sin índice léxico local: sólo la parte vectorial."""
+    hits = get_store().knn(query, k, **filters)
+    return ({}, _with_payload(hits)) if with_payload else ([], hits)
+
+
+async def batch_search(queries):
+    """Mismo contrato que redis_client.batch_search (sólo parte vectorial)."""
+    store = get_store()
+    return [({}, _with_payload(store.knn(vector, k, **filters))) for vector, _, k, filters in queries]
+
+
+async def get_vector(key: str):
+    return get_store().get(key)
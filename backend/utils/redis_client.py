@@ -1,87 +1,240 @@
 """
-Redis helpers: set/get embeddings y KNN search
+Redis helpers (asyncio): set/get embeddings y KNN search
 """
-import redis
-import numpy as np
-from typing import List
-from redisvl.query import VectorQuery
-from redis.commands.search.field import VectorField, TagField
-from redis.exceptions import ResponseError
-from redis.commands.search.indexDefinition import IndexDefinition
-
-REDIS_HOST = "localhost"
-REDIS_PORT = 6379
-VECTOR_DIM  = 1536         # mismo número que en el índice
-INDEX_NAME  = "embeddings_idx"
-
-r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=False)
-redis_client = r
-
-# ───────── Crear índice si no existe ─────────
-def _ensure_index():
-    try:
-        r.ft(INDEX_NAME).info()        
-    except ResponseError:
-        print("- Creando índice Redis-Vector …")
-        r.ft(INDEX_NAME).create_index(
-            fields=[
-                VectorField(
-                    "vector",
-                    "FLAT",
-                    {
-                        "TYPE": "FLOAT32",
-                        "DIM": VECTOR_DIM,
-                        "DISTANCE_METRIC": "COSINE"
-                    }
-                ),
-                TagField("status"),
-                TagField("ticket_id"),
-            ],
-            definition=IndexDefinition(prefix=["emb:"])
-        )
+from typing import Dict, List, Optional
+import json
+import re
+import redis.asyncio as aioredis
+from redis.commands.search.query import Query
+from redis.commands.search.result import Result
+
+from backend.config.settings import get_settings
+from backend.utils.vector_codec import decode_vector, encode_vector
+
+INDEX_NAME  = "embeddings_idx"   # alias → versión vigente (ver vector_index.py)
 
-_ensure_index()   # ← se ejecuta al importar el módulo
+_client: Optional[aioredis.Redis] = None
+
+# ───────── Cliente / pool ─────────
+def get_redis() -> aioredis.Redis:
+    """
+    Cliente asyncio compartido. El pool es bloqueante: si se agotan las
+    conexiones se espera hasta REDIS_POOL_TIMEOUT_S en lugar de fallar.
+    """
+    global _client
+    if _client is None:
+        settings = get_settings()
+        pool_kwargs = dict(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_S,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_S,
+            health_check_interval=30,
+        )
+        if settings.REDIS_SSL:
+            pool_kwargs["connection_class"] = aioredis.SSLConnection
+        pool = aioredis.BlockingConnectionPool(**pool_kwargs)
+        _client = aioredis.Redis(connection_pool=pool, decode_responses=False)
+    return _client
 
-# Almacenar
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        await _client.connection_pool.disconnect()
+        _client = None
 
-def _to_float32_bytes(v: List[float]) -> bytes:
-    return np.array(v, dtype=np.float32).tobytes()
+# Almacenar (tipo según VECTOR_DTYPE, ver vector_codec.py)
 
-def add_embedding(key: str, vector: list[float], **meta):
+async def add_embedding(key: str, vector: list[float], **meta):
     redis_key = f"emb:{key}"          # ← debe ser emb:, no embeddings:
-    redis_client.hset(
+    await get_redis().hset(
         redis_key,
         mapping={
-            "vector": _to_float32_bytes(vector),
+            "vector": encode_vector(vector),
             **meta,
         },
     )
 
+async def add_embeddings(entries):
+    """
+    Escritura en bloque: entries = [(key, vector, meta), …] con un solo
+    pipeline (un round trip para todo el lote).
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    for key, vector, meta in entries:
+        pipe.hset(
+            f"emb:{key}",
+            mapping={"vector": encode_vector(vector), **meta},
+        )
+    await pipe.execute()
+
+async def get_meta_field(keys: List[str], field: str) -> List[Optional[str]]:
+    """Valor de *field* en el hash de cada key (None si no existe), un round trip."""
+    pipe = get_redis().pipeline(transaction=False)
+    for key in keys:
+        pipe.hget(f"emb:{key}", field)
+    return [v.decode() if v is not None else None for v in await pipe.execute()]
+
+async def update_meta(entries):
+    """
+    Actualiza sólo los campos de metadatos: entries = [(key, meta), …].
+    El vector no se toca, así que no hace falta volver a embeber.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    for key, meta in entries:
+        pipe.hset(f"emb:{key}", mapping=meta)
+    await pipe.execute()
+
+async def delete_embeddings(keys: List[str]):
+    """UNLINK (borrado no bloqueante) de varias keys en un solo pipeline."""
+    pipe = get_redis().pipeline(transaction=False)
+    for key in keys:
+        pipe.unlink(f"emb:{key}")
+    await pipe.execute()
+
 # Búsqueda #
 
-def knn_search(query: List[float], k: int = 5, **filters):
+_TAG_SPECIAL = set(",.<>{}[]\"':;!@#$%^&*()-+=~| ")
+
+def _escape_tag(value) -> str:
+    return "".join(f"\\{c}" if c in _TAG_SPECIAL else c for c in str(value))
+
+def build_filter(filters: Dict[str, str]) -> str:
+    """{'status': 'En proceso'} → '@status:{En\\ proceso}' ('*' si no hay filtros)."""
+    return " ".join(f"@{f}:{{{_escape_tag(v)}}}" for f, v in filters.items()) or "*"
+
+def knn_clause(k: int, param: str = "BLOB") -> str:
+    """'=>[KNN k @vector $BLOB …]' con EF_RUNTIME si el índice es HNSW."""
+    settings = get_settings()
+    ef = ""
+    if settings.VECTOR_INDEX_ALGORITHM.upper() == "HNSW":
+        ef = f" EF_RUNTIME {max(settings.HNSW_EF_RUNTIME, k)}"
+    return f"=>[KNN {k} @vector ${param}{ef} AS score]"
+
+# Campo del hash con el payload JSON de cada hit. No puede llamarse "payload":
+# redis-py construye Document(id, payload=…, **campos) y chocaría
+PAYLOAD_FIELD = "hit_json"
+
+def _payload(doc) -> Optional[dict]:
+    raw = getattr(doc, PAYLOAD_FIELD, None)
+    return json.loads(raw) if raw else None
+
+async def knn_search(query: List[float], k: int = 5, with_payload: bool = False, **filters):
     """
     Devuelve [(key, score), …] ordenados por similitud (cosine).
     filters => {'status': 'Nuevo'} convierte a @status:{Nuevo}
+    with_payload=True ⇒ [(key, score, payload), …] con el payload
+    desnormalizado del hash (None si el vector es anterior a él).
+    """
+    blob = encode_vector(query)
+    q = _vector_query(filters, k, with_payload)
+
+    res = await get_redis().ft(INDEX_NAME).search(q, query_params={"BLOB": blob})
+    if with_payload:
+        return [(doc.id.removeprefix("emb:"), float(doc.score), _payload(doc)) for doc in res.docs]
+    return [(doc.id.removeprefix("emb:"), float(doc.score)) for doc in res.docs]
+
+TEXT_FIELDS = "@TicketNumber|ShortDescription|Description"
+
+# Palabras vacías (y muletillas del IVR): RediSearch sólo trae las del inglés
+# y, si entran en la consulta, casi cualquier ticket coincide con ella
+STOPWORDS = frozenset("""
+    al como con cual de del el ella en era es esa ese esta este estado estoy
+    hay la las le les lo los me mi mis muy nada no nos numero número para pero
+    por que qué se sea si sin sobre su sus tambien también te ticket tiene tu
+    un una uno unos unas ya yo hola quiero necesito saber favor gracias
+    and are for is of on or the to with
+""".split())
+
+def build_text_query(text: str) -> Optional[str]:
+    """
+    Términos de *text* sin palabras vacías, escapados y unidos con AND:
+    un hit léxico debe contener todos (None si no queda ninguno).
     """
-    f32_query = _to_float32_bytes(query)
+    terms = [
+        _escape_tag(t) for t in dict.fromkeys(re.findall(r"\w+", text.lower()))
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+    return f"{TEXT_FIELDS}:({' '.join(terms)})" if terms else None
 
-    # Construir filtro tag si se pasan kwargs
-    filter_str = " ".join([f"@{k}:{{{v}}}" for k, v in filters.items()])
-    query_str  = f"{filter_str}=>[KNN {k} @vector $BLOB AS score]"
+def _lexical_query(text_query: str, filters: Dict[str, str], k: int, with_payload: bool) -> Query:
+    q = (
+        Query(f"({build_filter(filters)}) {text_query}" if filters else text_query)
+        .scorer("BM25")
+        .paging(0, k)
+        .dialect(2)
+    )
+    return q.return_fields(PAYLOAD_FIELD) if with_payload else q.no_content()
 
-    q = VectorQuery(query_str, return_fields=["__key", "score"]) \
-          .sort_by("score") \
-          .dialect(2)
+def _vector_query(filters: Dict[str, str], k: int, with_payload: bool) -> Query:
+    return (
+        Query(f"({build_filter(filters)}){knn_clause(k)}")
+        .return_fields("score", *([PAYLOAD_FIELD] if with_payload else []))
+        .sort_by("score")
+        .paging(0, k)
+        .dialect(2)
+    )
 
-    res = q.execute(r, INDEX_NAME, {"BLOB": f32_query})
-    return [(doc["__key"].decode().removeprefix("emb:"), float(doc["score"]))
-            for doc in res.docs]
+async def _pipelined_search(queries, with_payload: bool) -> list:
+    """
+    queries = [(vector, text|None, k, filters), …] → todas las FT.SEARCH
+    (BM25 si hay texto + K-NN) en un solo pipeline. Una tupla
+    (léxico, vector) por consulta, en el mismo orden.
+    """
+    pipe = get_redis().ft(INDEX_NAME).pipeline(transaction=False)
+    plan = []
+    for vector, text, k, filters in queries:
+        text_query = build_text_query(text) if text else None
+        if text_query:
+            await pipe.search(_lexical_query(text_query, filters, k, with_payload))
+        await pipe.search(_vector_query(filters, k, with_payload), query_params={"BLOB": encode_vector(vector)})
+        plan.append(bool(text_query))
+
+    raw = iter(await pipe.execute())
+    out = []
+    for has_text in plan:
+        lexical_docs = Result(next(raw), with_payload).docs if has_text else []
+        vector_docs = Result(next(raw), True).docs
+        if with_payload:
+            out.append((
+                {doc.id.removeprefix("emb:"): _payload(doc) for doc in lexical_docs},
+                [(doc.id.removeprefix("emb:"), float(doc.score), _payload(doc)) for doc in vector_docs],
+            ))
+        else:
+            out.append((
+                [doc.id.removeprefix("emb:") for doc in lexical_docs],
+                [(doc.id.removeprefix("emb:"), float(doc.score)) for doc in vector_docs],
+            ))
+    return out
+
+async def hybrid_search(query: List[float], text: str, k: int = 5, with_payload: bool = False, **filters):
+    """
+    Ejecuta en un solo pipeline la búsqueda BM25 sobre los campos TEXT y la
+    K-NN vectorial. Devuelve (keys léxicas en orden, [(key, score), …]).
+    with_payload=True ⇒ ({key: payload} léxico en orden, [(key, score, payload), …]).
+    """
+    return (await _pipelined_search([(query, text, k, filters)], with_payload))[0]
+
+async def batch_search(queries):
+    """
+    Varias búsquedas (vectoriales o híbridas) en un solo round trip:
+    queries = [(vector, text|None, k, filters), …], text=None ⇒ sólo K-NN.
+    Devuelve por consulta ({key: payload} léxico, [(key, score, payload), …]).
+    """
+    return await _pipelined_search(queries, with_payload=True)
 
-def get_vector(key: str):
-    raw = r.hget(f"emb:{key}", "vector")
+async def get_vector(key: str):
+    raw = await get_redis().hget(f"emb:{key}", "vector")
     if raw is None:
         return None
-    return np.frombuffer(raw, dtype=np.float32).tolist()
+    return decode_vector(raw)
 
-__all__ = ["add_embedding", "knn_search", "get_vector", "redis_client"]
+__all__ = [
+    "add_embedding", "add_embeddings", "get_meta_field", "update_meta", "delete_embeddings",
+    "knn_search", "hybrid_search", "batch_search", "get_vector",
+    "get_redis", "close_redis", "build_filter", "knn_clause",
+]
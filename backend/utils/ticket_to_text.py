@@ -1,24 +1,60 @@
 # backend/utils/ticket_to_text.py
 
+# (campo, etiqueta) en el orden en que se escriben
+TEXT_FIELDS = (
+    ("TicketNumber", "Número de ticket"),
+    ("ShortDescription", "Título"),
+    ("Description", "Descripción"),
+    ("Category", "Categoría"),
+    ("Subcategory", "Subcategoría"),
+    ("Priority", "Prioridad"),
+    ("Severity", "Severidad"),
+    ("Impact", "Impacto"),
+    ("Urgency", "Urgencia"),
+    ("Status", "Estado"),
+    ("Channel", "Canal"),
+    ("AssignmentGroup", "Grupo asignado"),
+    ("AssignedTo", "Responsable"),
+    ("Company", "Empresa"),
+    ("Folio", "Folio"),
+)
+
+
 def ticket_to_text(ticket: dict) -> str:
     """
     Convierte un ticket en una cadena de texto unificada, incluyendo
-    todos los campos relevantes para el embedding semántico.
+    todos los campos relevantes para el embedding semántico. Los campos
+    vacíos o None se omiten (nada de "Categoría: None.").
+    """
+    parts = []
+    for field, label in TEXT_FIELDS:
+        value = ticket.get(field)
+        if value is None or not str(value).strip():
+            continue
+        parts.append(f"{label}: {value}.")
+    return " ".join(parts)
+
+
+def ticket_to_dict(ticket) -> dict:
+    """
+    Convierte un modelo SQLAlchemy Ticket al dict que espera ticket_to_text
+    (Category/Subcategory en lugar de FirstCategory/FirstSubcategory).
     """
-    return (
-        f"Número de ticket: {ticket.get('TicketNumber', '')}. "
-        f"Título: {ticket.get('ShortDescription', '')}. "
-        f"Descripción: {ticket.get('Description', '')}. "
-        f"Categoría: {ticket.get('Category', '')}. "
-        f"Subcategoría: {ticket.get('Subcategory', '')}. "
-        f"Prioridad: {ticket.get('Priority', '')}. "
-        f"Severidad: {ticket.get('Severity', '')}. "
-        f"Impacto: {ticket.get('Impact', '')}. "
-        f"Urgencia: {ticket.get('Urgency', '')}. "
-        f"Estado: {ticket.get('Status', '')}. "
-        f"Canal: {ticket.get('Channel', '')}. "
-        f"Grupo asignado: {ticket.get('AssignmentGroup', '')}. "
-        f"Responsable: {ticket.get('AssignedTo', '')}. "
-        f"Empresa: {ticket.get('Company', '')}. "
-        f"Folio: {ticket.get('Folio', '')}. "
-    ).strip()
+    return {
+        "id": ticket.id,
+        "TicketNumber": ticket.TicketNumber,
+        "ShortDescription": ticket.ShortDescription,
+        "Description": ticket.Description,
+        "Category": ticket.FirstCategory,
+        "Subcategory": ticket.FirstSubcategory,
+        "Priority": ticket.Priority,
+        "Severity": ticket.Severity,
+        "Impact": ticket.Impact,
+        "Urgency": ticket.Urgency,
+        "Status": ticket.Status,
+        "Channel": ticket.Channel,
+        "AssignmentGroup": ticket.AssignmentGroup,
+        "AssignedTo": ticket.AssignedTo,
+        "Company": ticket.Company,
+        "Folio": ticket.Folio,
+    }
@@ -0,0 +1,51 @@
+"""
+Serialización de vectores para Redis según VECTOR_DTYPE.
+
+FLOAT32  → 4 bytes/dim (por defecto)
+FLOAT16  → 2 bytes/dim (IEEE half)
+BFLOAT16 → 2 bytes/dim (float32 truncado a 16 bits, mismo rango que float32)
+
+El índice (vector_index.py), la escritura y la consulta deben usar el mismo
+tipo; cambiarlo exige una nueva versión del índice y re-embeber (backfill).
+"""
+from typing import List, Optional
+
+import numpy as np
+
+from backend.config.settings import get_settings
+
+DTYPES = ("FLOAT32", "FLOAT16", "BFLOAT16")
+
+
+def _dtype(dtype: Optional[str]) -> str:
+    dtype = (dtype or get_settings().VECTOR_DTYPE).upper()
+    if dtype not in DTYPES:
+        raise ValueError(f"VECTOR_DTYPE no soportado: {dtype}")
+    return dtype
+
+
+def _to_bfloat16(arr: np.ndarray) -> np.ndarray:
+    # redondeo al par más cercano sobre los 16 bits altos de float32
+    bits = arr.astype(np.float32).view(np.uint32)
+    rounded = bits + np.uint32(0x7FFF) + ((bits >> np.uint32(16)) & np.uint32(1))
+    return (rounded >> np.uint32(16)).astype(np.uint16)
+
+
+def encode_vector(vec: List[float], dtype: Optional[str] = None) -> bytes:
+    dtype = _dtype(dtype)
+    arr = np.asarray(vec, dtype=np.float32)
+    if dtype == "FLOAT16":
+        return arr.astype(np.float16).tobytes()
+    if dtype == "BFLOAT16":
+        return _to_bfloat16(arr).tobytes()
+    return arr.tobytes()
+
+
+def decode_vector(raw: bytes, dtype: Optional[str] = None) -> List[float]:
+    dtype = _dtype(dtype)
+    if dtype == "FLOAT16":
+        return np.frombuffer(raw, dtype=np.float16).astype(np.float32).tolist()
+    if dtype == "BFLOAT16":
+        bits = np.frombuffer(raw, dtype=np.uint16).astype(np.uint32) << np.uint32(16)
+        return bits.view(np.float32).tolist()
+    return np.frombuffer(raw, dtype=np.float32).tolist()
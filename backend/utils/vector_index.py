@@ -0,0 +1,228 @@
+"""
+Índices vectoriales versionados detrás de un alias.
+
+Las consultas siempre van a INDEX_NAME ("embeddings_idx"), que es un alias
+(FT.ALIASADD) de la versión vigente: embeddings_idx_v2, embeddings_idx_v3…
+Para cambiar algoritmo, parámetros HNSW o dimensiones:
+
+  1. se crea la nueva versión sobre las mismas keys emb:* (Redis las indexa
+     en segundo plano),
+  2. se espera a que termine de indexar,
+  3. se mueve el alias con FT.ALIASUPDATE, de forma atómica para las consultas.
+
+Al arrancar, la app sólo crea lo que falta; si el alias apunta a una versión
+anterior a VECTOR_INDEX_VERSION, una tarea en segundo plano (una sola entre
+workers, con lock) hace estos pasos sin bloquear el arranque.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from redis.commands.search.field import TagField, TextField, VectorField
+from redis.commands.search.indexDefinition import IndexDefinition
+from redis.exceptions import ResponseError
+
+from backend.config.settings import get_settings
+from backend.utils.redis_client import INDEX_NAME, get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "emb:"
+UPGRADE_LOCK = "vectoridx:upgrade:lock"    # fuera de emb: para no caer en el índice
+
+
+def index_name(version: int) -> str:
+    return f"{INDEX_NAME}_v{version}"
+
+
+def index_fields(settings=None) -> list:
+    """Esquema del índice a partir de settings (algoritmo, DIM, HNSW…)."""
+    settings = settings or get_settings()
+    attrs = {
+        "TYPE": settings.VECTOR_DTYPE.upper(),
+        "DIM": settings.vector_dim,
+        "DISTANCE_METRIC": settings.VECTOR_DISTANCE_METRIC,
+        "INITIAL_CAP": settings.VECTOR_INITIAL_CAP,
+    }
+    if settings.VECTOR_INDEX_ALGORITHM.upper() == "HNSW":
+        attrs.update({
+            "M": settings.HNSW_M,
+            "EF_CONSTRUCTION": settings.HNSW_EF_CONSTRUCTION,
+            "EF_RUNTIME": settings.HNSW_EF_RUNTIME,
+        })
+    return [
+        VectorField("vector", settings.VECTOR_INDEX_ALGORITHM.upper(), attrs),
+        TagField("status"),
+        TagField("ticket_id"),
+        # Campos léxicos (BM25) para la búsqueda híbrida
+        TextField("TicketNumber", weight=3.0),
+        TextField("ShortDescription", weight=2.0),
+        TextField("Description"),
+    ]
+
+
+async def _info(name: str) -> Optional[dict]:
+    try:
+        return await get_redis().ft(name).info()
+    except ResponseError:
+        return None
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+async def current_index() -> Optional[str]:
+    """Nombre real del índice al que apunta el alias (None si no existe)."""
+    info = await _info(INDEX_NAME)
+    return _decode(info["index_name"]) if info else None
+
+
+async def create_index(version: int) -> str:
+    name = index_name(version)
+    if await _info(name) is None:
+        logger.info("Creando índice vectorial %s", name)
+        await get_redis().ft(name).create_index(
+            fields=index_fields(),
+            definition=IndexDefinition(prefix=[KEY_PREFIX]),
+        )
+    return name
+
+
+async def wait_until_indexed(name: str, poll_s: float = 1.0, timeout_s: float = 3600) -> None:
+    """Espera a que *name* termine de indexar; TimeoutError pasado *timeout_s*."""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        info = await _info(name)
+        if info is None:                        # aún no visible (o eliminado)
+            logger.info("%s: índice todavía no disponible…", name)
+        else:
+            pct = float(_decode(info.get("percent_indexed", 1)))
+            if _decode(info.get("indexing", 0)) in ("0", "0.0") and pct >= 1.0:
+                return
+            logger.info("%s: %.1f%% indexado…", name, pct * 100)
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{name} no terminó de indexar en {timeout_s:.0f}s")
+        await asyncio.sleep(poll_s)
+
+
+async def swap_alias(name: str) -> Optional[str]:
+    """
+    Apunta INDEX_NAME a *name*. Devuelve el índice anterior (o None).
+    Si INDEX_NAME todavía es un índice "real" (versión anterior a los
+    alias), se elimina sin borrar documentos y se crea el alias en el
+    mismo MULTI para que las consultas no vean un hueco.
+    """
+    r = get_redis()
+    previous = await current_index()
+    if previous == name:
+        return previous
+
+    if previous is None:
+        await r.ft(name).aliasadd(INDEX_NAME)
+    elif previous == INDEX_NAME:
+        pipe = r.pipeline(transaction=True)
+        pipe.execute_command("FT.DROPINDEX", INDEX_NAME)
+        pipe.execute_command("FT.ALIASADD", INDEX_NAME, name)
+        try:
+            await pipe.execute()
+        except ResponseError:
+            # Otro worker migró a la vez: vale si el alias ya apunta a *name*
+            if await current_index() != name:
+                raise
+    else:
+        await r.ft(name).aliasupdate(INDEX_NAME)
+    logger.info("Alias %s → %s (antes: %s)", INDEX_NAME, name, previous)
+    return previous
+
+
+def index_version(name: Optional[str]) -> Optional[int]:
+    """'embeddings_idx_v3' → 3; el índice real sin alias (INDEX_NAME) → 0."""
+    if name is None:
+        return None
+    if name == INDEX_NAME:
+        return 0
+    suffix = name.rsplit("_v", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+async def ensure_index() -> None:
+    """
+    Al arrancar: crea la versión configurada y el alias sólo si no existen.
+    Nunca espera a indexar: si el alias apunta a una versión anterior (o a
+    un índice real sin alias), eso lo resuelve upgrade_index.
+    """
+    current = await current_index()
+    version = get_settings().VECTOR_INDEX_VERSION
+    if current is None:
+        await swap_alias(await create_index(version))
+    elif index_version(current) < version:
+        logger.warning("%s apunta a %s; la versión configurada es %s", INDEX_NAME, current, index_name(version))
+
+
+async def upgrade_index(poll_s: float = 1.0, timeout_s: float = 3600) -> Optional[str]:
+    """
+    Si el alias apunta a una versión anterior a VECTOR_INDEX_VERSION (p. ej.
+    sin los campos TEXT de la búsqueda híbrida), construye la nueva y mueve
+    el alias como rebuild_index; mientras, la anterior sigue sirviendo.
+    Un SET NX EX garantiza una sola migración entre workers/réplicas.
+    Devuelve el índice nuevo (None si no hacía falta o la hace otro).
+    """
+    version = get_settings().VECTOR_INDEX_VERSION
+    current = await current_index()
+    if current is not None and index_version(current) >= version:
+        return None
+    r = get_redis()
+    if not await r.set(UPGRADE_LOCK, "1", nx=True, ex=int(timeout_s) + 60):
+        logger.info("Otra instancia está migrando el índice vectorial")
+        return None
+    try:
+        logger.warning("Migrando %s: %s → %s", INDEX_NAME, current, index_name(version))
+        return await rebuild_index(version, poll_s=poll_s, timeout_s=timeout_s)
+    finally:
+        await r.delete(UPGRADE_LOCK)
+
+
+# ───────── Migración en segundo plano en la app ─────────
+_task: Optional[asyncio.Task] = None
+
+
+async def _upgrade() -> None:
+    try:
+        await upgrade_index()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("Migración del índice vectorial fallida: %s", e)
+
+
+async def start_index_upgrade() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_upgrade())
+
+
+async def stop_index_upgrade() -> None:
+    """Cancela la espera; el índice nuevo sigue indexándose en Redis."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+async def rebuild_index(
+    version: int, drop_old: bool = False, poll_s: float = 1.0, timeout_s: float = 3600,
+) -> str:
+    """
+    Construye la versión *version* en segundo plano y mueve el alias cuando
+    termina. Con *drop_old* elimina el índice anterior (nunca los datos).
+    """
+    name = await create_index(version)
+    await wait_until_indexed(name, poll_s, timeout_s)
+    previous = await swap_alias(name)
+    if drop_old and previous not in (None, name, INDEX_NAME):
+        await get_redis().ft(previous).dropindex(delete_documents=False)
+        logger.info("Índice anterior %s eliminado", previous)
+    return name
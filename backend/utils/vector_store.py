@@ -0,0 +1,59 @@
+"""
+Punto de entrada único al almacén vectorial.
+
+VECTOR_BACKEND=redis (por defecto) usa redis_client; VECTOR_BACKEND=local usa
+la matriz mmap de local_vector_store. Ambos cumplen el mismo contrato.
+"""
+from typing import List, Optional
+
+from backend.config.settings import get_settings
+
+
+def _backend():
+    if get_settings().VECTOR_BACKEND.lower() == "local":
+        from backend.utils import local_vector_store as backend
+    else:
+        from backend.utils import redis_client as backend
+    return backend
+
+
+async def add_embedding(key: str, vector: list[float], **meta):
+    await _backend().add_embedding(key, vector, **meta)
+
+
+async def add_embeddings(entries):
+    await _backend().add_embeddings(entries)
+
+
+async def get_meta_field(keys: List[str], field: str) -> List[Optional[str]]:
+    return await _backend().get_meta_field(keys, field)
+
+
+async def update_meta(entries):
+    await _backend().update_meta(entries)
+
+
+async def delete_embeddings(keys: List[str]):
+    await _backend().delete_embeddings(keys)
+
+
+async def knn_search(query: List[float], k: int = 5, with_payload: bool = False, **filters):
+    return await _backend().knn_search(query, k, with_payload=with_payload, **filters)
+
+
+async def hybrid_search(query: List[float], text: str, k: int = 5, with_payload: bool = False, **filters):
+    return await _backend().hybrid_search(query, text, k, with_payload=with_payload, **filters)
+
+
+async def batch_search(queries):
+    return await _backend().batch_search(queries)
+
+
+async def get_vector(key: str):
+    return await _backend().get_vector(key)
+
+
+__all__ = [
+    "add_embedding", "add_embeddings", "get_meta_field", "update_meta", "delete_embeddings",
+    "knn_search", "hybrid_search", "batch_search", "get_vector",
+]
@@ -19,6 +19,7 @@ const CONFIG = {
   
     UI: {
       SEARCH_DELAY          : 400,
+      PAGE_SIZE             : 50,      // máx. 200 en el backend
       AUTO_REFRESH_INTERVAL : 30_000   // 30 s
     }
   };
@@ -4,20 +4,35 @@ class TicketsManager {
   constructor() {
     this.tickets   = [];
     this.filtered  = [];
+    this.cursor    = null;             // X-Next-Cursor de la última página
+    this.pages     = 0;                // páginas cargadas ("cargar más")
     this.load();
     this.bindEvents();
-    setInterval(() => this.load(), CONFIG.UI.AUTO_REFRESH_INTERVAL);
+    setInterval(() => this.refresh(), CONFIG.UI.AUTO_REFRESH_INTERVAL);
   }
 
-  async load() {
+  async fetchPage(cursor = null) {
+    const params = new URLSearchParams({ limit: CONFIG.UI.PAGE_SIZE });
+    const status = document.getElementById("statusFilter")?.value;
+    if (status) params.set("status", status);
+    if (cursor) params.set("cursor", cursor);
+
+    const url = `${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.TICKETS}?${params}`;
+    const res = await fetch(url);
+    if (!res.ok) throw new Error(await res.text());
+    return { page: await res.json(), next: res.headers.get("X-Next-Cursor") };
+  }
+
+  /* append=false → primera página (recarga); append=true → siguiente página */
+  async load(append = false) {
     try {
       this.toggle("loading", true);
-      const url = `${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.TICKETS}`;
-      const res = await fetch(url);
-      if (!res.ok) throw new Error(await res.text());
-      this.tickets  = await res.json();
-      this.filtered = [...this.tickets];
-      this.render();
+      const { page, next } = await this.fetchPage(append ? this.cursor : null);
+      this.cursor  = next;
+      this.tickets = append ? this.tickets.concat(page) : page;
+      this.pages   = append ? this.pages + 1 : 1;
+      this.toggle("loadMore", !!this.cursor);
+      this.applyFilters();
     } catch (err) {
       console.error(err);
       this.toggle("error", true);
@@ -26,6 +41,20 @@ class TicketsManager {
     }
   }
 
+  /* auto-refresh: con páginas extra cargadas, sólo se fusiona la primera
+     (nuevos arriba, cambios aplicados) y se conservan el resto y su cursor */
+  async refresh() {
+    if (this.pages <= 1) return this.load();
+    try {
+      const { page } = await this.fetchPage();
+      const fresh = new Set(page.map(t => t.id));
+      this.tickets = page.concat(this.tickets.filter(t => !fresh.has(t.id)));
+      this.applyFilters();
+    } catch (err) {
+      console.error(err);
+    }
+  }
+
   bindEvents() {
     const s = document.getElementById("searchInput");
     const f = document.getElementById("statusFilter");
@@ -36,19 +65,17 @@ class TicketsManager {
         t = setTimeout(() => this.applyFilters(), CONFIG.UI.SEARCH_DELAY);
       });
     }
-    f?.addEventListener("change", () => this.applyFilters());
+    f?.addEventListener("change", () => this.load());
+    document.getElementById("loadMore")?.addEventListener("click", () => this.load(true));
   }
 
   applyFilters() {
-    const term   = (document.getElementById("searchInput")?.value || "").toLowerCase();
-    const status = document.getElementById("statusFilter")?.value || "";
+    // el estado se filtra en el servidor; el texto, sobre las páginas cargadas
+    const term = (document.getElementById("searchInput")?.value || "").toLowerCase();
 
-    this.filtered = this.tickets.filter(t => {
-      const text = !term || t.ShortDescription.toLowerCase().includes(term) ||
-                            (t.Description || "").toLowerCase().includes(term);
-      const st   = !status || t.Status === status;
-      return text && st;
-    });
+    this.filtered = this.tickets.filter(t =>
+      !term || t.ShortDescription.toLowerCase().includes(term) ||
+               (t.Description || "").toLowerCase().includes(term));
     this.render();
   }
 
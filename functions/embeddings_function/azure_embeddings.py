@@ -0,0 +1,57 @@
+"""
+Cliente mínimo de la API REST de embeddings de Azure OpenAI sobre httpx.
+
+Se usa en lugar del SDK openai porque importarlo cuesta más de un segundo
+en el arranque en frío; aquí sólo hace falta un POST:
+
+    POST {endpoint}/openai/deployments/{deployment}/embeddings?api-version=…
+"""
+from typing import List, Optional
+
+from ..settings import get_settings
+
+
+class EmbeddingsError(Exception):
+    pass
+
+
+class AzureEmbeddings:
+    def __init__(self, settings=None, transport=None):
+        import httpx                           # import diferido: arranque en frío
+
+        settings = settings or get_settings()
+        self.dimensions = settings.EMBEDDING_DIMENSIONS
+        self.url = (
+            f"{(settings.AZURE_OPENAI_ENDPOINT or '').rstrip('/')}/openai/deployments/"
+            f"{settings.AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS}/embeddings"
+        )
+        self._http = httpx.Client(
+            params={"api-version": settings.AZURE_OPENAI_API_VERSION},
+            headers={"api-key": settings.AZURE_OPENAI_KEY or ""},
+            timeout=settings.EMBEDDING_TIMEOUT_S,
+            transport=transport,
+        )
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Un vector por texto, en el mismo orden (una sola llamada)."""
+        payload = {"input": texts}
+        if self.dimensions:
+            payload["dimensions"] = self.dimensions
+        resp = self._http.post(self.url, json=payload)
+        if resp.status_code != 200:
+            raise EmbeddingsError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+        data = sorted(resp.json()["data"], key=lambda d: d["index"])
+        if len(data) != len(texts):
+            raise EmbeddingsError(f"{len(data)} vectores para {len(texts)} textos")
+        return [d["embedding"] for d in data]
+
+
+_client: Optional[AzureEmbeddings] = None
+
+
+def get_embeddings_client() -> AzureEmbeddings:
+    """Cliente compartido entre invocaciones (mantiene el keep-alive)."""
+    global _client
+    if _client is None:
+        _client = AzureEmbeddings()
+    return _client
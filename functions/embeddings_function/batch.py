@@ -0,0 +1,206 @@
+"""
+Embebe un lote de tickets con una sola llamada a Azure OpenAI y guarda los
+vectores con un solo pipeline de Redis. Sin dependencias de azure.functions
+para poder probarlo en local con clientes sustitutos.
+
+Cada elemento del lote es un ticket (dict con "id" y los campos de
+ticket_to_text) o {"id": …, "text": …} si el llamador ya tiene el texto.
+
+Escribe lo mismo que backend/embeddings/service.py (embed_tickets): las
+descripciones largas se trocean igual, el trozo 0 lleva text_hash y
+chunks, y en el mismo pipeline se borran a ciegas las keys
+emb:ticket:<id>:<n> de los trozos que ya no existen (hasta
+EMBEDDING_MAX_CHUNKS), sin leer antes cuántos había. La Function se
+despliega sin el paquete backend, así que aquí van copias;
+tests/functions comprueba que coinciden con las del backend.
+"""
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+from ..redis_utils import write_embeddings
+from ..settings import get_settings
+from .chunking import chunk_key, split_requests, split_text
+
+OK = "ok"
+INVALID = "invalid"
+ERROR = "error"
+
+
+# = backend/utils/ticket_to_text.py TEXT_FIELDS
+TEXT_FIELDS = (
+    ("TicketNumber", "Número de ticket"),
+    ("ShortDescription", "Título"),
+    ("Description", "Descripción"),
+    ("Category", "Categoría"),
+    ("Subcategory", "Subcategoría"),
+    ("Priority", "Prioridad"),
+    ("Severity", "Severidad"),
+    ("Impact", "Impacto"),
+    ("Urgency", "Urgencia"),
+    ("Status", "Estado"),
+    ("Channel", "Canal"),
+    ("AssignmentGroup", "Grupo asignado"),
+    ("AssignedTo", "Responsable"),
+    ("Company", "Empresa"),
+    ("Folio", "Folio"),
+)
+
+
+def ticket_to_text(ticket: dict) -> str:
+    """Copia de backend/utils/ticket_to_text.py: debe producir el mismo texto."""
+    parts = []
+    for field, label in TEXT_FIELDS:
+        value = ticket.get(field)
+        if value is None or not str(value).strip():
+            continue
+        parts.append(f"{label}: {value}.")
+    return " ".join(parts)
+
+
+def ticket_payload(ticket: dict, settings=None) -> dict:
+    """Copia de backend/embeddings/service.py ticket_payload."""
+    limit = (settings or get_settings()).SEARCH_PAYLOAD_DESCRIPTION_CHARS
+    description = ticket.get("Description") or ""
+    return {
+        "id": ticket["id"],
+        "TicketNumber": ticket.get("TicketNumber"),
+        "ShortDescription": ticket.get("ShortDescription"),
+        "Status": ticket.get("Status"),
+        "Priority": ticket.get("Priority"),
+        "Description": description[:limit].rstrip() + ("…" if len(description) > limit else ""),
+    }
+
+
+def ticket_meta(ticket: dict, settings=None) -> dict:
+    """Mismos campos TAG/TEXT y payload que backend/embeddings/service.py."""
+    return {
+        "ticket_id": ticket["id"],
+        "status": ticket.get("Status") or "",
+        "TicketNumber": ticket.get("TicketNumber") or "",
+        "ShortDescription": ticket.get("ShortDescription") or "",
+        "Description": ticket.get("Description") or "",
+        "hit_json": json.dumps(ticket_payload(ticket, settings), ensure_ascii=False),
+    }
+
+
+def chunk_meta(ticket: dict, n: int, settings=None) -> dict:
+    """Copia de backend/embeddings/service.py chunk_meta (trozos 1…n)."""
+    return {
+        "ticket_id": ticket["id"],
+        "status": ticket.get("Status") or "",
+        "chunk": n,
+        "hit_json": json.dumps(ticket_payload(ticket, settings), ensure_ascii=False),
+    }
+
+
+def ticket_chunks(ticket: dict, settings=None) -> List[str]:
+    """Copia de backend/embeddings/chunking.py ticket_chunks."""
+    settings = settings or get_settings()
+    pieces = split_text(
+        ticket.get("Description") or "", settings.EMBEDDING_CHUNK_TOKENS, settings.EMBEDDING_CHUNK_OVERLAP,
+    )
+    if len(pieces) <= 1:
+        return [ticket_to_text(ticket)]
+    return [ticket_to_text({**ticket, "Description": p}) for p in pieces[:settings.EMBEDDING_MAX_CHUNKS]]
+
+
+# = backend/embeddings/service.py VOLATILE_FIELDS
+VOLATILE_FIELDS = ("Status", "AssignedTo", "AssignmentGroup")
+
+
+def text_hash(ticket: dict, n_chunks: int = 1, settings=None) -> str:
+    """Copia de backend/embeddings/service.py text_hash."""
+    settings = settings or get_settings()
+    model = settings.AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS
+    if settings.EMBEDDING_DIMENSIONS:
+        model = f"{model}@{settings.EMBEDDING_DIMENSIONS}"
+    stable = ticket_to_text({**ticket, **{f: "" for f in VOLATILE_FIELDS}})
+    raw = f"{model}\n{stable}"
+    if n_chunks > 1:
+        raw = f"{settings.EMBEDDING_CHUNK_TOKENS}/{settings.EMBEDDING_CHUNK_OVERLAP}/{settings.EMBEDDING_MAX_CHUNKS}\n{raw}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def ticket_entries(ticket: dict, chunks: List[str], vectors, settings=None) -> list:
+    """
+    [(key, vector, meta), …] de un ticket, trozo 0 primero. Con texto
+    explícito no hay huella comparable: text_hash vacío ⇒ el backend lo
+    re-embeberá en su próxima pasada en vez de dar por bueno un hash antiguo.
+    """
+    digest = "" if "text" in ticket else text_hash(ticket, len(chunks), settings)
+    head = {**ticket_meta(ticket, settings), "text_hash": digest, "chunks": len(chunks)}
+    return [(chunk_key(ticket["id"], 0), vectors[0], head)] + [
+        (chunk_key(ticket["id"], n), vectors[n], chunk_meta(ticket, n, settings)) for n in range(1, len(chunks))
+    ]
+
+
+def _validate(item, settings) -> Tuple[Optional[List[str]], Optional[str]]:
+    """(trozos, None) si el elemento es válido; (None, motivo) si no."""
+    if not isinstance(item, dict):
+        return None, "se esperaba un objeto"
+    ticket_id = item.get("id")
+    if isinstance(ticket_id, bool) or not isinstance(ticket_id, (int, str)) or str(ticket_id).strip() == "":
+        return None, "falta id"
+    if "text" in item:
+        text = item["text"]
+        if not isinstance(text, str) or not text.strip():
+            return None, "texto vacío"
+        return [text], None
+    chunks = ticket_chunks(item, settings)
+    if not chunks[0].strip():
+        return None, "texto vacío"
+    return chunks, None
+
+
+def _embed(client, texts: List[str]) -> List[List[float]]:
+    """Una llamada por petición de split_requests (topes de entradas y tokens)."""
+    vectors: List[List[float]] = []
+    for request in split_requests(texts):
+        vectors.extend(client.embed(request))
+    return vectors
+
+
+def embed_batch(items: List[dict], *, client, redis=None, settings=None) -> List[dict]:
+    """
+    *client* es cualquier objeto con embed(textos) → vectores (AzureEmbeddings
+    o un sustituto en tests). Devuelve un estado por elemento, en el orden de
+    entrada: {"id", "status": ok|invalid|error, "error"?}.
+    """
+    settings = settings or get_settings()
+    results: List[dict] = []
+    valid: List[Tuple[int, dict, List[str]]] = []    # (posición, ticket, trozos)
+    for pos, item in enumerate(items):
+        chunks, reason = _validate(item, settings)
+        ticket_id = item.get("id") if isinstance(item, dict) else None
+        if reason:
+            results.append({"id": ticket_id, "status": INVALID, "error": reason})
+        else:
+            results.append({"id": ticket_id, "status": OK})
+            valid.append((pos, item, chunks))
+    if not valid:
+        return results
+
+    try:
+        vectors = _embed(client, [text for _, _, chunks in valid for text in chunks])
+    except Exception as e:
+        for pos, _, _ in valid:
+            results[pos].update(status=ERROR, error=f"embedding: {e}")
+        return results
+
+    entries, owners, start = [], [], 0
+    for pos, ticket, chunks in valid:
+        for entry in ticket_entries(ticket, chunks, vectors[start:start + len(chunks)], settings):
+            entries.append(entry)
+            owners.append(pos)
+        start += len(chunks)
+    stale = [
+        chunk_key(ticket["id"], n)
+        for _, ticket, chunks in valid
+        for n in range(len(chunks), settings.EMBEDDING_MAX_CHUNKS)
+    ]
+    errors = write_embeddings(entries, redis=redis, delete=stale)
+    for pos, error in zip(owners, errors):
+        if error and results[pos]["status"] == OK:
+            results[pos].update(status=ERROR, error=f"redis: {error}")
+    return results
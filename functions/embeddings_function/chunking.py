@@ -0,0 +1,102 @@
+"""
+Copia de backend/embeddings/chunking.py (troceado de descripciones largas)
+y de split_requests de backend/embeddings/openai_client.py.
+
+La Function se despliega sin el paquete backend; los trozos deben salir
+idénticos a los del backend para que éste dé por buenos los vectores que
+escribe la Function (tests/functions lo comprueba).
+"""
+from typing import List
+
+CHARS_PER_TOKEN = 3
+MAX_INPUTS = 2048              # tope de textos por petición de la API de embeddings
+MAX_REQUEST_TOKENS = 300_000   # tope de tokens (suma de todos los textos) por petición
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            _encoding = False
+        else:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens de *text* (estimación por lo alto sin tiktoken)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def chunk_key(ticket_id, n: int) -> str:
+    """Trozo 0 → ticket:<id> (la key de siempre); trozo n → ticket:<id>:<n>."""
+    return f"ticket:{ticket_id}" if n == 0 else f"ticket:{ticket_id}:{n}"
+
+
+def _split_tokens(text: str, max_tokens: int, overlap: int, encoding) -> List[str]:
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    step = max_tokens - overlap
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens) - overlap, step)]
+
+
+def _split_words(text: str, max_tokens: int, overlap: int) -> List[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    words = []
+    for word in text.split():                   # palabras gigantes (hex, base64) en trozos
+        words.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+    costs = [-(-len(w) // CHARS_PER_TOKEN) for w in words]
+    if sum(costs) <= max_tokens:
+        return [text]
+
+    pieces, start = [], 0
+    while True:
+        end, used = start, 0
+        while end < len(words) and used + costs[end] <= max_tokens:
+            used += costs[end]
+            end += 1
+        pieces.append(" ".join(words[start:end]))
+        if end >= len(words):
+            return pieces
+        # retrocede hasta *overlap* tokens, avanzando siempre al menos una palabra
+        start_next, back = end, 0
+        while start_next > start + 1 and back + costs[start_next - 1] <= overlap:
+            start_next -= 1
+            back += costs[start_next]
+        start = start_next
+
+
+def split_text(text: str, max_tokens: int, overlap: int) -> List[str]:
+    """Trozos de como mucho *max_tokens* que se solapan *overlap* tokens."""
+    if not text:
+        return [text]
+    overlap = min(overlap, max_tokens // 2)
+    encoding = _get_encoding()
+    if encoding is not None:
+        return _split_tokens(text, max_tokens, overlap, encoding)
+    return _split_words(text, max_tokens, overlap)
+
+
+def split_requests(
+    texts: List[str], max_inputs: int = MAX_INPUTS, max_tokens: int = MAX_REQUEST_TOKENS,
+) -> List[List[str]]:
+    """Parte *texts* (en orden) en peticiones dentro de los topes de la API."""
+    requests, current, used = [], [], 0
+    for text in texts:
+        cost = count_tokens(text)
+        if current and (len(current) >= max_inputs or used + cost > max_tokens):
+            requests.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        requests.append(current)
+    return requests
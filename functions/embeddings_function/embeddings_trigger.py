@@ -1,4 +1,46 @@
 """
 HTTP trigger for processing ticket embeddings with Azure OpenAI and storing in Redis.
+
+    POST {"tickets": [{"id": 1, "ShortDescription": …}, …]}
+      → 200 {"results": [{"id": 1, "status": "ok"}, …]}
+      → 207 si algún elemento quedó como invalid/error
+
+Los clientes (embeddings y Redis) se crean en la primera invocación y se
+reutilizan mientras el host siga vivo; httpx y redis se importan entonces,
+no al cargar el módulo, para que el arranque en frío sea corto.
 """
-# TODO: Implement HTTP trigger for embeddings 
\ No newline at end of file
+import json
+import logging
+
+import azure.functions as func
+
+from ..redis_utils import get_redis
+from ..settings import get_settings
+from .azure_embeddings import get_embeddings_client
+from .batch import OK, embed_batch
+
+
+def _json(body: dict, status_code: int) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps(body, ensure_ascii=False), status_code=status_code, mimetype="application/json",
+    )
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    try:
+        body = req.get_json()
+    except ValueError:
+        return _json({"error": "JSON inválido"}, 400)
+
+    tickets = body.get("tickets") if isinstance(body, dict) else body
+    if not isinstance(tickets, list) or not tickets:
+        return _json({"error": "Se esperaba una lista 'tickets' no vacía"}, 400)
+    max_batch = get_settings().EMBEDDINGS_MAX_BATCH
+    if len(tickets) > max_batch:
+        return _json({"error": f"Máximo {max_batch} tickets por petición"}, 413)
+
+    results = embed_batch(tickets, client=get_embeddings_client(), redis=get_redis())
+    failed = sum(r["status"] != OK for r in results)
+    if failed:
+        logging.warning("Embeddings: %s de %s tickets sin guardar", failed, len(results))
+    return _json({"results": results}, 207 if failed else 200)
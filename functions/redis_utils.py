@@ -1,4 +1,78 @@
 """
 Redis utility for connecting to Azure Redis Enterprise.
+
+El cliente vive a nivel de módulo: se crea en la primera invocación y las
+siguientes del mismo host reutilizan su pool (sin handshake TLS nuevo).
+Las keys y campos son los mismos que escribe el backend
+(backend/utils/redis_client.py), así que el índice emb:* los ve igual.
 """
-# TODO: Implement Redis connection helper 
\ No newline at end of file
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+from .settings import get_settings
+
+KEY_PREFIX = "emb:"
+SEARCH_CACHE_GEN_KEY = "searchcache:gen"       # = backend/search/cache.py GEN_KEY
+
+_client = None
+
+
+def get_redis():
+    """Cliente síncrono compartido entre invocaciones."""
+    global _client
+    if _client is None:
+        import redis                           # import diferido: arranque en frío
+
+        settings = get_settings()
+        _client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            ssl=settings.REDIS_SSL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_S,
+            health_check_interval=30,
+        )
+    return _client
+
+
+def encode_vector(vec: List[float], dtype: Optional[str] = None) -> bytes:
+    """
+    Igual que backend/utils/vector_codec.py pero sin NumPy (little-endian):
+    FLOAT32, FLOAT16 o BFLOAT16 (redondeo al par sobre los 16 bits altos).
+    """
+    dtype = (dtype or get_settings().VECTOR_DTYPE).upper()
+    n = len(vec)
+    if dtype == "FLOAT32":
+        return struct.pack(f"<{n}f", *vec)
+    if dtype == "FLOAT16":
+        return struct.pack(f"<{n}e", *vec)
+    if dtype == "BFLOAT16":
+        bits = struct.unpack(f"<{n}I", struct.pack(f"<{n}f", *vec))
+        return struct.pack(
+            f"<{n}H", *(((b + 0x7FFF + ((b >> 16) & 1)) >> 16) & 0xFFFF for b in bits)
+        )
+    raise ValueError(f"VECTOR_DTYPE no soportado: {dtype}")
+
+
+def write_embeddings(
+    entries: Iterable[Tuple[str, List[float], dict]],
+    redis=None,
+    delete: Iterable[str] = (),
+) -> List[Optional[str]]:
+    """
+    Escribe [(key, vector, meta), …] y borra las keys de *delete* (trozos
+    sobrantes, exista o no la key) en un solo pipeline (un round trip);
+    invalida además la caché de búsqueda del backend. Devuelve, por entrada, None si se guardó o el
+    error de Redis.
+    """
+    entries = list(entries)
+    redis = redis or get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for key, vector, meta in entries:
+        pipe.hset(f"{KEY_PREFIX}{key}", mapping={"vector": encode_vector(vector), **meta})
+    for key in delete:
+        pipe.unlink(f"{KEY_PREFIX}{key}")
+    pipe.incr(SEARCH_CACHE_GEN_KEY)
+    replies = pipe.execute(raise_on_error=False)
+    return [str(r) if isinstance(r, Exception) else None for r in replies[:len(entries)]]
@@ -1,4 +1,83 @@
 """
 Settings for Azure Functions environment variables.
+
+Se leen una sola vez por proceso (get_settings está cacheado), así que las
+invocaciones en caliente no vuelven a tocar os.environ. En local, si está
+python-dotenv, se carga también el .env. Los nombres coinciden con los del
+backend para compartir local.settings.json / App Settings.
 """
-# TODO: Implement settings loader (use os.environ or dotenv) 
\ No newline at end of file
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def _bool(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+@dataclass(frozen=True)
+class Settings:
+    # ─── Azure OpenAI ───
+    AZURE_OPENAI_ENDPOINT: Optional[str]
+    AZURE_OPENAI_KEY: Optional[str]
+    AZURE_OPENAI_API_VERSION: str
+    AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS: Optional[str]
+    EMBEDDING_DIMENSIONS: Optional[int]
+    EMBEDDING_TIMEOUT_S: float
+
+    # ─── Redis ───
+    REDIS_HOST: str
+    REDIS_PORT: int
+    REDIS_DB: int
+    REDIS_PASSWORD: Optional[str]
+    REDIS_SSL: bool
+    REDIS_SOCKET_TIMEOUT_S: float
+
+    # ─── Vectores / lotes ───
+    VECTOR_DTYPE: str
+    EMBEDDINGS_MAX_BATCH: int
+
+    # ─── Troceado y payload (mismos valores que el backend) ───
+    EMBEDDING_CHUNK_TOKENS: int
+    EMBEDDING_CHUNK_OVERLAP: int
+    EMBEDDING_MAX_CHUNKS: int
+    SEARCH_PAYLOAD_DESCRIPTION_CHARS: int
+
+    @classmethod
+    def from_env(cls, env=os.environ) -> "Settings":
+        return cls(
+            AZURE_OPENAI_ENDPOINT=env.get("AZURE_OPENAI_ENDPOINT"),
+            AZURE_OPENAI_KEY=env.get("AZURE_OPENAI_KEY") or env.get("AZURE_OPENAI_API_KEY"),
+            AZURE_OPENAI_API_VERSION=env.get("AZURE_OPENAI_API_VERSION") or "2023-05-15",
+            AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS=env.get("AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS"),
+            EMBEDDING_DIMENSIONS=_int(env.get("EMBEDDING_DIMENSIONS")),
+            EMBEDDING_TIMEOUT_S=float(env.get("EMBEDDING_TIMEOUT_S", 30)),
+            REDIS_HOST=env.get("REDIS_HOST", "localhost"),
+            REDIS_PORT=int(env.get("REDIS_PORT", 6379)),
+            REDIS_DB=int(env.get("REDIS_DB", 0)),
+            REDIS_PASSWORD=env.get("REDIS_PASSWORD") or None,
+            REDIS_SSL=_bool(env.get("REDIS_SSL")),
+            REDIS_SOCKET_TIMEOUT_S=float(env.get("REDIS_SOCKET_TIMEOUT_S", 5)),
+            VECTOR_DTYPE=env.get("VECTOR_DTYPE", "FLOAT32").upper(),
+            EMBEDDINGS_MAX_BATCH=int(env.get("EMBEDDINGS_MAX_BATCH", 256)),
+            EMBEDDING_CHUNK_TOKENS=int(env.get("EMBEDDING_CHUNK_TOKENS", 512)),
+            EMBEDDING_CHUNK_OVERLAP=int(env.get("EMBEDDING_CHUNK_OVERLAP", 64)),
+            EMBEDDING_MAX_CHUNKS=int(env.get("EMBEDDING_MAX_CHUNKS", 16)),
+            SEARCH_PAYLOAD_DESCRIPTION_CHARS=int(env.get("SEARCH_PAYLOAD_DESCRIPTION_CHARS", 300)),
+        )
+
+
+@lru_cache
+def get_settings() -> Settings:
+    try:
+        from dotenv import load_dotenv
+    except ImportError:                        # en Azure no hace falta
+        pass
+    else:
+        load_dotenv()
+    return Settings.from_env()
@@ -0,0 +1,254 @@
+# scripts/backfill_embeddings.py
+"""
+(Re)genera los vectores de embeddings_idx para todos los tickets existentes.
+
+- Lee la tabla tickets con un cursor de servidor (session.stream), en orden de id.
+- Embebe en lotes de hasta --batch-size tickets, con hasta --concurrency
+  lotes en vuelo a la vez; los trozos de un lote se envían en tantas
+  llamadas como pidan los topes de la API (textos y tokens por petición).
+- Escribe cada lote en Redis con un pipeline de HSET. Los tickets cuyo texto
+  (text_hash) no cambió sólo actualizan metadatos, salvo con --force.
+- Guarda un checkpoint (último id completado de forma contigua) para
+  reanudar tras un fallo o un corte por rate limit.
+- Si un lote falla por un error no transitorio (p. ej. un 400 por un texto
+  inválido), lo parte en mitades como el worker de la cola
+  (backend/embeddings/queue.py) hasta aislar los tickets culpables, que van
+  a la DLQ de la cola y el backfill sigue. Los errores transitorios que
+  agotan los reintentos (429, red) sí detienen el backfill.
+
+Uso (desde la raíz del repositorio):
+    python -m scripts.backfill_embeddings --batch-size 256 --concurrency 4
+    python -m scripts.backfill_embeddings --reset      # ignora el checkpoint
+    python -m scripts.backfill_embeddings --force      # re-embebe aunque el texto no cambió
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from openai import APIConnectionError, APITimeoutError, RateLimitError
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from backend.database.connection import SessionLocal
+from backend.database.models import Ticket
+from backend.config.settings import get_settings
+from backend.embeddings.openai_client import DEPLOY, embedding_kwargs, get_client, split_requests
+from backend.embeddings.queue import TRANSIENT_ERRORS, dead_letter
+from backend.embeddings.service import embed_tickets
+from backend.logging_config import setup_logging
+from backend.utils.ticket_to_text import ticket_to_dict
+
+logger = logging.getLogger("backfill_embeddings")
+
+RETRYABLE = (RateLimitError, APIConnectionError, APITimeoutError)
+
+
+# ───────── Checkpoint ─────────
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"last_id": 0, "done": 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)          # atómico: nunca queda un checkpoint a medias
+
+
+# ───────── Embeddings con reintentos ─────────
+async def embed_with_retry(texts, max_retries: int):
+    """
+    Un lote de tickets troceados puede pasar de MAX_INPUTS textos o de
+    MAX_REQUEST_TOKENS tokens: se parte en peticiones dentro de los topes.
+    """
+    parts = await asyncio.gather(*(_embed_request(part, max_retries) for part in split_requests(texts)))
+    return [vector for part in parts for vector in part]
+
+
+async def _embed_request(texts, max_retries: int):
+    """Una llamada con input=[...]; backoff exponencial ante 429/timeout."""
+    client = get_client()
+    extra = embedding_kwargs(get_settings().EMBEDDING_DIMENSIONS)
+    for attempt in range(max_retries + 1):
+        try:
+            resp = await client.embeddings.create(model=DEPLOY, input=texts, **extra)
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+        except RETRYABLE as e:
+            if attempt == max_retries:
+                raise
+            delay = min(60, 2 ** attempt)
+            logger.warning("Reintento %s en %ss: %s", attempt + 1, delay, e)
+            await asyncio.sleep(delay)
+
+
+async def embed_isolating(tickets, embed, force: bool) -> dict:
+    """
+    Embebe *tickets*; si falla, parte el lote en mitades hasta aislar los
+    culpables y devuelve {id: error} de éstos. Los errores transitorios se
+    propagan (todo el lote fallaría igual: se reanuda desde el checkpoint).
+    """
+    try:
+        await embed_tickets(tickets, embed=embed, force=force)
+        return {}
+    except TRANSIENT_ERRORS:
+        raise
+    except Exception as e:
+        if len(tickets) == 1:
+            return {tickets[0]["id"]: e}
+        half = len(tickets) // 2
+        return {
+            **await embed_isolating(tickets[:half], embed, force),
+            **await embed_isolating(tickets[half:], embed, force),
+        }
+
+
+class Progress:
+    """Avanza el checkpoint sólo sobre lotes contiguos ya terminados."""
+
+    def __init__(self, path: str, state: dict, total: int, report_every: float):
+        self.path = path
+        self.state = state
+        self.total = total
+        self.report_every = report_every
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.done_now = 0
+        self._max_ids = {}            # nº de lote → id máximo del lote
+        self._finished = {}           # nº de lote → tickets del lote
+        self._next = 0
+
+    def register(self, seq: int, max_id: int) -> None:
+        self._max_ids[seq] = max_id
+
+    def complete(self, seq: int, count: int) -> None:
+        self._finished[seq] = count
+        self.done_now += count
+        advanced = False
+        while self._next in self._finished:
+            self.state["done"] = self.state.get("done", 0) + self._finished.pop(self._next)
+            self.state["last_id"] = self._max_ids.pop(self._next)
+            self._next += 1
+            advanced = True
+        if advanced:
+            save_checkpoint(self.path, self.state)
+        if time.monotonic() - self.last_report >= self.report_every:
+            self.report()
+
+    def report(self) -> None:
+        self.last_report = time.monotonic()
+        elapsed = max(self.last_report - self.started, 1e-6)
+        rate = self.done_now / elapsed
+        remaining = max(self.total - self.done_now, 0)
+        eta = remaining / rate if rate else float("inf")
+        logger.info(
+            "%s/%s tickets (%.1f%%) · %.1f tickets/s · ETA %s",
+            self.done_now, self.total,
+            100 * self.done_now / self.total if self.total else 100.0,
+            rate, _fmt_eta(eta),
+        )
+
+
+def _fmt_eta(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "?"
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    return f"{h:d}h{m:02d}m{s:02d}s"
+
+
+async def backfill(args) -> None:
+    state = {"last_id": 0, "done": 0} if args.reset else load_checkpoint(args.checkpoint)
+    logger.info("Reanudando desde id > %s", state["last_id"])
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+    failure = []
+    dead = []                 # ids enviados a la DLQ
+
+    async def run_batch(seq, tickets):
+        try:
+            failed = await embed_isolating(
+                tickets, lambda texts: embed_with_retry(texts, args.max_retries), args.force,
+            )
+            if failed:
+                await dead_letter(failed)
+                dead.extend(failed)
+                for ticket_id, error in failed.items():
+                    logger.error("Ticket %s a la DLQ: %s", ticket_id, error)
+            progress.complete(seq, len(tickets))
+        except Exception as e:
+            failure.append(e)
+        finally:
+            semaphore.release()
+
+    async with SessionLocal() as session:
+        total = await session.scalar(
+            select(func.count(Ticket.id)).where(Ticket.id > state["last_id"])
+        )
+        progress = Progress(args.checkpoint, state, total, args.report_every)
+        logger.info("%s tickets por procesar", total)
+
+        stmt = (
+            select(Ticket)
+            .where(Ticket.id > state["last_id"])
+            .order_by(Ticket.id)
+            .execution_options(yield_per=args.batch_size)
+        )
+        result = await session.stream(stmt)
+
+        seq = 0
+        async for partition in result.scalars().partitions(args.batch_size):
+            await semaphore.acquire()          # backpressure: memoria acotada
+            if failure:
+                semaphore.release()
+                break
+            tickets = [ticket_to_dict(t) for t in partition]
+            session.expunge_all()
+            progress.register(seq, tickets[-1]["id"])
+            task = asyncio.create_task(run_batch(seq, tickets))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            seq += 1
+
+    await asyncio.gather(*tasks)
+    progress.report()
+    if failure:
+        logger.error(
+            "Backfill detenido: %s. Checkpoint en id %s; vuelve a ejecutar para reanudar.",
+            failure[0], state["last_id"],
+        )
+        raise SystemExit(1)
+    if dead:
+        logger.warning(
+            "%s tickets fallaron y están en la DLQ (python -m scripts.embedding_worker --requeue-dlq "
+            "tras corregir la causa)", len(dead),
+        )
+    logger.info("Backfill completo: %s tickets en total", state["done"])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill de embeddings de tickets")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="tickets por lote (sus trozos se reparten en llamadas de ≤2048 textos)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="lotes en vuelo simultáneamente")
+    parser.add_argument("--checkpoint", default=".backfill_embeddings.json")
+    parser.add_argument("--max-retries", type=int, default=6)
+    parser.add_argument("--report-every", type=float, default=10.0,
+                        help="segundos entre reportes de progreso")
+    parser.add_argument("--reset", action="store_true",
+                        help="empieza desde el principio ignorando el checkpoint")
+    parser.add_argument("--force", action="store_true",
+                        help="re-embebe aunque el text_hash coincida (p. ej. tras cambiar VECTOR_DTYPE)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(backfill(parse_args()))
@@ -1,36 +1,44 @@
 # scripts/create_redis_index.py
-import redis
-from redisvl.index import SearchIndex
+"""
+Crea o reconstruye el índice vectorial versionado detrás del alias
+embeddings_idx. Los parámetros (algoritmo, DIM, M, EF_*) salen de settings.
 
-# 1) Conexión
-r = redis.Redis(host="localhost", port=6379, decode_responses=False)
+Uso (desde la raíz del repositorio):
+    python -m scripts.create_redis_index                       # idempotente; migra si
+                                                               # el alias es de otra versión
+    python -m scripts.create_redis_index --rebuild --version 3 # sin downtime
+    python -m scripts.create_redis_index --rebuild --version 3 --drop-old
+"""
+import argparse
+import asyncio
 
-# 2) Esquema del índice
-index = SearchIndex(
-    name="embeddings_idx",
-    prefix="emb:",                 # todas las keys comienzan con emb:
-    storage_type="hash",
-    fields=[
-        {
-            "name": "vector",
-            "type": "vector",
-            "attrs": {
-                "algorithm": "HNSW",            # o "FLAT"
-                "dims": 1536,                   # <-- ajusta a tus embeddings
-                "distance_metric": "COSINE",
-                "datatype": "FLOAT32",          # 4 bytes * dims
-                "initial_cap": 10_000,
-            },
-        },
-        # (opcional) metadatos para filtrar
-        {"name": "ticket_id", "type": "tag"},
-        {"name": "status", "type": "tag"},
-    ],
-)
+from backend.config.settings import get_settings
+from backend.logging_config import setup_logging
+from backend.utils.redis_client import close_redis
+from backend.utils.vector_index import current_index, ensure_index, rebuild_index, upgrade_index
 
-# 3) Crear (idempotente)
-if not index.exists(r):
-    index.create(r)
-    print("Índice creado")
-else:
-    print("Índice existente")
+
+async def main(args):
+    try:
+        if args.rebuild:
+            version = args.version or get_settings().VECTOR_INDEX_VERSION
+            name = await rebuild_index(version, drop_old=args.drop_old)
+            print(f"Alias embeddings_idx → {name}")
+        else:
+            await ensure_index()
+            await upgrade_index()              # alias en una versión anterior ⇒ migra
+            print(f"Índice vigente: {await current_index()}")
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice vectorial de Redis")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="construye la versión en segundo plano y mueve el alias")
+    parser.add_argument("--version", type=int,
+                        help="versión a construir (por defecto VECTOR_INDEX_VERSION)")
+    parser.add_argument("--drop-old", action="store_true",
+                        help="elimina el índice anterior tras el cambio (no borra datos)")
+    setup_logging()
+    asyncio.run(main(parser.parse_args()))
@@ -3,7 +3,7 @@ import os
 import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, selectinload
-from backend.database.models import Base, Ticket, Embedding
+from backend.database.models import Ticket, Embedding
 from datetime import datetime
 from backend.config.settings import get_settings 
 
@@ -14,9 +14,7 @@ engine = create_async_engine(DATABASE_URL, echo=True, future=True)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def main():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
+    # El esquema lo crean las migraciones: `alembic upgrade head`
     async with SessionLocal() as session:
         # Cambiar el TicketNumber para evitar duplicados
         ticket = Ticket(
@@ -0,0 +1,52 @@
+# scripts/embedding_worker.py
+"""
+Pool de workers de la cola de embeddings (backend/embeddings/queue.py)
+como proceso independiente de la API. Úsalo con EMBEDDING_WORKERS_IN_APP=false
+para escalar los workers por separado.
+
+Uso (desde la raíz del repositorio):
+    python -m scripts.embedding_worker --concurrency 4
+    python -m scripts.embedding_worker --stats
+    python -m scripts.embedding_worker --requeue-dlq     # tras corregir la causa
+"""
+import argparse
+import asyncio
+import json
+import signal
+
+from backend.embeddings.queue import (
+    queue_stats, requeue_dead_letters, start_embedding_workers, stop_embedding_workers,
+)
+from backend.logging_config import setup_logging
+from backend.utils.http_clients import close_http_clients
+from backend.utils.redis_client import close_redis
+
+
+async def main(args):
+    try:
+        if args.stats:
+            print(json.dumps(await queue_stats()))
+        elif args.requeue_dlq:
+            print(f"{await requeue_dead_letters()} mensajes devueltos a la cola")
+        else:
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop.set)
+            await start_embedding_workers(args.concurrency)
+            await stop.wait()
+            await stop_embedding_workers()
+    finally:
+        await close_http_clients()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Workers de la cola de embeddings")
+    parser.add_argument("--concurrency", type=int,
+                        help="consumers en este proceso (por defecto EMBEDDING_WORKER_CONCURRENCY)")
+    parser.add_argument("--stats", action="store_true", help="muestra el estado de la cola y sale")
+    parser.add_argument("--requeue-dlq", action="store_true",
+                        help="devuelve la dead-letter queue a la cola y sale")
+    setup_logging()
+    asyncio.run(main(parser.parse_args()))
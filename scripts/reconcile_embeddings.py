@@ -0,0 +1,42 @@
+# scripts/reconcile_embeddings.py
+"""
+Reconcilia los vectores de Redis con la tabla tickets
+(backend/embeddings/reconcile.py): borra los huérfanos y encola los
+tickets sin vector. La API hace lo mismo cada RECONCILE_INTERVAL_S.
+
+Uso (desde la raíz del repositorio):
+    python -m scripts.reconcile_embeddings
+    python -m scripts.reconcile_embeddings --dry-run          # sólo cuenta
+    python -m scripts.reconcile_embeddings --max-keys-per-s 0 # sin límite de ritmo
+"""
+import argparse
+import asyncio
+import json
+
+from backend.config.settings import get_settings
+from backend.embeddings.reconcile import Reconciler
+from backend.logging_config import setup_logging
+from backend.utils.redis_client import close_redis
+
+
+async def main(args):
+    settings = get_settings().model_copy(update={
+        k: v for k, v in {
+            "RECONCILE_BATCH_SIZE": args.batch_size,
+            "RECONCILE_MAX_KEYS_PER_S": args.max_keys_per_s,
+        }.items() if v is not None
+    })
+    try:
+        stats = await Reconciler(settings=settings, dry_run=args.dry_run).run()
+        print(json.dumps(stats))
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconciliación de vectores Redis ↔ Postgres")
+    parser.add_argument("--dry-run", action="store_true", help="cuenta huérfanos y faltantes sin tocar nada")
+    parser.add_argument("--batch-size", type=int, help="keys por SCAN / ids por consulta IN")
+    parser.add_argument("--max-keys-per-s", type=float, help="ritmo máximo (0 = sin límite)")
+    setup_logging()
+    asyncio.run(main(parser.parse_args()))
@@ -12,7 +12,7 @@ async def demo():
     print(f"Embedding length   : {len(vec)}")          # debería ser 1536
     print(f"Primeros 5 valores : {vec[:5]}")
 
-    vec_redis = get_vector(key)
+    vec_redis = await get_vector(key)
     print("¿Redis lo devolvió?:", vec_redis is not None)
     print("Coinciden longitudes?", len(vec) == len(vec_redis))
 
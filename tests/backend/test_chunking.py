@@ -0,0 +1,48 @@
+# tests/backend/test_chunking.py
+from types import SimpleNamespace
+
+from backend.embeddings import chunking
+from backend.embeddings.chunking import chunk_key, chunk_ticket_id, split_text, ticket_chunks
+from backend.utils.ticket_to_text import ticket_to_text
+
+SETTINGS = SimpleNamespace(EMBEDDING_CHUNK_TOKENS=10, EMBEDDING_CHUNK_OVERLAP=2, EMBEDDING_MAX_CHUNKS=3)
+
+
+def test_keys():
+    assert chunk_key(42, 0) == "ticket:42"
+    assert chunk_key(42, 3) == "ticket:42:3"
+    assert chunk_ticket_id("ticket:42:3") == chunk_ticket_id("ticket:42") == "ticket:42"
+
+
+def test_word_windows_overlap_and_respect_budget(monkeypatch):
+    monkeypatch.setattr(chunking, "_encoding", False)          # sin tiktoken
+    words = [f"w{i:02d}" for i in range(30)]                    # 1 token estimado c/u
+    pieces = split_text(" ".join(words), max_tokens=10, overlap=2)
+
+    assert all(len(p.split()) <= 10 for p in pieces)
+    assert pieces[0].split()[-2:] == pieces[1].split()[:2]      # solape
+    assert pieces[-1].split()[-1] == "w29"
+    assert split_text("corto", 10, 2) == ["corto"]
+
+
+def test_giant_words_are_split(monkeypatch):
+    monkeypatch.setattr(chunking, "_encoding", False)
+    pieces = split_text("a" * 100, max_tokens=10, overlap=0)
+    assert all(len(p) <= 30 for p in pieces) and "".join(pieces) == "a" * 100
+
+
+def test_ticket_chunks(monkeypatch):
+    monkeypatch.setattr(chunking, "_encoding", False)
+    short = {"id": 1, "ShortDescription": "VPN", "Description": "no conecta"}
+    assert ticket_chunks(short, SETTINGS) == [ticket_to_text(short)]
+
+    long = {**short, "Description": " ".join(f"w{i:02d}" for i in range(100))}
+    chunks = ticket_chunks(long, SETTINGS)
+    assert len(chunks) == 3                                     # EMBEDDING_MAX_CHUNKS
+    assert all("Título: VPN." in c for c in chunks)
+    assert "w00" in chunks[0] and "w00" not in chunks[1]
+
+
+def test_ticket_text_skips_empty_fields():
+    text = ticket_to_text({"TicketNumber": "INC-0000001", "Category": None, "Subcategory": "", "Priority": "Alta"})
+    assert text == "Número de ticket: INC-0000001. Prioridad: Alta."
@@ -0,0 +1,56 @@
+# tests/backend/test_db_pool.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database.connection import InstrumentedPool, pool_metrics
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_times_out_fast_and_is_counted():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    before = pool_metrics.snapshot()
+    try:
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            assert engine.pool.checkedout() == 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    after = pool_metrics.snapshot()
+    assert after["timeouts"] == before["timeouts"] + 1
+    assert after["checkouts"] == before["checkouts"] + 1
+
+
+@pytest.mark.asyncio
+async def test_overflow_connections_and_connect_errors_are_counted_apart():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=InstrumentedPool, pool_size=1, max_overflow=1,
+    )
+    before = pool_metrics.snapshot()
+    try:
+        async with engine.connect(), engine.connect():
+            pass
+    finally:
+        await engine.dispose()
+    assert pool_metrics.snapshot()["overflow_events"] == before["overflow_events"] + 1
+
+    broken = create_async_engine(
+        "sqlite+aiosqlite:////no/existe/db.sqlite", poolclass=InstrumentedPool, pool_size=1,
+    )
+    try:
+        with pytest.raises(Exception):
+            async with broken.connect():
+                pass
+    finally:
+        await broken.dispose()
+    after = pool_metrics.snapshot()
+    assert after["errors"] == before["errors"] + 1
+    assert after["timeouts"] == before["timeouts"]
@@ -0,0 +1,194 @@
+# tests/backend/test_embed_tickets.py
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from backend.embeddings import chunking, service
+from backend.utils import local_vector_store
+from backend.utils.local_vector_store import LocalVectorStore
+
+
+@pytest.fixture(autouse=True)
+def bumps(monkeypatch):
+    """Sin Redis real: caché de búsqueda apagada y generaciones contadas aquí."""
+    calls = []
+
+    async def bump_search_generation():
+        calls.append(1)
+    for module in ("backend.embeddings.service", "backend.routes.tickets"):
+        monkeypatch.setattr(f"{module}.bump_search_generation", bump_search_generation)
+    monkeypatch.setattr("backend.search.service.get_search_cache", lambda: None)
+    return calls
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalVectorStore(str(tmp_path))
+    monkeypatch.setattr(local_vector_store, "_store", store)
+    monkeypatch.setattr(service, "get_batcher", lambda: SimpleNamespace(dimensions=2))
+    monkeypatch.setattr(
+        "backend.utils.vector_store.get_settings", lambda: SimpleNamespace(VECTOR_BACKEND="local"),
+    )
+    monkeypatch.setattr(chunking, "_encoding", False)
+    monkeypatch.setattr(chunking, "get_settings", lambda: SimpleNamespace(
+        EMBEDDING_CHUNK_TOKENS=10, EMBEDDING_CHUNK_OVERLAP=2, EMBEDDING_MAX_CHUNKS=8,
+        SEARCH_PAYLOAD_DESCRIPTION_CHARS=12, SEARCH_CHUNK_OVERSAMPLE=3,
+    ))
+    monkeypatch.setattr(service, "get_settings", chunking.get_settings)
+    return store
+
+
+class FakeEmbed:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(texts)
+        return [[1.0, float(len(t))] for t in texts]
+
+
+def _ticket(id, **fields):
+    return {"id": id, "ShortDescription": "VPN caída", "Status": "Nuevo", **fields}
+
+
+@pytest.mark.asyncio
+async def test_only_changed_text_is_reembedded(store):
+    embed = FakeEmbed()
+    assert await service.embed_tickets([_ticket(1), _ticket(2)], embed=embed) == 2
+
+    # cambio de texto en 1, cambio sólo de metadatos (status) en 2
+    changed = await service.embed_tickets(
+        [_ticket(1, ShortDescription="VPN caída en sede norte"), _ticket(2)], embed=embed,
+    )
+    assert changed == 1
+    assert len(embed.calls[-1]) == 1 and "sede norte" in embed.calls[-1][0]
+
+
+@pytest.mark.asyncio
+async def test_status_change_updates_tag_without_api_call(store):
+    embed = FakeEmbed()
+    await service.embed_tickets([_ticket(1)], embed=embed)
+    vector = store.get("ticket:1")
+
+    assert await service.embed_tickets([_ticket(1, Status="Cerrado", AssignedTo="ana")], embed=embed) == 0
+    assert len(embed.calls) == 1
+    assert store.get("ticket:1") == vector
+    assert store.get_meta("ticket:1")["status"] == "Cerrado"
+
+    assert await service.embed_tickets([_ticket(1, Status="Cerrado")], embed=embed, force=True) == 1
+
+
+@pytest.mark.asyncio
+async def test_long_description_is_chunked_in_one_call(store):
+    embed = FakeEmbed()
+    words = " ".join(f"w{i:02d}" for i in range(30))
+    await service.embed_tickets([_ticket(1, Description=words), _ticket(2)], embed=embed)
+
+    assert len(embed.calls) == 1 and len(embed.calls[0]) > 2
+    n = int(store.get_meta("ticket:1")["chunks"])
+    assert n > 1 and store.get_meta(f"ticket:1:{n - 1}")["ticket_id"] == "1"
+
+    # más corta ⇒ se borran los trozos sobrantes
+    await service.embed_tickets([_ticket(1, Description="w00 w01")], embed=embed)
+    assert store.get_meta("ticket:1")["chunks"] == "1"
+    assert store.get("ticket:1:1") is None
+
+    await service.embed_tickets([_ticket(1, Description=words)], embed=embed)
+    await service.delete_ticket_embeddings([1])
+    assert [k for k in store.snapshot().ids.tolist() if k.startswith("ticket:1")] == []
+
+
+@pytest.mark.asyncio
+async def test_search_hits_carry_current_payload_without_postgres(store, monkeypatch):
+    from backend.search import service as search
+
+    embed = FakeEmbed()
+    words = " ".join(f"w{i:02d}" for i in range(30))
+    await service.embed_tickets([_ticket(1, Description=words, Priority="Alta")], embed=embed)
+    await service.embed_tickets([_ticket(1, Description=words, Priority="Alta", Status="Cerrado")], embed=embed)
+
+    async def embed_text(text):
+        return [1.0, 0.0]
+    monkeypatch.setattr(search, "embed_text", embed_text)
+    monkeypatch.setattr(search, "get_settings", chunking.get_settings)
+
+    [hit] = await search.knn_search("vpn", k=5)
+    assert hit["key"] == "ticket:1"                       # trozos agrupados
+    assert hit["ticket"] == {
+        "id": 1, "TicketNumber": None, "ShortDescription": "VPN caída",
+        "Status": "Cerrado", "Priority": "Alta", "Description": "w00 w01 w02…",
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_search_embeds_once_and_keeps_input_order(store, monkeypatch):
+    from backend.search import service as search
+
+    embed = FakeEmbed()
+    await service.embed_tickets(
+        [_ticket(1), _ticket(2, ShortDescription="Impresora sin tóner en la planta 3"),
+         _ticket(3, Status="Cerrado")],
+        embed=embed,
+    )
+
+    vectors = {"vpn": [1.0, 0.0], "impresora": [0.0, 1.0]}
+    calls = []
+
+    async def embed_texts(texts, direct=False):
+        calls.append(texts)
+        return [vectors[t] for t in texts]
+
+    async def embed_text(text):
+        return vectors[text]
+    monkeypatch.setattr(search, "embed_texts", embed_texts)
+    monkeypatch.setattr(search, "embed_text", embed_text)
+    monkeypatch.setattr(search, "get_settings", chunking.get_settings)
+
+    queries = [
+        {"text": "impresora", "k": 1, "mode": "vector", "filters": {}},
+        {"text": "vpn", "k": 3, "mode": "hybrid", "filters": {"status": "Nuevo"}},
+        {"text": "vpn", "k": 2, "mode": "vector", "filters": {}},
+    ]
+    results = await search.batch_knn_search(queries)
+
+    assert calls == [["impresora", "vpn", "vpn"]]          # una sola llamada
+    for q, hits in zip(queries, results):
+        assert hits == await search.knn_search(q["text"], q["k"], mode=q["mode"], **q["filters"])
+    assert [h["key"] for h in results[0]] == ["ticket:2"]
+    assert {h["ticket"]["Status"] for h in results[1]} == {"Nuevo"}
+
+
+@pytest_asyncio.fixture
+async def session():
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.schema import CreateTable
+
+    from backend.database.models import Attachment, Embedding, Ticket
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (Ticket, Attachment, Embedding):         # sin los índices de Postgres
+            await conn.execute(CreateTable(model.__table__))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as s:
+        yield s
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_ticket_writes_invalidate_the_search_cache(store, session, bumps, monkeypatch):
+    from backend.routes import tickets
+    from backend.schemas.ticket import TicketCreate, TicketUpdate
+
+    async def enqueue(ticket_id):
+        pass
+    monkeypatch.setattr(tickets, "_enqueue_embedding", enqueue)
+
+    created = await tickets.create_ticket(
+        TicketCreate(TicketNumber="INC-0000001", ShortDescription="VPN", CreatedBy="ivr"), session,
+    )
+    assert len(bumps) == 1
+    await tickets.update_ticket(created.id, TicketUpdate(Status="Cerrado", CreatedBy="ivr"), session)
+    assert len(bumps) == 2
+    await tickets.delete_ticket(created.id, session)
+    assert len(bumps) >= 3                  # la ruta y el borrado de sus vectores
@@ -0,0 +1,83 @@
+# tests/backend/test_embedding_batcher.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.embeddings.openai_client import EmbeddingBatcher
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call():
+    fake = SimpleNamespace(embeddings=FakeEmbeddings())
+    batcher = EmbeddingBatcher(fake, "ada", window_ms=5, max_batch=16)
+
+    vectors = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("bbb"), batcher.embed("a")
+    )
+
+    assert vectors == [[1.0], [3.0], [1.0]]
+    assert fake.embeddings.calls == [["a", "bbb"]]       # deduplicado
+
+
+@pytest.mark.asyncio
+async def test_max_batch_flushes_early():
+    fake = SimpleNamespace(embeddings=FakeEmbeddings())
+    batcher = EmbeddingBatcher(fake, "ada", window_ms=10_000, max_batch=2)
+
+    vectors = await asyncio.wait_for(batcher.embed_many(["x", "yy", "zzz", "w"]), 1)
+
+    assert vectors == [[1.0], [2.0], [3.0], [1.0]]
+    assert fake.embeddings.calls == [["x", "yy"], ["zzz", "w"]]
+
+
+@pytest.mark.asyncio
+async def test_embed_all_ignores_max_batch():
+    fake = SimpleNamespace(embeddings=FakeEmbeddings())
+    batcher = EmbeddingBatcher(fake, "ada", window_ms=10_000, max_batch=2)
+
+    vectors = await asyncio.wait_for(batcher.embed_all(["x", "yy", "zzz", "x"]), 1)
+
+    assert vectors == [[1.0], [2.0], [3.0], [1.0]]
+    assert fake.embeddings.calls == [["x", "yy", "zzz"]]
+
+
+class ShortEmbeddings(FakeEmbeddings):
+    """Devuelve un vector menos de los pedidos."""
+
+    async def create(self, model, input):
+        resp = await super().create(model, input)
+        return SimpleNamespace(data=resp.data[:-1])
+
+
+@pytest.mark.asyncio
+async def test_short_response_fails_every_caller():
+    fake = SimpleNamespace(embeddings=ShortEmbeddings())
+    batcher = EmbeddingBatcher(fake, "ada", window_ms=5, max_batch=16)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed("a"), batcher.embed("bb"), batcher.embed("a"), return_exceptions=True), 1
+    )
+
+    assert len(results) == 3 and all(isinstance(r, ValueError) for r in results)
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(batcher.embed_all(["x", "yy"]), 1)
+
+
+def test_split_requests_caps_inputs_and_tokens(monkeypatch):
+    from backend.embeddings import openai_client
+
+    monkeypatch.setattr(openai_client, "count_tokens", len)
+    assert openai_client.split_requests(["a"] * 5, max_inputs=2) == [["a", "a"], ["a", "a"], ["a"]]
+    texts = ["x" * 10, "y" * 10, "z"]
+    assert openai_client.split_requests(texts, max_tokens=15) == [[texts[0]], [texts[1], texts[2]]]
@@ -0,0 +1,64 @@
+# tests/backend/test_embedding_cache.py
+import fakeredis
+import pytest
+
+from backend.embeddings.cache import EmbeddingCache, cache_key, LRU_KEY
+
+
+def test_key_ignores_whitespace_but_not_model():
+    assert cache_key("ada", "  hola\n mundo ") == cache_key("ada", "hola mundo")
+    assert cache_key("ada", "hola") != cache_key("3-small", "hola")
+
+
+@pytest.mark.asyncio
+async def test_local_then_redis_tier():
+    r = fakeredis.FakeAsyncRedis()
+    cache = EmbeddingCache(redis=r, local_size=1)
+
+    assert await cache.get("ada", "vpn caída") is None
+    await cache.set("ada", "vpn caída", [0.5, 0.25])
+    assert await cache.get("ada", "vpn caída") == pytest.approx([0.5, 0.25])
+
+    # otro worker: LRU local vacío, acierta en Redis
+    other = EmbeddingCache(redis=r, local_size=1)
+    assert await other.get("ada", "vpn  caída") == pytest.approx([0.5, 0.25])
+
+    assert (await cache.stats())["local_hits"] == 1
+    assert (await cache.stats())["misses"] == 1
+    assert (await other.stats())["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_size_bounded():
+    r = fakeredis.FakeAsyncRedis()
+    cache = EmbeddingCache(redis=r, local_size=1, max_entries=2)
+    for i in range(4):
+        await cache.set("ada", f"texto {i}", [float(i)])
+
+    assert await r.zcard(LRU_KEY) == 2
+    fresh = EmbeddingCache(redis=r, local_size=1)
+    assert await fresh.get("ada", "texto 0") is None
+    assert await fresh.get("ada", "texto 3") == pytest.approx([3.0])
+
+
+@pytest.mark.asyncio
+async def test_api_gets_original_text_and_cache_key_is_normalized(monkeypatch):
+    from types import SimpleNamespace
+
+    from backend.embeddings import service
+
+    sent = []
+
+    async def embed_many(texts):
+        sent.extend(texts)
+        return [[1.0] for _ in texts]
+
+    cache = EmbeddingCache(redis=fakeredis.FakeAsyncRedis(), local_size=4)
+    monkeypatch.setattr(service, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(service, "get_batcher", lambda: SimpleNamespace(dimensions=None, embed_many=embed_many))
+    monkeypatch.setattr(service, "model_key", lambda dims: "ada")
+
+    original = "Línea 1\n  línea 2"
+    assert await service.embed_texts([original]) == [[1.0]]
+    assert sent == [original]                               # la API recibe el texto tal cual
+    assert await cache.get("ada", "Línea 1 línea 2") == pytest.approx([1.0])
@@ -0,0 +1,174 @@
+# tests/backend/test_embedding_queue.py
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from openai import RateLimitError
+
+from backend.embeddings.queue import (
+    DLQ, GROUP, RETRY, STREAM, EmbeddingWorker, dead_letter, enqueue_tickets, ensure_group,
+    queue_stats, requeue_dead_letters,
+)
+
+SETTINGS = SimpleNamespace(
+    EMBEDDING_QUEUE_BATCH_SIZE=10,
+    EMBEDDING_QUEUE_BLOCK_MS=10,
+    EMBEDDING_QUEUE_MAX_ATTEMPTS=2,
+    EMBEDDING_QUEUE_BACKOFF_S=0,
+    EMBEDDING_QUEUE_BACKOFF_MAX_S=0,
+    EMBEDDING_QUEUE_CLAIM_IDLE_MS=0,
+    EMBEDDING_QUEUE_MAXLEN=1000,
+)
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    monkeypatch.setattr("backend.embeddings.queue.get_settings", lambda: SETTINGS)
+    r = FakeAsyncRedis()
+    await ensure_group(r)
+    yield r
+    await r.aclose()
+
+
+def worker(redis, process, name="w1"):
+    return EmbeddingWorker(name, process=process, redis=redis, settings=SETTINGS)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_processed_once_and_acked(redis):
+    batches = []
+
+    async def process(ids):
+        batches.append(ids)
+        return len(ids)
+
+    await enqueue_tickets([3, 1, 3], redis=redis)
+    assert await worker(redis, process).run_once() == 3
+
+    assert batches == [[1, 3]]                     # un lote, ids únicos
+    assert (await redis.xpending(STREAM, GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_retry_then_go_to_dlq(redis):
+    async def boom(ids):
+        raise RuntimeError("429")
+
+    await enqueue_tickets([7], redis=redis)
+    w = worker(redis, boom)
+
+    await w.run_once()                             # intento 1 → reintento
+    assert [json.loads(m) for m in await redis.zrange(RETRY, 0, -1)] == [
+        {"ticket_id": 7, "attempts": 1}
+    ]
+    await w.run_once()                             # se promueve y falla: intento 2 → DLQ
+    stats = await queue_stats(redis)
+    assert (stats["retrying"], stats["dead"], stats["pending"]) == (0, 1, 0)
+
+    assert await requeue_dead_letters(redis) == 1
+    assert (await redis.xlen(DLQ)) == 0
+
+
+@pytest.mark.asyncio
+async def test_unacked_messages_of_a_dead_worker_are_reclaimed(redis):
+    await enqueue_tickets([5], redis=redis)
+    await redis.xreadgroup(GROUP, "caido", {STREAM: ">"}, count=10)   # leyó y murió
+
+    seen = []
+
+    async def process(ids):
+        seen.extend(ids)
+
+    await worker(redis, process, name="w2").run_once()
+    assert seen == [5]
+    assert (await redis.xpending(STREAM, GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_poisoned_id_does_not_retry_its_neighbours(redis):
+    calls = []
+
+    async def process(ids):
+        calls.append(ids)
+        if 4 in ids:
+            raise ValueError("400: texto demasiado largo")
+        return len(ids)
+
+    await enqueue_tickets([1, 2, 3, 4, 5], redis=redis)
+    await worker(redis, process).run_once()
+
+    assert calls[0] == [1, 2, 3, 4, 5] and [4] in calls
+    assert [json.loads(m) for m in await redis.zrange(RETRY, 0, -1)] == [
+        {"ticket_id": 4, "attempts": 1}
+    ]
+    assert (await redis.xpending(STREAM, GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transient_error_retries_the_batch_without_splitting(redis):
+    calls = []
+    response = httpx.Response(429, request=httpx.Request("POST", "https://openai.test"))
+
+    async def throttled(ids):
+        calls.append(ids)
+        raise RateLimitError("429", response=response, body=None)
+
+    await enqueue_tickets([1, 2, 3], redis=redis)
+    await worker(redis, throttled).run_once()
+
+    assert calls == [[1, 2, 3]]
+    assert await redis.zcard(RETRY) == 3
+
+
+@pytest.mark.asyncio
+async def test_backfill_dead_letters_only_the_bad_ticket(redis, monkeypatch):
+    from scripts import backfill_embeddings
+
+    calls = []
+
+    async def embed_tickets(tickets, embed, force):
+        calls.append([t["id"] for t in tickets])
+        if any(t["id"] == 3 for t in tickets):
+            raise ValueError("400: texto inválido")
+
+    monkeypatch.setattr(backfill_embeddings, "embed_tickets", embed_tickets)
+    failed = await backfill_embeddings.embed_isolating([{"id": i} for i in range(1, 6)], None, False)
+
+    assert list(failed) == [3]
+    assert [1, 2] in calls and [4, 5] in calls                 # los vecinos sí se embeben
+    await dead_letter(failed, redis=redis)
+    [(_, fields)] = await redis.xrange(DLQ)
+    assert fields[b"ticket_id"] == b"3" and b"400" in fields[b"error"]
+    assert await requeue_dead_letters(redis=redis) == 1
+
+
+@pytest.mark.asyncio
+async def test_backfill_stops_on_transient_errors(monkeypatch):
+    from scripts import backfill_embeddings
+
+    response = httpx.Response(429, request=httpx.Request("POST", "https://openai.test"))
+
+    async def throttled(tickets, embed, force):
+        raise RateLimitError("429", response=response, body=None)
+
+    monkeypatch.setattr(backfill_embeddings, "embed_tickets", throttled)
+    with pytest.raises(RateLimitError):
+        await backfill_embeddings.embed_isolating([{"id": 1}, {"id": 2}], None, False)
+
+
+def test_queue_stats_route_is_not_shadowed_by_emb_id(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.routes import embeddings
+
+    async def fake_stats():
+        return {"queued": 0}
+
+    monkeypatch.setattr(embeddings, "queue_stats", fake_stats)
+    app = FastAPI()
+    app.include_router(embeddings.router)
+    assert TestClient(app).get("/api/embeddings/_queue/stats").json() == {"queued": 0}
@@ -0,0 +1,22 @@
+# tests/backend/test_http_clients.py
+import pytest
+
+from backend.embeddings.openai_client import get_client
+from backend.utils.http_clients import (
+    ELEVENLABS, OPENAI, close_http_clients, get_http_client, start_http_clients,
+)
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_integration_and_recreated_after_close():
+    await start_http_clients()
+    eleven = get_http_client(ELEVENLABS)
+    assert get_http_client(ELEVENLABS) is eleven
+    assert get_http_client(OPENAI) is not eleven
+    assert get_client()._client is get_http_client(OPENAI)
+
+    await close_http_clients()
+    assert eleven.is_closed
+    assert not get_http_client(ELEVENLABS).is_closed
+    assert get_client()._client is get_http_client(OPENAI)
+    await close_http_clients()
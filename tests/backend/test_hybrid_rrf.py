@@ -0,0 +1,58 @@
+# tests/backend/test_hybrid_rrf.py
+import pytest
+
+from backend.search.service import reciprocal_rank_fusion
+
+
+def test_rrf_rewards_agreement_between_lists():
+    lexical = ["ticket:7", "ticket:3"]
+    vector = ["ticket:3", "ticket:1", "ticket:7"]
+
+    fused = reciprocal_rank_fusion([lexical, vector], rrf_k=60)
+
+    assert [key for key, _ in fused] == ["ticket:3", "ticket:7", "ticket:1"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_rrf_with_empty_lexical_keeps_vector_order():
+    fused = reciprocal_rank_fusion([[], ["a", "b"]])
+    assert [key for key, _ in fused] == ["a", "b"]
+
+
+def test_collapse_chunks_keeps_best_chunk_per_ticket():
+    from backend.search.service import collapse_chunks
+
+    hits = [("ticket:3:2", 0.1), ("ticket:1", 0.2), ("ticket:3", 0.3), ("ticket:1:1", 0.4)]
+    assert collapse_chunks(hits) == [("ticket:3", 0.1), ("ticket:1", 0.2)]
+
+
+def test_text_query_drops_stopwords_and_requires_all_terms():
+    from backend.utils.redis_client import build_text_query
+
+    fields = "@TicketNumber|ShortDescription|Description"
+    assert build_text_query("el estado de mi ticket que no llega") == f"{fields}:(llega)"
+    assert build_text_query("la VPN de SAP") == f"{fields}:(vpn sap)"
+    assert build_text_query("de la que en mi") is None
+
+
+def test_stopword_overlap_is_not_a_confident_match():
+    from backend.services.ticket_service import _is_confident_match
+
+    ticket = {"TicketNumber": "INC-0000042", "ShortDescription": "Impresora sin tóner"}
+    far = {"score": 0.9, "lexical": True, "ticket": ticket}
+
+    assert not _is_confident_match(far, "quiero saber el estado de mi solicitud")
+    assert _is_confident_match(far, "estado del ticket 4 2")           # número dictado
+    assert _is_confident_match({**far, "score": 0.3}, "la impresora no imprime")
+
+
+def test_loose_numbers_are_not_a_ticket_number():
+    from backend.services.ticket_service import _mentions_ticket_number
+
+    ticket = {"TicketNumber": "INC-0000004"}
+    assert not _mentions_ticket_number("tengo 4 impresoras sin tóner", ticket)
+    assert not _mentions_ticket_number("mi ticket no sirve, tengo 4 impresoras", ticket)
+    assert _mentions_ticket_number("el INC-0000004", ticket)
+    assert _mentions_ticket_number("ticket número 4", ticket)
+    assert _mentions_ticket_number("es el 0000004", ticket)
+    assert _mentions_ticket_number("0 0 0 0 0 0 4", ticket)                # dictado dígito a dígito
@@ -0,0 +1,53 @@
+# tests/backend/test_local_vector_store.py
+import pytest
+
+from backend.utils.local_vector_store import LocalVectorStore
+
+
+def test_knn_with_tag_filter(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.upsert([
+        ("ticket:1", [1.0, 0.0], {"status": "Nuevo"}),
+        ("ticket:2", [0.9, 0.1], {"status": "Cerrado"}),
+        ("ticket:3", [0.0, 1.0], {"status": "Nuevo"}),
+    ])
+
+    hits = store.knn([1.0, 0.0], k=2)
+    assert [key for key, _ in hits] == ["ticket:1", "ticket:2"]
+    assert hits[0][1] == pytest.approx(0.0, abs=1e-6)      # distancia coseno
+
+    hits = store.knn([1.0, 0.0], k=5, status="Nuevo")
+    assert [key for key, _ in hits] == ["ticket:1", "ticket:3"]
+    assert store.knn([1.0, 0.0], k=5, status="Otro") == []
+
+
+def test_upsert_is_visible_to_other_readers(tmp_path):
+    writer = LocalVectorStore(str(tmp_path))
+    reader = LocalVectorStore(str(tmp_path))
+    writer.upsert([("ticket:1", [3.0, 4.0], {})])
+    assert reader.get("ticket:1") == pytest.approx([0.6, 0.8])   # normalizado
+
+    writer.upsert([("ticket:1", [0.0, 2.0], {}), ("ticket:2", [1.0, 1.0], {})])
+    assert reader.get("ticket:1") == pytest.approx([0.0, 1.0])
+    assert len(reader.snapshot().ids) == 2
+
+
+def test_update_meta_keeps_vectors(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.upsert([("ticket:1", [1.0, 0.0], {"status": "Nuevo", "text_hash": "h"})])
+    store.update_meta([("ticket:1", {"status": "Cerrado"}), ("ticket:9", {"status": "x"})])
+
+    assert store.get_meta("ticket:1") == {"status": "Cerrado", "text_hash": "h"}
+    assert store.get("ticket:1") == pytest.approx([1.0, 0.0])
+    assert store.get_meta("ticket:9") is None
+    assert [key for key, _ in store.knn([1.0, 0.0], k=5, status="Cerrado")] == ["ticket:1"]
+
+
+def test_delete_removes_rows(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.upsert([("ticket:1", [1.0, 0.0], {}), ("ticket:2", [0.0, 1.0], {})])
+    assert store.delete(["ticket:1", "ticket:9"]) == 1
+    assert store.get("ticket:1") is None
+    assert [key for key, _ in store.knn([1.0, 0.0], k=5)] == ["ticket:2"]
+    assert store.delete(["ticket:2"]) == 1
+    assert store.knn([1.0, 0.0], k=5) == []
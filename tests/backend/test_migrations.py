@@ -0,0 +1,25 @@
+# tests/backend/test_migrations.py
+import importlib.util
+import pathlib
+
+from backend.database.models import Base
+
+VERSIONS = pathlib.Path(__file__).parents[2] / "backend/database/migrations/versions"
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_hot_indexes_match_models():
+    """Cada índice de la migración 0002 está declarado igual en models.py."""
+    declared = {
+        (ix.name, table.name): [c.name for c in ix.columns]
+        for table in Base.metadata.tables.values()
+        for ix in table.indexes
+    }
+    for name, table, columns in _load("0002_ticket_hot_indexes").INDEXES:
+        assert declared[(name, table)] == columns
@@ -11,5 +11,5 @@ if not AZ_CREDS.issubset(os.environ):
 async def test_embed_roundtrip():
     key = "unit:test"
     vec = await embed_and_store(key, "texto de prueba", status="Nuevo")
-    stored = get_vector(key)
+    stored = await get_vector(key)
     assert stored and len(vec) == len(stored)
@@ -0,0 +1,77 @@
+# tests/backend/test_reconcile.py
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from backend.database.models import Ticket
+from backend.embeddings.queue import STREAM
+from backend.embeddings.reconcile import Reconciler, ticket_id_from_key
+
+SETTINGS = SimpleNamespace(
+    RECONCILE_BATCH_SIZE=2,
+    RECONCILE_MAX_KEYS_PER_S=0,
+    EMBEDDING_QUEUE_MAXLEN=1000,
+)
+
+
+@pytest_asyncio.fixture
+async def sessions():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.execute(CreateTable(Ticket.__table__))      # sin los índices de Postgres
+        for i in (1, 2, 3):
+            await conn.execute(Ticket.__table__.insert().values(
+                id=i, TicketNumber=f"INC{i}", ShortDescription="x", CreatedBy="y",
+            ))
+    yield async_sessionmaker(engine)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    monkeypatch.setattr("backend.embeddings.queue.get_settings", lambda: SETTINGS)
+    r = FakeAsyncRedis()
+    for i in (1, 3, 7, 8, 9):                                # 7, 8, 9 ya no existen
+        await r.hset(f"emb:ticket:{i}", mapping={"ticket_id": i})
+    await r.hset("emb:otra:1", mapping={"x": 1})
+    yield r
+
+
+def test_ticket_id_from_key():
+    assert ticket_id_from_key(b"emb:ticket:42") == 42
+    assert ticket_id_from_key("emb:ticket:42:1") == 42
+    assert ticket_id_from_key("emb:ticket:x") is None
+
+
+@pytest.mark.asyncio
+async def test_unlinks_orphans_and_enqueues_missing(redis, sessions):
+    stats = await Reconciler(redis=redis, session_factory=sessions, settings=SETTINGS).run()
+
+    assert stats == {"scanned": 5, "orphans": 3, "checked": 3, "missing": 1}
+    assert sorted(await redis.keys("emb:*")) == [b"emb:otra:1", b"emb:ticket:1", b"emb:ticket:3"]
+    [(_, fields)] = await redis.xrange(STREAM)
+    assert fields[b"ticket_id"] == b"2"
+
+
+@pytest.mark.asyncio
+async def test_dry_run_changes_nothing(redis, sessions):
+    stats = await Reconciler(redis=redis, session_factory=sessions, settings=SETTINGS, dry_run=True).run()
+
+    assert stats["orphans"] == 3 and stats["missing"] == 1
+    assert len(await redis.keys("emb:ticket:*")) == 5
+    assert await redis.xlen(STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_unlinks_every_chunk_of_an_orphan(redis, sessions):
+    for key in ("emb:ticket:42", "emb:ticket:42:1", "emb:ticket:42:2", "emb:ticket:1:1"):
+        await redis.hset(key, mapping={"ticket_id": 42})
+
+    stats = await Reconciler(redis=redis, session_factory=sessions, settings=SETTINGS).remove_orphans()
+
+    assert stats == {"scanned": 9, "orphans": 6}
+    assert sorted(await redis.keys("emb:ticket:*")) == [b"emb:ticket:1", b"emb:ticket:1:1", b"emb:ticket:3"]
@@ -2,13 +2,51 @@
 import pytest
 from backend.utils.redis_client import add_embedding, get_vector
 
-def test_add_and_get_scalar_vector():
+@pytest.mark.asyncio
+async def test_add_and_get_scalar_vector():
     # ----- escalar (1-dim) -----
-    add_embedding("unit:key1", [42.0])
-    assert get_vector("unit:key1") == pytest.approx([42.0], rel=1e-6)
+    await add_embedding("unit:key1", [42.0])
+    assert await get_vector("unit:key1") == pytest.approx([42.0], rel=1e-6)
 
     # ----- vector completo -----
     demo_vec = [1.1, 2.2, 3.3]
-    add_embedding("unit:key2", demo_vec)
-    assert get_vector("unit:key2") == pytest.approx(demo_vec, rel=1e-6)
+    await add_embedding("unit:key2", demo_vec)
+    assert await get_vector("unit:key2") == pytest.approx(demo_vec, rel=1e-6)
 
+
+
+class FakeSearchPipeline:
+    """Devuelve respuestas crudas de FT.SEARCH (como las da Redis) en orden."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.queries = []
+
+    async def search(self, query, query_params=None):
+        self.queries.append(query.get_args())
+
+    async def execute(self):
+        return self.replies
+
+
+@pytest.mark.asyncio
+async def test_pipelined_search_parses_raw_replies_with_payload(monkeypatch):
+    import json
+    from types import SimpleNamespace
+
+    from backend.utils import redis_client
+
+    hit = json.dumps({"id": 1, "Status": "Nuevo"}).encode()
+    pipe = FakeSearchPipeline([
+        [1, b"emb:ticket:1", [b"hit_json", hit]],                                  # BM25
+        [2, b"emb:ticket:1", [b"score", b"0.1", b"hit_json", hit],
+            b"emb:ticket:2:1", [b"score", b"0.3"]],                                # K-NN
+    ])
+    redis = SimpleNamespace(ft=lambda name: SimpleNamespace(pipeline=lambda transaction: pipe))
+    monkeypatch.setattr(redis_client, "get_redis", lambda: redis)
+
+    [(lexical, vector)] = await redis_client.batch_search([([0.0, 1.0], "vpn caida", 2, {})])
+
+    assert lexical == {"ticket:1": {"id": 1, "Status": "Nuevo"}}
+    assert vector == [("ticket:1", 0.1, {"id": 1, "Status": "Nuevo"}), ("ticket:2:1", 0.3, None)]
+    assert all("hit_json" in args for args in pipe.queries)
@@ -0,0 +1,77 @@
+# tests/backend/test_search_cache.py
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from backend.search.cache import GEN_KEY, SearchCache, search_cache_key
+
+
+class Compute:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"key": "ticket:1", "score": 0.1, "ticket": {"id": 1, "Status": "Nuevo"}}]
+
+
+def test_key_normalizes_whitespace_and_filter_order():
+    a = search_cache_key("  vpn   caída ", 5, "vector", {"status": "Nuevo", "x": 1})
+    b = search_cache_key("vpn caída", 5, "vector", {"x": 1, "status": "Nuevo"})
+    assert a == b
+    assert a != search_cache_key("VPN caída", 5, "vector", {"x": 1, "status": "Nuevo"})
+    assert a != search_cache_key("vpn caída", 6, "vector", {"x": 1, "status": "Nuevo"})
+    assert a != search_cache_key("vpn caída", 5, "vector", {"x": 1, "status": "Nuevo"}, with_keys=True)
+
+
+@pytest.mark.asyncio
+async def test_hit_until_generation_is_bumped():
+    redis = FakeAsyncRedis()
+    cache, compute = SearchCache(redis, ttl_s=30), Compute()
+
+    first = await cache.get_or_compute("k", compute)
+    assert await cache.get_or_compute("k", compute) == first
+    assert compute.calls == 1 and cache.hits == 1
+
+    await redis.incr(GEN_KEY)                              # una escritura de tickets
+    await cache.get_or_compute("k", compute)
+    assert compute.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    cache, compute = SearchCache(FakeAsyncRedis()), Compute(delay=0.05)
+    results = await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(10)])
+    assert compute.calls == 1
+    assert all(r == results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_write_during_computation_is_not_cached_as_current():
+    redis = FakeAsyncRedis()
+    cache = SearchCache(redis)
+
+    async def compute():
+        await redis.incr(GEN_KEY)                          # escritura concurrente
+        return []
+
+    await cache.get_or_compute("k", compute)
+    _, cached = await cache._lookup("k")
+    assert cached is None
+
+
+@pytest.mark.asyncio
+async def test_waiters_recompute_when_the_leader_is_cancelled():
+    cache, compute = SearchCache(FakeAsyncRedis()), Compute(delay=0.05)
+
+    leader = asyncio.create_task(cache.get_or_compute("k", compute))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert (await waiter)[0]["key"] == "ticket:1"
+    assert leader.cancelled() and compute.calls == 2
@@ -0,0 +1,27 @@
+# tests/backend/test_ticket_numbers.py
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from backend.database.models import TICKET_DIGITS, Ticket
+from backend.database.ticket_numbers import dialed_variants, digits_only, format_ticket_number
+
+
+def test_format_and_digits_roundtrip():
+    number = format_ticket_number(42)
+    assert number == "INC-0000042"
+    assert digits_only(number) == "0000042"
+
+
+def test_digits_lookup_matches_index_expression():
+    """La consulta debe llevar la misma expresión que el índice de la migración 0003."""
+    sql = str(select(Ticket.id).where(TICKET_DIGITS == "42").compile(dialect=postgresql.dialect()))
+    assert """regexp_replace(tickets."TicketNumber", '\\D', '', 'g') =""" in sql
+
+
+def test_dialed_digits_find_padded_numbers():
+    assert digits_only(format_ticket_number(42)) in dialed_variants("42")
+    assert dialed_variants("0000042") == ["0000042", "42"]
+    assert dialed_variants("998") == ["0000998", "998"]          # folio antiguo sin relleno
+    assert dialed_variants("0") == ["0", "0000000"]
+    sql = str(select(Ticket.id).where(TICKET_DIGITS.in_(dialed_variants("42"))).compile(dialect=postgresql.dialect()))
+    assert """regexp_replace(tickets."TicketNumber", '\\D', '', 'g') IN""" in sql
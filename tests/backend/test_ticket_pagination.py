@@ -0,0 +1,72 @@
+# tests/backend/test_ticket_pagination.py
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.future import select
+
+from backend.database.models import Ticket
+from backend.routes.tickets import (
+    apply_ticket_filters, decode_cursor, encode_cursor, ticket_filters,
+)
+
+
+def test_cursor_roundtrip_datetime():
+    ts = datetime.datetime(2025, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(ts, 42, "created_at")
+    assert decode_cursor(cursor, "created_at") == (ts, 42)
+
+
+def test_cursor_roundtrip_ticket_number():
+    assert decode_cursor(encode_cursor("INC0001", 7, "ticket_number"), "ticket_number") == ("INC0001", 7)
+
+
+def test_invalid_cursor_is_400():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("no-es-un-cursor", "created_at")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor, sort", [
+    (encode_cursor("INC0001", 7, "ticket_number"), "created_at"),      # reusado con otro sort
+    (encode_cursor("INC0001", 7, "id"), "id"),                         # valor de otro tipo
+    (encode_cursor(3, "7", "id"), "id"),                               # id no entero
+    (encode_cursor(True, 7, "id"), "id"),
+])
+def test_cursor_of_wrong_type_or_sort_is_400(cursor, sort):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, sort)
+    assert exc.value.status_code == 400
+
+
+def test_filters_only_add_given_conditions():
+    filters = ticket_filters(status="Nuevo", company="ACME")
+    sql = str(apply_ticket_filters(select(Ticket), filters))
+    assert "tickets.\"Status\" = " in sql
+    assert "tickets.\"Company\" = " in sql
+    assert "Priority" not in sql.split("WHERE")[1]
+
+
+def test_export_chunks_use_ticketout_aliases():
+    from sqlalchemy import create_engine
+    from sqlalchemy.schema import CreateTable
+
+    from backend.routes.tickets import EXPORT_COLUMNS, _csv_chunk, _ndjson_chunk
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(CreateTable(Ticket.__table__))      # sin los índices de Postgres
+        conn.execute(Ticket.__table__.insert().values(
+            TicketNumber="INC1", ShortDescription="x", CreatedBy="y", Description='a, "b"',
+        ))
+        rows = conn.execute(select(*EXPORT_COLUMNS)).all()
+
+    header = _csv_chunk([], header=True).splitlines()[0]
+    assert header.startswith("id,TicketNumber,Folio") and header.endswith("CreatedAt")
+    assert '"a, ""b"""' in _csv_chunk(rows)
+    assert _ndjson_chunk(rows).startswith('{"id": 1, "TicketNumber": "INC1"')
+
+
+def test_created_at_is_not_nullable():
+    # un created_at NULL daría un cursor con valor null (400 en la página siguiente)
+    assert Ticket.__table__.c.created_at.nullable is False
@@ -0,0 +1,90 @@
+# tests/backend/test_tts_cache.py
+import asyncio
+import os
+import time
+
+import pytest
+
+from backend.services.tts_cache import TTSCache
+
+SETTINGS = {"stability": 0.75, "similarity_boost": 0.75}
+
+
+def test_key_depends_on_voice_settings_and_text():
+    base = TTSCache.key("voz", SETTINGS, "Hola")
+    assert base == TTSCache.key("voz", dict(reversed(SETTINGS.items())), "Hola")
+    assert base != TTSCache.key("otra", SETTINGS, "Hola")
+    assert base != TTSCache.key("voz", {**SETTINGS, "stability": 0.5}, "Hola")
+    assert base != TTSCache.key("voz", SETTINGS, "Hola.")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_synthesize_once(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=2**20, max_age_s=3600)
+    calls = 0
+
+    async def synth():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"mp3"
+
+    key = cache.key("voz", SETTINGS, "Hola")
+    names = await asyncio.gather(*(cache.get_or_create(key, synth) for _ in range(5)))
+    assert calls == 1 and len(set(names)) == 1
+    assert (tmp_path / names[0]).read_bytes() == b"mp3"
+
+    assert await cache.get_or_create(key, synth) == names[0]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_resynthesize_when_the_leader_hangs_up(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=2**20, max_age_s=3600)
+    calls = 0
+
+    async def synth():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"mp3"
+
+    key = cache.key("voz", SETTINGS, "Hola")
+    leader = asyncio.create_task(cache.get_or_create(key, synth))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.get_or_create(key, synth))
+    await asyncio.sleep(0.01)
+    leader.cancel()                                   # el llamante colgó
+
+    assert (tmp_path / await waiter).read_bytes() == b"mp3"
+    assert leader.cancelled() and calls == 2
+
+
+def test_evicts_by_age_then_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=10, max_age_s=3600)
+    now = time.time()
+    for name, age in [("viejo", 7200), ("a", 30), ("b", 20), ("c", 10)]:
+        path = tmp_path / cache.store(name, b"12345")
+        os.utime(path, (now - age, now - age))
+
+    assert cache.lookup("a")                      # acierto ⇒ pasa a ser el más reciente
+    assert cache.evict() == 2                     # 'viejo' por edad, 'b' por tamaño
+    assert {p.name for p in tmp_path.glob("tts-*")} == {cache.filename("a"), cache.filename("c")}
+
+
+def test_streamed_audio_is_published_only_when_complete(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=2**20, max_age_s=3600)
+
+    aborted = cache.begin("corte")
+    aborted.write(b"mp")
+    aborted.discard()                             # p. ej. Twilio colgó a mitad
+    assert cache.lookup("corte") is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+    pending = cache.begin("completo")
+    for chunk in (b"m", b"p", b"3"):
+        pending.write(chunk)
+    assert cache.lookup("completo") is None       # nadie ve audio a medias
+    name = pending.commit()
+    pending.discard()                             # no-op tras commit
+    assert (tmp_path / name).read_bytes() == b"mp3"
@@ -0,0 +1,22 @@
+# tests/backend/test_vector_codec.py
+import pytest
+
+from backend.utils.vector_codec import decode_vector, encode_vector
+
+VEC = [0.1, -0.25, 0.5, 1e-3]
+
+
+@pytest.mark.parametrize("dtype,size,rel", [
+    ("FLOAT32", 4, 1e-6),
+    ("FLOAT16", 2, 1e-3),
+    ("BFLOAT16", 2, 1e-2),
+])
+def test_roundtrip_and_size(dtype, size, rel):
+    raw = encode_vector(VEC, dtype)
+    assert len(raw) == size * len(VEC)
+    assert decode_vector(raw, dtype) == pytest.approx(VEC, rel=rel)
+
+
+def test_rejects_unknown_dtype():
+    with pytest.raises(ValueError):
+        encode_vector(VEC, "INT8")
@@ -0,0 +1,89 @@
+# tests/backend/test_vector_index.py
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from backend.utils import vector_index
+
+
+@pytest.mark.asyncio
+async def test_wait_until_indexed_polls_through_missing_index(monkeypatch):
+    infos = iter([None, {"indexing": 1, "percent_indexed": 0.5}, {"indexing": 0, "percent_indexed": 1}])
+
+    async def info(name):
+        return next(infos)
+    monkeypatch.setattr(vector_index, "_info", info)
+
+    await vector_index.wait_until_indexed("embeddings_idx_v3", poll_s=0)
+
+
+@pytest.mark.asyncio
+async def test_wait_until_indexed_times_out(monkeypatch):
+    async def info(name):
+        return None
+    monkeypatch.setattr(vector_index, "_info", info)
+
+    with pytest.raises(TimeoutError):
+        await vector_index.wait_until_indexed("embeddings_idx_v3", poll_s=0, timeout_s=0)
+
+
+@pytest.fixture
+def alias(monkeypatch):
+    """Alias simulado: current_index/rebuild_index sin RediSearch; lock en fakeredis."""
+    state = {"current": None, "rebuilt": [], "created": []}
+
+    async def current_index():
+        return state["current"]
+
+    async def rebuild_index(version, **kw):
+        state["rebuilt"].append(version)
+        state["current"] = vector_index.index_name(version)
+        return state["current"]
+
+    async def create_index(version):
+        state["created"].append(version)
+        return vector_index.index_name(version)
+
+    async def swap_alias(name):
+        state["current"] = name
+
+    for name, fn in [("current_index", current_index), ("rebuild_index", rebuild_index),
+                     ("create_index", create_index), ("swap_alias", swap_alias)]:
+        monkeypatch.setattr(vector_index, name, fn)
+    monkeypatch.setattr(vector_index, "get_redis", lambda r=FakeAsyncRedis(): r)
+    return state
+
+
+def test_index_version():
+    assert vector_index.index_version("embeddings_idx_v3") == 3
+    assert vector_index.index_version(vector_index.INDEX_NAME) == 0
+    assert vector_index.index_version(None) is None
+
+
+@pytest.mark.asyncio
+async def test_ensure_index_only_creates_what_is_missing(alias):
+    alias["current"] = vector_index.INDEX_NAME             # índice real, sin alias
+    await vector_index.ensure_index()
+    assert alias["rebuilt"] == [] and alias["created"] == []
+
+    alias["current"] = None
+    await vector_index.ensure_index()
+    assert alias["current"] == vector_index.index_name(vector_index.get_settings().VECTOR_INDEX_VERSION)
+
+
+@pytest.mark.asyncio
+async def test_upgrade_index_moves_an_older_alias_once(alias):
+    version = vector_index.get_settings().VECTOR_INDEX_VERSION
+    alias["current"] = vector_index.index_name(version - 1)
+
+    assert await vector_index.upgrade_index() == vector_index.index_name(version)
+    assert await vector_index.upgrade_index() is None                # ya al día
+    assert alias["rebuilt"] == [version]
+
+
+@pytest.mark.asyncio
+async def test_upgrade_index_skips_while_another_worker_holds_the_lock(alias):
+    alias["current"] = vector_index.INDEX_NAME
+    await vector_index.get_redis().set(vector_index.UPGRADE_LOCK, "1")
+
+    assert await vector_index.upgrade_index() is None
+    assert alias["rebuilt"] == []
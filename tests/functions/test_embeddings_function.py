@@ -1 +1,168 @@
- 
\ No newline at end of file
+# tests/functions/test_embeddings_function.py
+import json
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from fakeredis import FakeRedis
+
+from backend.utils.vector_codec import encode_vector as backend_encode
+from functions.embeddings_function.azure_embeddings import AzureEmbeddings
+from functions.embeddings_function import batch
+from functions.embeddings_function.batch import ERROR, INVALID, OK, embed_batch, ticket_to_text
+from functions.redis_utils import encode_vector
+from functions.settings import Settings
+
+SETTINGS = Settings.from_env({
+    "AZURE_OPENAI_ENDPOINT": "https://aoai.local/",
+    "AZURE_OPENAI_KEY": "k",
+    "AZURE_OPENAI_DEPLOYMENT_EMBEDDINGS": "emb",
+    "EMBEDDING_DIMENSIONS": "3",
+})
+
+
+def fake_azure(calls, status=200):
+    """Servicio de embeddings sustituto (misma forma de respuesta que Azure)."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append((request.url, request.headers["api-key"], body))
+        data = [{"index": i, "embedding": [float(i + 1), 0.0, 0.5]} for i in range(len(body["input"]))]
+        return httpx.Response(status, json={"data": list(reversed(data))})   # el orden lo da index
+    return httpx.MockTransport(handler)
+
+
+def _client(calls=None, **kw):
+    return AzureEmbeddings(SETTINGS, transport=fake_azure([] if calls is None else calls, **kw))
+
+
+def test_batch_is_one_embed_call_and_one_pipeline():
+    calls, redis = [], FakeRedis()
+    tickets = [
+        {"id": 1, "TicketNumber": "INC1", "ShortDescription": "VPN", "Status": "Nuevo"},
+        {"id": 2, "text": "texto ya preparado"},
+    ]
+    results = embed_batch(tickets, client=_client(calls), redis=redis, settings=SETTINGS)
+
+    assert results == [{"id": 1, "status": OK}, {"id": 2, "status": OK}]
+    [(url, api_key, body)] = calls
+    assert str(url) == "https://aoai.local/openai/deployments/emb/embeddings?api-version=2023-05-15"
+    assert api_key == "k" and body["dimensions"] == 3
+    assert body["input"] == [ticket_to_text(tickets[0]), "texto ya preparado"]
+
+    h = redis.hgetall("emb:ticket:1")
+    assert h[b"status"] == b"Nuevo" and h[b"ticket_id"] == b"1"
+    assert np.frombuffer(h[b"vector"], dtype=np.float32).tolist() == [1.0, 0.0, 0.5]
+    assert np.frombuffer(redis.hget("emb:ticket:2", "vector"), dtype=np.float32)[0] == 2.0
+
+
+def test_invalid_items_do_not_block_the_rest():
+    calls, redis = [], FakeRedis()
+    items = ["x", {"text": "sin id"}, {"id": 3, "text": " "}, {"id": 5, "Category": None}, {"id": 4, "Folio": "F1"}]
+    results = embed_batch(items, client=_client(calls), redis=redis)
+    assert [r["status"] for r in results] == [INVALID, INVALID, INVALID, INVALID, OK]
+    assert len(calls[0][2]["input"]) == 1
+
+
+def test_embedding_failure_marks_valid_items_as_error():
+    redis = FakeRedis()
+    results = embed_batch([{"id": 1, "Folio": "F1"}, {}], client=_client(status=429), redis=redis)
+    assert [r["status"] for r in results] == [ERROR, INVALID]
+    assert "HTTP 429" in results[0]["error"]
+    assert not redis.keys("emb:*")
+
+
+TICKET = {
+    "id": 9, "TicketNumber": "INC-0000009", "ShortDescription": "VPN caída",
+    "Description": "x " * 400, "Status": "Nuevo", "Priority": "Alta", "AssignedTo": "ana",
+}
+
+
+def test_copies_match_backend_helpers(monkeypatch):
+    from backend.embeddings import service
+    from backend.utils.ticket_to_text import ticket_to_text as backend_text
+
+    monkeypatch.setattr(service, "get_batcher", lambda: SimpleNamespace(dimensions=3))
+    monkeypatch.setattr("backend.embeddings.openai_client.DEPLOY", "emb")
+
+    assert ticket_to_text(TICKET) == backend_text(TICKET)
+    assert ticket_to_text({**TICKET, "Category": None}) == backend_text({**TICKET, "Category": None})
+    assert batch.ticket_meta(TICKET) == service.ticket_meta(TICKET)
+    assert batch.text_hash(TICKET, 1, SETTINGS) == service.text_hash(TICKET)
+    assert batch.VOLATILE_FIELDS == service.VOLATILE_FIELDS
+
+
+LONG_TICKET = {**TICKET, "id": 7, "Description": " ".join(f"línea {i} del log de la VPN" for i in range(600))}
+
+
+def test_chunking_and_hash_match_backend(monkeypatch):
+    from backend.embeddings import service
+    from backend.embeddings.chunking import ticket_chunks as backend_chunks
+
+    monkeypatch.setattr(service, "get_batcher", lambda: SimpleNamespace(dimensions=3))
+    monkeypatch.setattr("backend.embeddings.openai_client.DEPLOY", "emb")
+
+    chunks = batch.ticket_chunks(LONG_TICKET, SETTINGS)
+    assert len(chunks) > 1
+    assert chunks == backend_chunks(LONG_TICKET)
+    assert batch.text_hash(LONG_TICKET, len(chunks), SETTINGS) == service.text_hash(LONG_TICKET, len(chunks))
+    assert batch.chunk_meta(LONG_TICKET, 2, SETTINGS) == service.chunk_meta(LONG_TICKET, 2)
+
+
+def test_rewrite_sets_text_hash_and_drops_stale_chunks():
+    redis = FakeRedis()
+    redis.hset("emb:ticket:9", mapping={"chunks": 3, "text_hash": "viejo"})
+    for n in (1, 2):
+        redis.hset(f"emb:ticket:9:{n}", mapping={"ticket_id": 9})
+    redis.hset("emb:ticket:2", mapping={"text_hash": "viejo"})
+
+    results = embed_batch([TICKET, {"id": 2, "text": "ya preparado"}], client=_client(), redis=redis, settings=SETTINGS)
+
+    assert [r["status"] for r in results] == [OK, OK]
+    assert sorted(redis.keys("emb:*")) == [b"emb:ticket:2", b"emb:ticket:9"]
+    assert redis.hget("emb:ticket:9", "chunks") == b"1"
+    assert redis.hget("emb:ticket:9", "text_hash").decode() == batch.text_hash(TICKET, 1, SETTINGS)
+    assert redis.hget("emb:ticket:2", "text_hash") == b""          # el backend lo re-embeberá
+    assert redis.get("searchcache:gen") == b"1"
+
+
+def test_long_ticket_is_written_in_chunks_with_one_pipeline(monkeypatch):
+    redis = FakeRedis()
+    redis.hset(f"emb:ticket:7:{SETTINGS.EMBEDDING_MAX_CHUNKS - 1}", mapping={"ticket_id": 7})
+    pipelines = []
+    real_pipeline = redis.pipeline
+    monkeypatch.setattr(redis, "pipeline", lambda **kw: pipelines.append(kw) or real_pipeline(**kw))
+    calls = []
+
+    results = embed_batch([LONG_TICKET], client=_client(calls), redis=redis, settings=SETTINGS)
+
+    chunks = batch.ticket_chunks(LONG_TICKET, SETTINGS)
+    assert results == [{"id": 7, "status": OK}]
+    assert len(pipelines) == 1                                    # sin lectura previa
+    assert calls[0][2]["input"] == chunks
+    assert sorted(redis.keys("emb:*")) == sorted(
+        f"emb:ticket:7{'' if n == 0 else f':{n}'}".encode() for n in range(len(chunks))
+    )
+    assert redis.hget("emb:ticket:7", "chunks") == str(len(chunks)).encode()
+    assert redis.hget("emb:ticket:7", "text_hash").decode() == batch.text_hash(LONG_TICKET, len(chunks), SETTINGS)
+    assert redis.hget("emb:ticket:7:1", "chunk") == b"1"
+
+
+@pytest.mark.parametrize("dtype", ["FLOAT32", "FLOAT16", "BFLOAT16"])
+def test_encode_vector_matches_backend_codec(dtype):
+    vec = np.random.default_rng(0).standard_normal(64).tolist()
+    assert encode_vector(vec, dtype) == backend_encode(vec, dtype)
+
+
+def test_http_trigger(monkeypatch):
+    func = pytest.importorskip("azure.functions")
+    from functions.embeddings_function import embeddings_trigger
+
+    client, redis = _client(), FakeRedis()
+    monkeypatch.setattr(embeddings_trigger, "get_embeddings_client", lambda: client)
+    monkeypatch.setattr(embeddings_trigger, "get_redis", lambda: redis)
+
+    req = func.HttpRequest("POST", "/api/embeddings", body=json.dumps({"tickets": [{"id": 1, "Folio": "F1"}, {}]}).encode())
+    resp = embeddings_trigger.main(req)
+    assert resp.status_code == 207
+    assert [r["status"] for r in json.loads(resp.get_body())["results"]] == [OK, INVALID]